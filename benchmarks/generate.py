@@ -0,0 +1,191 @@
+"""Synthetic OpenAPI specs and steps files of any size for the benchmarks"""
+import os
+
+import yaml
+
+from src.examples import generate_example
+
+# Property types cycled through by the generated schemas
+PROPERTY_TYPES = [
+    {"type": "string", "minLength": 1},
+    {"type": "integer", "minimum": 0},
+    {"type": "number"},
+    {"type": "boolean"},
+    {"type": "array", "items": {"type": "string"}},
+]
+
+
+def generate_spec(operations: int, depth: int = 5, properties: int = 20) -> dict:
+    """Generate an OpenAPI document with a create and a get operation per resource
+
+    Every resource schema has the given number of properties, and also holds a chain of
+    shared component schemas that reference each other depth levels deep.
+
+    Args:
+        operations (int): Number of operations, rounded up to an even number
+        depth (int): Length of the $ref chain under every resource
+        properties (int): Number of scalar properties per resource schema
+
+    Returns:
+        dict: The OpenAPI document
+    """
+    paths = {}
+    schemas = {}
+
+    for level in range(depth):
+        schema = {
+            "type": "object",
+            "properties": {"value": {"type": "integer"}},
+            "required": ["value"],
+        }
+        if level + 1 < depth:
+            schema["properties"]["next"] = {
+                "$ref": f"#/components/schemas/Level{level + 1}"
+            }
+        schemas[f"Level{level}"] = schema
+
+    for resource in range((operations + 1) // 2):
+        name = f"Resource{resource}"
+        schema = {
+            "type": "object",
+            "properties": {"id": {"type": "integer"}},
+            "required": ["id"],
+        }
+        for index in range(properties):
+            schema["properties"][f"field{index}"] = PROPERTY_TYPES[
+                index % len(PROPERTY_TYPES)
+            ]
+        if depth:
+            schema["properties"]["nested"] = {"$ref": "#/components/schemas/Level0"}
+        schemas[name] = schema
+
+        content = {"application/json": {"schema": {"$ref": f"#/components/schemas/{name}"}}}
+        paths[f"/resources{resource}"] = {
+            "post": {
+                "operationId": f"create{name}",
+                "requestBody": {"content": content},
+                "responses": {"201": {"description": "Created", "content": content}},
+            }
+        }
+        paths[f"/resources{resource}/{{id}}"] = {
+            "get": {
+                "operationId": f"get{name}",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {"200": {"description": "Found", "content": content}},
+            }
+        }
+
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Benchmark API", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+
+def resolve_refs(spec: dict) -> dict:
+    """Inline the $refs of a generated spec, as materializing it from a file would
+
+    Every referenced schema is resolved once and shared by its referrers. Generated
+    specs have no recursive schemas, so nothing needs to be cut short.
+
+    Args:
+        spec (dict): Document from generate_spec
+
+    Returns:
+        dict: A copy of the document without $refs
+    """
+    schemas = spec.get("components", {}).get("schemas", {})
+    resolved: dict[str, dict] = {}
+
+    def resolve_schema(name: str) -> dict:
+        if name not in resolved:
+            resolved[name] = resolve(schemas[name])
+        return resolved[name]
+
+    def resolve(value: any) -> any:
+        if isinstance(value, list):
+            return [resolve(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if "$ref" in value:
+            return resolve_schema(value["$ref"].rsplit("/", 1)[1])
+        return {key: resolve(item) for key, item in value.items()}
+
+    return {
+        **resolve({key: value for key, value in spec.items() if key != "components"}),
+        "components": {"schemas": {name: resolve_schema(name) for name in schemas}},
+    }
+
+
+def generate_steps(spec: dict, base_url: str, resources: int) -> dict:
+    """Generate a steps file that creates then gets each of the first resources
+
+    Args:
+        spec (dict): Document from generate_spec
+        base_url (str): URL of the API under test
+        resources (int): Number of resources to exercise
+
+    Returns:
+        dict: The steps file
+    """
+    schemas = resolve_refs(spec)["components"]["schemas"]
+    steps = []
+    for resource in range(resources):
+        name = f"Resource{resource}"
+        if name not in schemas:
+            break
+        steps.append(
+            {
+                "name": f"create{resource}",
+                "operation_id": f"create{name}",
+                "method": "POST",
+                "path": f"/resources{resource}",
+                "body": generate_example(schemas[name]),
+                "status_code": 201,
+            }
+        )
+        steps.append(
+            {
+                "name": f"get{resource}",
+                "operation_id": f"get{name}",
+                "method": "GET",
+                "path": f"/resources{resource}/${{{{ steps.create{resource}.response.body.id }}}}",
+                "status_code": 200,
+            }
+        )
+
+    return {"base_url": base_url, "steps": steps}
+
+
+def write_fixture(
+    directory: str,
+    operations: int,
+    base_url: str,
+    resources: int = 10,
+    depth: int = 5,
+    properties: int = 20,
+) -> tuple[str, str, dict]:
+    """Write a generated spec and steps file to a directory
+
+    Returns:
+        tuple[str, str, dict]: Paths of the spec and steps files, and the spec
+    """
+    spec = generate_spec(operations, depth, properties)
+    steps = generate_steps(spec, base_url, resources)
+
+    spec_path = os.path.join(directory, f"spec_{operations}.yml")
+    steps_path = os.path.join(directory, f"steps_{operations}.yml")
+    with open(spec_path, "w") as spec_file:
+        yaml.safe_dump(spec, spec_file, sort_keys=False)
+    with open(steps_path, "w") as steps_file:
+        yaml.safe_dump(steps, steps_file, sort_keys=False)
+
+    return spec_path, steps_path, spec
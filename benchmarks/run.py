@@ -0,0 +1,208 @@
+"""Time pypony's hot paths against generated specs and an in-process mock API
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare baseline.json --threshold 0.2
+"""
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable
+
+import click
+from rich import print
+from rich.markup import escape
+from rich.table import Table
+
+from src.examples import generate_example
+from src.mock import MockServer
+from src.models import Response
+from src.parsing import parse_steps_file, parse_spec_file
+from src.preprocessing import check_operation_coverage, evaluate
+from src.validate import validate
+from src.verify import ValidatorRegistry, verify_response
+
+from .generate import write_fixture
+
+
+def measure(function: Callable, repeat: int) -> dict:
+    """Call a function repeatedly, with its output silenced, and time every call
+
+    Returns:
+        dict: The min, median and mean seconds per call, and the number of calls
+    """
+    durations = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            durations.append(time.perf_counter() - started)
+
+    return {
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "mean": statistics.mean(durations),
+        "runs": repeat,
+    }
+
+
+def run_benchmarks(sizes: list[int], repeat: int, resources: int) -> dict:
+    """Time every benchmark against a generated spec of each size
+
+    Returns:
+        dict: Timings keyed by "<benchmark>[operations=<size>]"
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            print(f"--Benchmarking {size} operations--")
+            spec_path, steps_path, _ = write_fixture(
+                directory, size, "http://127.0.0.1", resources
+            )
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                steps = parse_steps_file(steps_path)
+                spec, operation_schemas = parse_spec_file(steps, spec_path)
+
+            schema = operation_schemas["createResource0"]["responses"]["201"]
+            body = generate_example(schema)
+            validator = ValidatorRegistry(operation_schemas).response(
+                "createResource0", 201
+            )
+            context = {"create0": {"response": Response(201, {}, body)}}
+
+            benchmarks = {
+                "parse_steps_file": lambda: parse_steps_file(steps_path),
+                "parse_spec_file": lambda: parse_spec_file(steps, spec_path),
+                "check_operation_coverage": lambda: check_operation_coverage(
+                    steps, spec
+                ),
+                "evaluate": lambda: evaluate(steps["steps"][1], context),
+                "verify_response": lambda: verify_response(
+                    Response(201, {}, body), 201, schema, validator
+                ),
+            }
+            for name, function in benchmarks.items():
+                results[f"{name}[operations={size}]"] = measure(function, repeat)
+
+            # End to end against the mock API, with the steps file pointed at it
+            with MockServer(spec) as server:
+                with open(steps_path) as steps_file:
+                    text = steps_file.read()
+                with open(steps_path, "w") as steps_file:
+                    steps_file.write(text.replace("http://127.0.0.1", server.url, 1))
+
+                results[f"validate[operations={size}]"] = measure(
+                    lambda: validate(steps_path, spec_path, slowest=0), repeat
+                )
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Compare median timings against a baseline
+
+    Args:
+        results (dict): Timings from run_benchmarks
+        baseline (dict): Timings of an earlier run
+        threshold (float): Allowed slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        list[str]: Names of the benchmarks that regressed
+    """
+    table = Table(title="Comparison to Baseline")
+    for column in ("Benchmark", "Baseline", "Current", "Change"):
+        table.add_column(column, justify="left" if column == "Benchmark" else "right")
+
+    regressions = []
+    for name, timing in results.items():
+        if name not in baseline:
+            continue
+
+        before, after = baseline[name]["median"], timing["median"]
+        change = after / before - 1 if before else 0.0
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+
+        style = "bold red" if regressed else ("green" if change < -threshold else "")
+        table.add_row(
+            escape(name),
+            f"{before * 1000:.3f}ms",
+            f"{after * 1000:.3f}ms",
+            f"[{style}]{change:+.1%}[/{style}]" if style else f"{change:+.1%}",
+        )
+
+    print(table)
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="10,100,1000,5000",
+    help="Comma separated numbers of operations in the generated specs",
+)
+@click.option("--repeat", default=5, type=click.IntRange(min=1))
+@click.option(
+    "--resources",
+    default=10,
+    type=click.IntRange(min=1),
+    help="Resources created and fetched by the generated steps files",
+)
+@click.option("--output", type=click.Path(dir_okay=False), help="Write results here")
+@click.option(
+    "--compare",
+    "baseline_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Results of an earlier run to check for regressions",
+)
+@click.option(
+    "--threshold",
+    default=0.2,
+    type=click.FloatRange(min=0),
+    help="Slowdown of the median allowed before a benchmark counts as a regression",
+)
+def main(sizes, repeat, resources, output, baseline_path, threshold):
+    sizes = [int(size) for size in sizes.split(",")]
+    results = run_benchmarks(sizes, repeat, resources)
+
+    table = Table(title="Benchmarks")
+    for column in ("Benchmark", "Min", "Median"):
+        table.add_column(column, justify="left" if column == "Benchmark" else "right")
+    for name, timing in results.items():
+        table.add_row(
+            escape(name),
+            f"{timing['min'] * 1000:.3f}ms",
+            f"{timing['median'] * 1000:.3f}ms",
+        )
+    print(table)
+
+    if output:
+        with open(output, "w") as output_file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                output_file,
+                indent=2,
+            )
+
+    if baseline_path:
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, threshold)
+        if regressions:
+            print(f"[bold red]{len(regressions)} benchmark(s) regressed[/bold red]")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,619 @@
 import sys
-import traceback
 
 import click
 
-from src.validate import validate
+# Only what the options need is imported up front; the commands import the rest, so
+# --help, --version and usage errors do not wait for requests, jsonschema and rich
+from src.transport import TRANSPORTS
 
+# Names of the reporters in src.reporter.REPORTERS, which imports rich
+OUTPUTS = ["text", "quiet", "jsonl"]
 
-@click.group()
+
+class DefaultCommandGroup(click.Group):
+    """Group that runs its default command when no subcommand is named
+
+    This keeps `pypony -st steps.yml -sp spec.yml` working alongside the subcommands.
+    """
+
+    default_command = "main"
+
+    def parse_args(self, ctx, args):
+        if not args or args[0] not in self.commands and args[0] != "--help":
+            args.insert(0, self.default_command)
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup)
 def cli():
     pass
 
 
+def report_error(e: BaseException, verbose: bool):
+    from src.reporter import get_reporter
+
+    reporter = get_reporter()
+    reporter.error(e, verbose)
+    reporter.close()
+    sys.exit(1)
+
+
+def parse_shard_option(ctx: click.Context, param: click.Parameter, value: str):
+    """Turn --shard i/N into (i, N)"""
+    if value is None:
+        return None
+    from src.shard import parse_shard
+
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param)
+
+
+def require_options(*names: str):
+    """Fail with a usage error if an option that is sometimes required is missing"""
+    ctx = click.get_current_context()
+    for param in ctx.command.params:
+        if param.name in names and not ctx.params[param.name]:
+            raise click.MissingParameter(ctx=ctx, param=param)
+
+
+def add_options(*options):
+    """Apply click options in the order given, so groups of them can be shared"""
+
+    def decorator(f):
+        for option in reversed(options):
+            f = option(f)
+        return f
+
+    return decorator
+
+
+TRANSPORT_OPTIONS = [
+    click.option(
+        "--connect-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        envvar="INPUT_CONNECT_TIMEOUT",
+    ),
+    click.option(
+        "--read-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        envvar="INPUT_READ_TIMEOUT",
+    ),
+    click.option(
+        "--transport",
+        default="requests",
+        type=click.Choice(TRANSPORTS),
+        envvar="INPUT_TRANSPORT",
+        help="HTTP client that sends the requests",
+    ),
+    click.option("--http2", is_flag=True, help="Negotiate HTTP/2 (httpx transport)"),
+    click.option(
+        "--uds",
+        type=click.Path(exists=True, dir_okay=False),
+        help="Unix domain socket to send the requests over (httpx transport)",
+    ),
+]
+
+SPEC_CACHE_OPTIONS = [
+    click.option(
+        "--spec-cache-dir",
+        type=click.Path(file_okay=False),
+        envvar="INPUT_SPEC_CACHE_DIR",
+        help="Directory to cache materialized and validated specs in",
+    ),
+    click.option("--no-spec-cache", is_flag=True, help="Always re-parse the spec"),
+]
+
+LAZY_REFS_OPTION = click.option(
+    "--lazy-refs",
+    is_flag=True,
+    help="Only resolve the $refs of operations used by the steps files",
+)
+
+
+def get_spec_cache_dir(spec_cache_dir: str, no_spec_cache: bool):
+    """Resolve the spec cache options to a directory, or None to skip the cache"""
+    if no_spec_cache:
+        return None
+    from src.spec_cache import default_cache_dir
+
+    return spec_cache_dir or default_cache_dir()
+
+
 @cli.command()
 @click.option(
-    "-st", "--step_file", required=True, type=click.STRING, envvar="INPUT_STEP_FILE"
+    "-st",
+    "--step_file",
+    multiple=True,
+    type=click.STRING,
+    envvar="INPUT_STEP_FILE",
+    help="Steps file or glob pattern; may be given more than once",
 )
+@click.option("-sp", "--spec_file", type=click.STRING, envvar="INPUT_SPEC_FILE")
 @click.option(
-    "-sp", "--spec_file", required=True, type=click.STRING, envvar="INPUT_SPEC_FILE"
+    "--plan",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="INPUT_PLAN",
+    help="Plan from `pypony compile` to run instead of the steps and spec files",
 )
 @click.option("-ff", "--fail-fast", is_flag=True)
 @click.option("-v", "--verbose", is_flag=True)
+@click.option(
+    "--output",
+    default="text",
+    type=click.Choice(OUTPUTS),
+    envvar="INPUT_OUTPUT",
+    help="How to report the run: text, only failures, or JSON Lines events",
+)
+@click.option("-q", "--quiet", is_flag=True, help="Only report failures")
+@click.option(
+    "-j", "--jobs", default=1, type=click.IntRange(min=1), envvar="INPUT_JOBS"
+)
+@click.option(
+    "-w",
+    "--workers",
+    default=1,
+    type=click.IntRange(min=1),
+    envvar="INPUT_WORKERS",
+    help="Number of steps files run at the same time",
+)
+@click.option(
+    "--pool-size", default=10, type=click.IntRange(min=1), envvar="INPUT_POOL_SIZE"
+)
+@click.option(
+    "--deadline",
+    type=click.FloatRange(min=0, min_open=True),
+    envvar="INPUT_DEADLINE",
+    help="Seconds the whole run may take before the remaining steps fail",
+)
+@add_options(*TRANSPORT_OPTIONS, *SPEC_CACHE_OPTIONS, LAZY_REFS_OPTION)
+@click.option(
+    "--result-cache-dir",
+    type=click.Path(file_okay=False),
+    envvar="INPUT_RESULT_CACHE_DIR",
+    help="Cache passed steps in this directory and skip them while unchanged",
+)
+@click.option(
+    "--since",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="INPUT_SINCE",
+    help="Previous spec; rerun the cached steps of operations changed since then",
+)
+@click.option(
+    "--full-run",
+    is_flag=True,
+    help="Run every step, ignoring cached passes and --since",
+)
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False),
+    envvar="INPUT_RECORD",
+    help="Write every request and response to a cassette file",
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="INPUT_REPLAY",
+    help="Answer the requests from a cassette file instead of the network",
+)
+@click.option(
+    "--compress-bodies",
+    is_flag=True,
+    help="Gzip the bodies written with --record",
+)
+@click.option(
+    "--report-json",
+    type=click.Path(dir_okay=False),
+    envvar="INPUT_REPORT_JSON",
+    help="Write step results and timings as JSON, or JSON Lines for a .jsonl path",
+)
+@click.option(
+    "--report-junit",
+    type=click.Path(dir_okay=False),
+    envvar="INPUT_REPORT_JUNIT",
+    help="Write step results and timings as JUnit XML",
+)
+@click.option(
+    "--slowest",
+    default=5,
+    type=click.IntRange(min=0),
+    help="Number of slowest steps to summarize, 0 to turn off",
+)
+@click.option(
+    "--shard",
+    callback=parse_shard_option,
+    envvar="INPUT_SHARD",
+    help="Only run shard i of N, such as 2/4, keeping dependent steps together",
+)
+@click.option(
+    "--shard-result",
+    type=click.Path(dir_okay=False),
+    envvar="INPUT_SHARD_RESULT",
+    help="Write the shard's results and coverage for `pypony merge`",
+)
 @click.version_option()
 @click.help_option()
-def main(step_file, spec_file, fail_fast, verbose):
+def main(
+    step_file,
+    spec_file,
+    plan,
+    fail_fast,
+    verbose,
+    output,
+    quiet,
+    jobs,
+    workers,
+    pool_size,
+    connect_timeout,
+    read_timeout,
+    deadline,
+    spec_cache_dir,
+    no_spec_cache,
+    transport,
+    http2,
+    uds,
+    lazy_refs,
+    result_cache_dir,
+    since,
+    full_run,
+    record,
+    replay,
+    compress_bodies,
+    report_json,
+    report_junit,
+    slowest,
+    shard,
+    shard_result,
+):
+    if plan is None:
+        require_options("step_file", "spec_file")
+
+    from src.reporter import REPORTERS, set_reporter
+    from src.validate import validate
+
+    set_reporter(REPORTERS["quiet" if quiet else output]())
+
     try:
-        validate(step_file, spec_file, fail_fast, verbose)
+        validate(
+            step_file,
+            spec_file,
+            fail_fast=fail_fast,
+            verbose=verbose,
+            jobs=jobs,
+            pool_size=pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            spec_cache_dir=get_spec_cache_dir(spec_cache_dir, no_spec_cache),
+            lazy_refs=lazy_refs,
+            report_json=report_json,
+            report_junit=report_junit,
+            slowest=slowest,
+            workers=workers,
+            deadline=deadline,
+            transport=transport,
+            http2=http2,
+            uds=uds,
+            result_cache_dir=result_cache_dir,
+            since=since,
+            full_run=full_run,
+            record=record,
+            replay=replay,
+            compress_bodies=compress_bodies,
+            plan=plan,
+            shard=shard,
+            shard_result=shard_result,
+        )
     except BaseException as e:
-        if verbose:
-            print(traceback.format_exc())
-        else:
-            print(str(e))
+        report_error(e, verbose)
+
+
+# `pypony run` reads better than the implicit default command next to `compile`
+cli.add_command(main, "run")
 
-        sys.exit(1)
+
+@cli.command()
+@click.argument(
+    "shard_results", nargs=-1, required=True, type=click.Path(dir_okay=False)
+)
+@click.option(
+    "--coverage-threshold",
+    type=click.FloatRange(min=0, max=1),
+    help="Share of the spec's operations the shards must cover together; defaults "
+    "to the highest coverage_threshold of the steps files",
+)
+@click.option("-v", "--verbose", is_flag=True)
+@click.option(
+    "--output",
+    default="text",
+    type=click.Choice(OUTPUTS),
+    envvar="INPUT_OUTPUT",
+    help="How to report the run: text, only failures, or JSON Lines events",
+)
+@click.option("-q", "--quiet", is_flag=True, help="Only report failures")
+@click.option(
+    "--report-json",
+    type=click.Path(dir_okay=False),
+    envvar="INPUT_REPORT_JSON",
+    help="Write step results and timings as JSON, or JSON Lines for a .jsonl path",
+)
+@click.option(
+    "--report-junit",
+    type=click.Path(dir_okay=False),
+    envvar="INPUT_REPORT_JUNIT",
+    help="Write step results and timings as JUnit XML",
+)
+@click.option(
+    "--slowest",
+    default=5,
+    type=click.IntRange(min=0),
+    help="Number of slowest steps to summarize, 0 to turn off",
+)
+@click.help_option()
+def merge(
+    shard_results,
+    coverage_threshold,
+    verbose,
+    output,
+    quiet,
+    report_json,
+    report_junit,
+    slowest,
+):
+    """Combine the results of every shard of a run and check coverage over them all"""
+    from src.reporter import REPORTERS, set_reporter
+    from src.validate import merge as run_merge
+
+    set_reporter(REPORTERS["quiet" if quiet else output]())
+    try:
+        run_merge(
+            shard_results,
+            report_json=report_json,
+            report_junit=report_junit,
+            coverage_threshold=coverage_threshold,
+            slowest=slowest,
+        )
+    except BaseException as e:
+        report_error(e, verbose)
+
+
+@cli.command("compile")
+@click.option(
+    "-st",
+    "--step_file",
+    required=True,
+    multiple=True,
+    type=click.STRING,
+    envvar="INPUT_STEP_FILE",
+    help="Steps file or glob pattern; may be given more than once",
+)
+@click.option(
+    "-sp", "--spec_file", required=True, type=click.STRING, envvar="INPUT_SPEC_FILE"
+)
+@click.option(
+    "--plan",
+    required=True,
+    type=click.Path(dir_okay=False),
+    envvar="INPUT_PLAN",
+    help="Path to write the plan to",
+)
+@click.option("-v", "--verbose", is_flag=True)
+@add_options(*SPEC_CACHE_OPTIONS, LAZY_REFS_OPTION)
+@click.help_option()
+def compile_plan(
+    step_file, spec_file, plan, verbose, spec_cache_dir, no_spec_cache, lazy_refs
+):
+    """Validate steps files against the spec once and write a plan to run them from"""
+    from src.validate import compile_plan as run_compile_plan
+
+    try:
+        run_compile_plan(
+            step_file,
+            spec_file,
+            plan,
+            spec_cache_dir=get_spec_cache_dir(spec_cache_dir, no_spec_cache),
+            lazy_refs=lazy_refs,
+        )
+    except BaseException as e:
+        report_error(e, verbose)
+
+
+@cli.command()
+@click.option(
+    "-st", "--step_file", required=True, type=click.STRING, envvar="INPUT_STEP_FILE"
+)
+@click.option(
+    "-sp", "--spec_file", required=True, type=click.STRING, envvar="INPUT_SPEC_FILE"
+)
+@click.option(
+    "-u", "--users", default=1, type=click.IntRange(min=1), help="Virtual users"
+)
+@click.option(
+    "-d",
+    "--duration",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Seconds to run for after ramp-up",
+)
+@click.option(
+    "-n",
+    "--iterations",
+    type=click.IntRange(min=1),
+    help="Times each user runs the steps file",
+)
+@click.option(
+    "--ramp-up",
+    default=0,
+    type=click.FloatRange(min=0),
+    help="Seconds over which the users are started",
+)
+@click.option(
+    "--sample-rate",
+    default=1.0,
+    type=click.FloatRange(min=0, max=1),
+    help="Fraction of responses validated against the spec",
+)
+@click.option("-v", "--verbose", is_flag=True)
+@add_options(*TRANSPORT_OPTIONS, *SPEC_CACHE_OPTIONS, LAZY_REFS_OPTION)
+@click.help_option()
+def bench(
+    step_file,
+    spec_file,
+    users,
+    duration,
+    iterations,
+    ramp_up,
+    sample_rate,
+    verbose,
+    connect_timeout,
+    read_timeout,
+    spec_cache_dir,
+    transport,
+    http2,
+    uds,
+    no_spec_cache,
+    lazy_refs,
+):
+    """Replay the steps file as a load test with concurrent virtual users"""
+    from src.validate import bench as run_bench
+
+    try:
+        run_bench(
+            step_file,
+            spec_file,
+            users=users,
+            duration=duration,
+            iterations=iterations,
+            ramp_up=ramp_up,
+            sample_rate=sample_rate,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            spec_cache_dir=get_spec_cache_dir(spec_cache_dir, no_spec_cache),
+            lazy_refs=lazy_refs,
+            transport=transport,
+            http2=http2,
+            uds=uds,
+        )
+    except BaseException as e:
+        report_error(e, verbose)
+
+
+@cli.command()
+@click.option(
+    "-st", "--step_file", required=True, type=click.STRING, envvar="INPUT_STEP_FILE"
+)
+@click.option(
+    "-sp", "--spec_file", required=True, type=click.STRING, envvar="INPUT_SPEC_FILE"
+)
+@click.option(
+    "-n",
+    "--cases",
+    default=100,
+    type=click.IntRange(min=1),
+    help="Generated bodies sent per step",
+)
+@click.option(
+    "--seed",
+    type=click.IntRange(min=0),
+    help="Seed the bodies are generated from; random and printed if not given",
+)
+@click.option(
+    "--invalid-ratio",
+    default=0.25,
+    type=click.FloatRange(min=0, max=1),
+    help="Share of the bodies that break a constraint of the schema",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Bodies sent at once",
+)
+@click.option(
+    "--start",
+    default=0,
+    type=click.IntRange(min=0),
+    help="Index of the first case, to send a failed case again",
+)
+@click.option("-v", "--verbose", is_flag=True)
+@add_options(*TRANSPORT_OPTIONS, *SPEC_CACHE_OPTIONS, LAZY_REFS_OPTION)
+@click.help_option()
+def fuzz(
+    step_file,
+    spec_file,
+    cases,
+    seed,
+    invalid_ratio,
+    jobs,
+    start,
+    verbose,
+    connect_timeout,
+    read_timeout,
+    transport,
+    http2,
+    uds,
+    spec_cache_dir,
+    no_spec_cache,
+    lazy_refs,
+):
+    """Send bodies generated from the request body schemas in place of the steps' own"""
+    from src.validate import fuzz as run_fuzz
+
+    try:
+        run_fuzz(
+            step_file,
+            spec_file,
+            cases=cases,
+            seed=seed,
+            invalid_ratio=invalid_ratio,
+            jobs=jobs,
+            start=start,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            spec_cache_dir=get_spec_cache_dir(spec_cache_dir, no_spec_cache),
+            lazy_refs=lazy_refs,
+            transport=transport,
+            http2=http2,
+            uds=uds,
+        )
+    except BaseException as e:
+        report_error(e, verbose)
+
+
+@cli.command()
+@click.option(
+    "-sp", "--spec_file", required=True, type=click.STRING, envvar="INPUT_SPEC_FILE"
+)
+@click.option("--host", default="127.0.0.1", help="Address to listen on")
+@click.option(
+    "--port",
+    default=8080,
+    type=click.IntRange(min=0, max=65535),
+    help="Port to listen on",
+)
+@click.option(
+    "--uds",
+    type=click.Path(dir_okay=False),
+    help="Unix domain socket to listen on instead of a port",
+)
+@click.option("-v", "--verbose", is_flag=True)
+@add_options(*SPEC_CACHE_OPTIONS)
+@click.help_option()
+def mock(spec_file, host, port, uds, verbose, spec_cache_dir, no_spec_cache):
+    """Serve an example response for every operation of the spec"""
+    from src.validate import mock as run_mock
+
+    try:
+        run_mock(
+            spec_file,
+            host=host,
+            port=port,
+            uds=uds,
+            spec_cache_dir=get_spec_cache_dir(spec_cache_dir, no_spec_cache),
+        )
+    except BaseException as e:
+        report_error(e, verbose)
 
 
-main()
+if __name__ == "__main__":
+    cli()
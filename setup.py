@@ -22,7 +22,8 @@ setup(
     url='https://github.com/Bandwidth/pypony/',
     py_modules=['pypony', 'src'],
     install_requires=requirements,
-    packages=find_packages(exclude=["test"]),
+    extras_require={"http2": ["httpx[http2]"]},
+    packages=find_packages(exclude=["test", "benchmarks"]),
     include_package_data=True,
     entry_points="""
         [console_scripts]
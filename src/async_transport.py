@@ -0,0 +1,245 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+from typing import Union
+
+import requests
+from requests.compat import chardet
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import httpx
+except ImportError as e:
+    raise ImportError(
+        "The httpx transport needs httpx, install it with: pip install pypony[http2]"
+    ) from e
+
+from .models.response import Response
+from .timing import StepTimings, current_timings
+from .transport import STREAM_CHUNK_SIZE, Transport
+
+
+class AsyncTransport(Transport):
+    """Transport on an asyncio httpx client whose event loop runs in its own thread
+
+    Steps keep running on their worker threads and hand each request to the event loop.
+    With HTTP/2, concurrent steps are multiplexed over a single connection per host
+    instead of each holding a connection of its own. httpx does not pipeline HTTP/1.1
+    requests, so without HTTP/2 concurrent requests share a pool of keep-alive
+    connections like the requests transport does.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: Union[float, None] = None,
+        read_timeout: Union[float, None] = None,
+        http2: bool = False,
+        uds: Union[str, None] = None,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self._client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                http2=http2,
+                uds=uds,
+                limits=httpx.Limits(
+                    max_connections=pool_size, max_keepalive_connections=pool_size
+                ),
+            ),
+        )
+
+        # Requests waiting on the event loop, which cancel() aborts
+        self._in_flight: set[concurrent.futures.Future] = set()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="pypony-transport", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def timeout(self) -> Union[tuple, None]:
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return self.connect_timeout, self.read_timeout
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        params: Union[dict, None],
+        headers: Union[dict, None],
+        auth: tuple[str, str],
+        body: Union[dict, list, str, None],
+        timeout: Union[tuple, None] = None,
+        stream: bool = False,
+    ) -> Response:
+        timings = current_timings()
+        try:
+            return self._run(
+                self._send(method, url, params, headers, auth, body, timeout, stream, timings),
+                cancellable=True,
+            )
+        except httpx.ConnectTimeout as e:
+            raise requests.ConnectTimeout(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise requests.ReadTimeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+
+    def cancel(self):
+        for future in list(self._in_flight):
+            future.cancel()
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coroutine, cancellable: bool = False):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        if not cancellable:
+            return future.result()
+
+        self._in_flight.add(future)
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError as e:
+            raise requests.ConnectionError("The request was cancelled") from e
+        finally:
+            self._in_flight.discard(future)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        params: Union[dict, None],
+        headers: Union[dict, None],
+        auth: tuple[str, str],
+        body: Union[dict, list, str, None],
+        timeout: Union[tuple, None],
+        stream: bool,
+        timings: Union[StepTimings, None],
+    ) -> Response:
+        connect, read = timeout or (None, None)
+        headers = httpx.Headers(headers)
+        if body is not None and not isinstance(body, str):
+            # Serialize JSON as requests does, so both transports send the same bytes
+            body = json.dumps(body, allow_nan=False)
+            headers.setdefault("Content-Type", "application/json")
+
+        request = self._client.build_request(
+            method,
+            url,
+            params=params,
+            headers=headers,
+            content=body,
+            timeout=httpx.Timeout(None, connect=connect, read=read),
+            extensions={"trace": get_trace(timings)} if timings is not None else None,
+        )
+        response = await self._client.send(request, auth=httpx.BasicAuth(*auth), stream=True)
+        response_headers = get_headers(response)
+
+        if stream:
+            # The body is read from the socket as it is consumed
+            return Response(
+                status_code=response.status_code,
+                headers=response_headers,
+                body=self._iter_body(response, timings),
+            )
+
+        started = time.perf_counter()
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        if timings is not None:
+            timings.add("body", time.perf_counter() - started)
+
+        return Response(
+            status_code=response.status_code,
+            headers=response_headers,
+            body=decode_text(content, response_headers),
+        )
+
+    def _iter_body(self, response: "httpx.Response", timings: Union[StepTimings, None]):
+        chunks = response.aiter_bytes(STREAM_CHUNK_SIZE)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = self._run(chunks.__anext__(), cancellable=True)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    if timings is not None:
+                        timings.add("body", time.perf_counter() - started)
+                yield chunk
+        finally:
+            self._run(response.aclose())
+
+
+def get_trace(timings: StepTimings):
+    """Build an httpcore trace callback that records connect, TLS and TTFB phases
+
+    httpcore resolves DNS while it connects, so DNS time is part of connect here.
+    """
+    started: dict[str, float] = {}
+
+    async def trace(event_name: str, info: dict):
+        now = time.perf_counter()
+        # Event names look like "connection.start_tls.started" or
+        # "http2.receive_response_headers.complete"
+        _, step, stage = event_name.split(".")
+        if stage == "started":
+            started[step] = now
+            return
+
+        if step in ("connect_tcp", "connect_unix_socket") and step in started:
+            timings.add("connect", now - started.pop(step))
+        elif step == "start_tls" and step in started:
+            timings.add("tls", now - started.pop(step))
+        elif step == "receive_response_headers" and "send_request_headers" in started:
+            timings.add("ttfb", now - started.pop("send_request_headers"))
+
+    return trace
+
+
+def get_headers(response: "httpx.Response") -> dict:
+    """Headers of a response as a dict, in the form the requests transport returns them
+
+    The first spelling of a header name is kept, and repeated headers are joined with
+    commas.
+    """
+    headers: dict[str, str] = {}
+    names: dict[str, str] = {}
+    for raw_name, raw_value in response.headers.raw:
+        name, value = raw_name.decode("latin-1"), raw_value.decode("latin-1")
+        if name.lower() in names:
+            headers[names[name.lower()]] += ", " + value
+        else:
+            names[name.lower()] = name
+            headers[name] = value
+    return headers
+
+
+def decode_text(content: bytes, headers: dict) -> str:
+    """Decode a body the way requests.Response.text does"""
+    if not content:
+        return ""
+
+    encoding = get_encoding_from_headers(CaseInsensitiveDict(headers))
+    if encoding is None:
+        encoding = chardet.detect(content)["encoding"] or "utf-8"
+    try:
+        return str(content, encoding, errors="replace")
+    except LookupError:
+        return str(content, errors="replace")
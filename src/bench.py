@@ -0,0 +1,264 @@
+import random
+import threading
+import time
+from typing import Union
+
+from rich.table import Table
+
+from .datasets import DatasetCycle
+from .preprocessing import Template
+from .requests import (
+    get_global_auth,
+    get_body_paths,
+    get_retained_paths,
+    run_step_request,
+)
+from .transport import Transport
+from .verify import ValidatorRegistry
+
+# Significant bits kept per recorded latency, bounding the relative error to 1/2^7
+HISTOGRAM_PRECISION_BITS = 7
+
+
+class LatencyHistogram:
+    """Latency histogram with buckets whose width grows with the value, as in HDR histograms
+
+    Values are recorded in whole microseconds. Each one is rounded down to its most
+    significant HISTOGRAM_PRECISION_BITS bits, so memory stays small no matter how many
+    samples are recorded while every percentile stays within 1% of the true value.
+    """
+
+    def __init__(self):
+        self.counts: dict[int, int] = {}
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value: int) -> int:
+        """Get the lowest value of the bucket a value falls in"""
+        shift = max(value.bit_length() - HISTOGRAM_PRECISION_BITS, 0)
+        return (value >> shift) << shift
+
+    def record(self, seconds: float):
+        """Record a latency given in seconds"""
+        value = max(int(seconds * 1_000_000), 0)
+        bucket = self.bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add the samples of another histogram to this one"""
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percentile: float) -> float:
+        """Get the latency in seconds that the given percentage of samples are at or under
+
+        Args:
+            percentile (float): Percentage between 0 and 100
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, 0 if empty
+        """
+        if self.total == 0:
+            return 0.0
+
+        rank = max(percentile / 100 * self.total, 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                # The upper bound never overstates the largest recorded value
+                width = 1 << max(bucket.bit_length() - HISTOGRAM_PRECISION_BITS, 0)
+                return min(bucket + width - 1, self.max) / 1_000_000
+        return self.max / 1_000_000
+
+
+class OperationStats:
+    """Requests, errors and latencies of one operation
+
+    A step that fails before its request is sent counts as a request and an error
+    without a latency.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latencies = LatencyHistogram()
+
+    def merge(self, other: "OperationStats"):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.latencies.merge(other.latencies)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+
+class BenchResult:
+    """Stats of a bench run, keyed by operationId in the order they were first seen
+
+    Attributes:
+        operations (dict[str, OperationStats]): Stats of every operation that was called
+        iterations (int): Times the steps file was run, including failed runs
+        elapsed (float): Wall-clock seconds the run took
+    """
+
+    def __init__(self):
+        self.operations: dict[str, OperationStats] = {}
+        self.iterations = 0
+        self.elapsed = 0.0
+
+    def operation(self, op_id: str) -> OperationStats:
+        if op_id not in self.operations:
+            self.operations[op_id] = OperationStats()
+        return self.operations[op_id]
+
+    def merge(self, other: "BenchResult"):
+        for op_id, stats in other.operations.items():
+            self.operation(op_id).merge(stats)
+        self.iterations += other.iterations
+
+    def table(self) -> Table:
+        """Summarize the run as a table with one row per operation"""
+        table = Table(title=f"{self.iterations} iterations in {self.elapsed:.2f}s")
+        table.add_column("Operation")
+        for column in ("Requests", "Req/s", "Errors", "p50", "p95", "p99", "Max"):
+            table.add_column(column, justify="right")
+
+        for op_id, stats in self.operations.items():
+            throughput = stats.requests / self.elapsed if self.elapsed else 0.0
+            table.add_row(
+                op_id,
+                str(stats.requests),
+                f"{throughput:.1f}",
+                f"{stats.errors} ({stats.error_rate:.1%})",
+                *(
+                    f"{stats.latencies.percentile(p) * 1000:.1f}ms"
+                    for p in (50, 95, 99)
+                ),
+                f"{stats.latencies.max / 1000:.1f}ms",
+            )
+        return table
+
+
+def run_bench(
+    steps_data: dict,
+    operation_schemas: dict,
+    transport: Transport,
+    validators: Union[ValidatorRegistry, None] = None,
+    users: int = 1,
+    duration: Union[float, None] = None,
+    iterations: Union[int, None] = None,
+    ramp_up: float = 0,
+    sample_rate: float = 1.0,
+    seed: Union[int, None] = None,
+) -> BenchResult:
+    """Replay the steps file with concurrent virtual users
+
+    Each virtual user runs the steps in file order, over and over, until the duration
+    has passed or it completed its iterations. A failed step ends that iteration since
+    the steps after it may depend on it. A step over a dataset sends its next row each
+    time it runs, so the users go through the dataset together. Latency only covers
+    sending the request and receiving the response, not validation.
+
+    Args:
+        steps_data (dict): The parsed steps file
+        operation_schemas (dict): Operation schemas from parse_spec_file
+        transport (Transport): Sends the requests of all users
+        validators (Union[ValidatorRegistry, None]): Compiled validators of operation_schemas
+        users (int): Number of virtual users
+        duration (Union[float, None]): Seconds to keep running for once every user
+            has started
+        iterations (Union[int, None]): Times each user runs the steps file; one if
+            neither this nor duration is given
+        ramp_up (float): Seconds over which the users are started evenly
+        sample_rate (float): Fraction of responses validated against their schema
+        seed (Union[int, None]): Seed of the validation sampling
+
+    Returns:
+        BenchResult: Stats of the run
+    """
+    if duration is None and iterations is None:
+        iterations = 1
+
+    base_url: str = steps_data["base_url"]
+    validators = validators or ValidatorRegistry(operation_schemas)
+    global_auth = get_global_auth(steps_data)
+
+    steps_list: list = steps_data["steps"]
+    templates = {s["name"]: Template(s) for s in steps_list}
+    # Each time a step over a dataset runs, it sends the next row of the dataset
+    datasets = {
+        s["name"]: DatasetCycle(s["foreach"]["dataset"], s["foreach"].get("format"))
+        for s in steps_list
+        if "foreach" in s
+    }
+    body_paths = get_body_paths(templates)
+    retained_paths = get_retained_paths(templates)
+
+    results = [BenchResult() for _ in range(users)]
+    started = time.perf_counter()
+    deadline = started + ramp_up + duration if duration is not None else None
+
+    def virtual_user(index: int):
+        result = results[index]
+        sampler = random.Random(None if seed is None else seed + index)
+
+        # Spread the users evenly over the ramp-up
+        time.sleep(ramp_up * index / users)
+
+        while iterations is None or result.iterations < iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+            result.iterations += 1
+            steps: dict = {}
+            for s in steps_list:
+                stats = result.operation(s["operation_id"])
+                stats.requests += 1
+                report = {"response": None, "messages": [], "error": None}
+                try:
+                    data = None
+                    if s["name"] in datasets:
+                        data = datasets[s["name"]].next_row()
+                    run_step_request(
+                        s,
+                        steps,
+                        base_url,
+                        global_auth,
+                        operation_schemas,
+                        transport,
+                        report,
+                        validators,
+                        templates[s["name"]],
+                        body_paths.get(s["name"], []),
+                        verify=sampler.random() < sample_rate,
+                        retained_paths=retained_paths.get(s["name"], []),
+                        data=data,
+                    )
+                except Exception:
+                    stats.errors += 1
+                    break
+                finally:
+                    if report.get("elapsed") is not None:
+                        stats.latencies.record(report["elapsed"])
+
+    threads = [
+        threading.Thread(target=virtual_user, args=(index,), daemon=True)
+        for index in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = BenchResult()
+    for result in results:
+        total.merge(result)
+    total.elapsed = time.perf_counter() - started
+    return total
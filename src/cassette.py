@@ -0,0 +1,246 @@
+import base64
+import gzip
+import hashlib
+import json
+import threading
+from collections import deque
+from typing import Iterable, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from .errors import CassetteMismatchError
+from .models.response import Response
+from .transport import STREAM_CHUNK_SIZE, Transport
+
+# Header and query parameter names whose values are never written to a cassette
+SENSITIVE_NAMES = ["auth", "cookie", "token", "secret", "password", "api-key", "apikey"]
+
+SCRUBBED = "[scrubbed]"
+
+
+def is_sensitive(name: str) -> bool:
+    name = name.lower().replace("_", "-")
+    return any(part in name for part in SENSITIVE_NAMES)
+
+
+def scrub_headers(headers: Union[dict, None]) -> dict:
+    """Replace the values of credential headers such as Authorization and Cookie"""
+    return {
+        name: SCRUBBED if is_sensitive(name) else value
+        for name, value in (headers or {}).items()
+    }
+
+
+def get_query(url: str, params: Union[dict, None]) -> list[list[str]]:
+    """Collect the query parameters of a request, scrubbed and sorted
+
+    Args:
+        url (str): URL, which may have a query string of its own
+        params (Union[dict, None]): Query parameters sent along with the URL
+
+    Returns:
+        list[list[str]]: [name, value] pairs
+    """
+    pairs = parse_qsl(urlsplit(url).query, keep_blank_values=True)
+    for name, value in (params or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        pairs.extend((str(name), str(item)) for item in values if item is not None)
+    return sorted(
+        [name, SCRUBBED if is_sensitive(name) else value] for name, value in pairs
+    )
+
+
+def get_body_hash(body: Union[dict, list, str, None]) -> str:
+    """Hash a request body; JSON bodies are hashed by content, not key order"""
+    if body is None:
+        data = b""
+    elif isinstance(body, str):
+        data = body.encode("utf-8")
+    else:
+        data = json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_match_key(
+    method: str, url: str, params: Union[dict, None], body: Union[dict, list, str, None]
+) -> tuple:
+    """What a replayed request has to have in common with a recorded one
+
+    The host is left out so a cassette can be replayed against any base URL.
+    """
+    return (
+        method.upper(),
+        urlsplit(url).path,
+        json.dumps(get_query(url, params)),
+        get_body_hash(body),
+    )
+
+
+def encode_body(body: Union[str, bytes], compress: bool) -> dict:
+    """Store a body as text where possible, and gzipped and base64 encoded if asked"""
+    if compress:
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        return {"body_gzip": base64.b64encode(gzip.compress(data)).decode("ascii")}
+    if isinstance(body, bytes):
+        try:
+            return {"body": body.decode("utf-8")}
+        except UnicodeDecodeError:
+            return {"body_base64": base64.b64encode(body).decode("ascii")}
+    return {"body": body}
+
+
+def decode_body(entry: dict) -> bytes:
+    """Get the recorded body of a response entry as bytes"""
+    if "body_gzip" in entry:
+        return gzip.decompress(base64.b64decode(entry["body_gzip"]))
+    if "body_base64" in entry:
+        return base64.b64decode(entry["body_base64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+class RecordingTransport(Transport):
+    """Transport that writes every exchange of another transport to a JSONL cassette
+
+    One JSON object is written per exchange, as soon as its response body has been
+    read, so a cassette can be read while it is recorded. Basic auth is never
+    recorded, and the values of credential headers and query parameters are
+    scrubbed. A streamed body is recorded as far as it was read.
+    """
+
+    def __init__(self, transport: Transport, path: str, compress: bool = False):
+        self.transport = transport
+        self.compress = compress
+        self._file = open(path, "w")
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> Union[tuple, None]:
+        return self.transport.timeout
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        params: Union[dict, None],
+        headers: Union[dict, None],
+        auth: tuple[str, str],
+        body: Union[dict, list, str, None],
+        timeout: Union[tuple, None] = None,
+        stream: bool = False,
+    ) -> Response:
+        response = self.transport.send(
+            method, url, params, headers, auth, body, timeout=timeout, stream=stream
+        )
+
+        request = {
+            "method": method.upper(),
+            "path": urlsplit(url).path,
+            "query": get_query(url, params),
+            "headers": scrub_headers(headers),
+            "body_sha256": get_body_hash(body),
+        }
+        if not stream:
+            self._write(request, response, response.body)
+            return response
+
+        return Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            body=self._tee(request, response),
+        )
+
+    def _tee(self, request: dict, response: Response):
+        chunks = []
+        try:
+            for chunk in response.body:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            if hasattr(response.body, "close"):
+                response.body.close()
+            self._write(request, response, b"".join(chunks))
+
+    def _write(self, request: dict, response: Response, body: Union[str, bytes]):
+        entry = {
+            "request": request,
+            "response": {
+                "status_code": response.status_code,
+                "headers": scrub_headers(response.headers),
+                **encode_body(body, self.compress),
+            },
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def warm(self, urls: Iterable[str]):
+        self.transport.warm(urls)
+
+    def cancel(self):
+        self.transport.cancel()
+
+    def close(self):
+        self.transport.close()
+        with self._lock:
+            self._file.close()
+
+
+class ReplayTransport(Transport):
+    """Transport that answers requests from a cassette without touching the network
+
+    Requests are matched on method, path, query and a hash of the body. Identical
+    requests get the recorded responses in the order they were recorded, and the
+    last one once those run out.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._exchanges: dict[tuple, deque] = {}
+        self._lock = threading.Lock()
+
+        with open(path, "r") as cassette:
+            for line in cassette:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                request = entry["request"]
+                key = (
+                    request["method"],
+                    request["path"],
+                    json.dumps(request["query"]),
+                    request["body_sha256"],
+                )
+                self._exchanges.setdefault(key, deque()).append(entry["response"])
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        params: Union[dict, None],
+        headers: Union[dict, None],
+        auth: tuple[str, str],
+        body: Union[dict, list, str, None],
+        timeout: Union[tuple, None] = None,
+        stream: bool = False,
+    ) -> Response:
+        key = get_match_key(method, url, params, body)
+        with self._lock:
+            responses = self._exchanges.get(key)
+            if not responses:
+                raise CassetteMismatchError(
+                    self.path, key, [k for k in self._exchanges if k[:2] == key[:2]]
+                )
+            entry = responses.popleft() if len(responses) > 1 else responses[0]
+
+        data = decode_body(entry)
+        if stream:
+            chunks = (
+                data[i : i + STREAM_CHUNK_SIZE]
+                for i in range(0, len(data), STREAM_CHUNK_SIZE)
+            )
+            return Response(entry["status_code"], dict(entry["headers"]), chunks)
+        return Response(
+            entry["status_code"],
+            dict(entry["headers"]),
+            data.decode("utf-8", errors="replace"),
+        )
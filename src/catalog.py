@@ -0,0 +1,158 @@
+import re
+from typing import Iterable, Union
+
+from .errors import UnsupportedSchemaError
+
+# Keys of a path item that hold operations, as opposed to "parameters", "summary", etc.
+HTTP_METHODS = {"get", "put", "post", "delete", "options", "head", "patch", "trace"}
+
+SUPPORTED_CONTENT_TYPES = ["application/json", "application/octet-stream"]
+
+
+class OperationCatalog:
+    """Hash indexes over the operations of an OpenAPI spec, built once per spec
+
+    Attributes:
+        operations (dict[str, dict]): Operation objects keyed by operationId
+        routes (dict[tuple[str, str], str]): operationIds keyed by (METHOD, path template)
+        tags (dict[str, set[str]]): operationIds keyed by tag
+    """
+
+    def __init__(self, spec: dict):
+        self.operations: dict[str, dict] = {}
+        self.routes: dict[tuple[str, str], str] = {}
+        self.tags: dict[str, set[str]] = {}
+
+        self._locations: dict[str, tuple[str, str]] = {}
+        self._schemas: dict[str, dict] = {}
+        self._templates: Union[dict[tuple[str, int], list], None] = None
+
+        for path, path_item in spec["paths"].items():
+            for method, operation in path_item.items():
+                if method.lower() not in HTTP_METHODS or "operationId" not in operation:
+                    continue
+
+                op_id = operation["operationId"]
+                self.operations[op_id] = operation
+                self.routes[(method.upper(), path)] = op_id
+                self._locations[op_id] = (method.upper(), path)
+                for tag in operation.get("tags", []):
+                    self.tags.setdefault(tag, set()).add(op_id)
+
+    @property
+    def operation_ids(self) -> set[str]:
+        """Every operationId in the spec"""
+        return set(self.operations)
+
+    def __contains__(self, op_id: str) -> bool:
+        return op_id in self.operations
+
+    def operation(self, op_id: str) -> dict:
+        """Get the operation object of an operationId"""
+        return self.operations[op_id]
+
+    def route(self, op_id: str) -> tuple[str, str]:
+        """Get the (METHOD, path template) of an operation"""
+        return self._locations[op_id]
+
+    def match(self, method: str, path: str) -> Union[str, None]:
+        """Find the operation that serves a concrete request path such as /person/1
+
+        Args:
+            method (str): HTTP method of the request
+            path (str): Request path, without query string
+
+        Returns:
+            Union[str, None]: operationId of the matching operation, or None
+        """
+        method = method.upper()
+        if (method, path) in self.routes:
+            return self.routes[(method, path)]
+
+        if self._templates is None:
+            # Only templated paths need a regex, grouped by segment count to keep scans short
+            templates: dict[tuple[str, int], list] = {}
+            for (route_method, template), op_id in self.routes.items():
+                if "{" not in template:
+                    continue
+                pattern = re.compile(
+                    "^"
+                    + re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(template))
+                    + "$"
+                )
+                key = (route_method, template.count("/"))
+                templates.setdefault(key, []).append((pattern, op_id))
+            self._templates = templates
+
+        for pattern, op_id in self._templates.get((method, path.count("/")), []):
+            if pattern.match(path):
+                return op_id
+        return None
+
+    def schemas(self, op_id: str) -> dict:
+        """Get the request body and response schemas of an operation
+
+        Args:
+            op_id (str): operationId of the operation
+
+        Raises:
+            UnsupportedSchemaError: Schema not supported
+
+        Returns:
+            dict: The "requestBody" schema, if any, and the "responses" schemas keyed by
+                status code. Responses without content map to the response object itself.
+        """
+        if op_id in self._schemas:
+            return self._schemas[op_id]
+
+        operation = self.operation(op_id)
+        schemas: dict = {}
+
+        # Parse and Validate Request Bodies
+        if "requestBody" in operation.keys():
+            schemas["requestBody"] = _get_content_schema(
+                operation["requestBody"]["content"], "request body", op_id
+            )
+
+        # Parse and Validate Response Bodies
+        schemas["responses"] = {}
+        for status_code, response in operation["responses"].items():
+            if "content" in response.keys():
+                schemas["responses"][status_code] = _get_content_schema(
+                    response["content"], "response body", op_id
+                )
+            else:
+                schemas["responses"][status_code] = response
+
+        self._schemas[op_id] = schemas
+        return schemas
+
+    def operation_schemas(self, op_ids: Iterable[str]) -> dict:
+        """Get the schemas of the given operations that are documented in the spec
+
+        Args:
+            op_ids (Iterable[str]): operationIds to look up
+
+        Returns:
+            dict: Schemas as returned by schemas, keyed by operationId
+        """
+        return {
+            op_id: self.schemas(op_id) for op_id in dict.fromkeys(op_ids) if op_id in self
+        }
+
+
+def _get_content_schema(content: dict, kind: str, op_id: str) -> dict:
+    # TODO: Support multiple content types if one of them is JSON
+    if len(content) > 1 and "application/json" not in content:
+        raise UnsupportedSchemaError(
+            f"There are too many {kind} content types for the operation: {op_id}"
+        )
+
+    for content_type in SUPPORTED_CONTENT_TYPES:
+        if content_type in content:
+            return content[content_type]["schema"]
+
+    raise UnsupportedSchemaError(
+        f"{kind} content type: {list(content.keys())[0]}"
+        f" unsupported for the operation: {op_id}"
+    )
@@ -0,0 +1,100 @@
+import csv
+import json
+import os
+import threading
+from typing import Iterator, Union
+
+from .errors import DatasetError
+
+# Dataset formats keyed by the file extensions they are recognized by
+DATASET_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def get_dataset_format(path: str, dataset_format: Union[str, None] = None) -> str:
+    """Get the format of a dataset, from its file extension unless it is given
+
+    Raises:
+        ValueError: The extension is not one of DATASET_FORMATS
+    """
+    if dataset_format is not None:
+        return dataset_format
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in DATASET_FORMATS:
+        raise ValueError(
+            f"Cannot tell the format of dataset {path}; give its format as csv or jsonl"
+        )
+    return DATASET_FORMATS[extension]
+
+
+def read_dataset(
+    path: str, dataset_format: Union[str, None] = None
+) -> Iterator[dict]:
+    """Read the rows of a dataset one at a time
+
+    Rows are read as they are asked for, so a dataset of any size takes the memory of
+    a single row. CSV rows map the columns of the header line to strings. JSON Lines
+    rows are JSON objects, one per line, and keep their JSON types.
+
+    Args:
+        path (str): CSV or JSON Lines file
+        dataset_format (Union[str, None]): "csv" or "jsonl", or None to tell from the
+            file extension
+
+    Raises:
+        FileNotFoundError: Dataset not found
+        DatasetError: A line is not a JSON object
+
+    Yields:
+        dict: Each row, in file order
+    """
+    dataset_format = get_dataset_format(path, dataset_format)
+    try:
+        dataset = open(path, "r", newline="" if dataset_format == "csv" else None)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Dataset {path} not found") from e
+
+    with dataset:
+        if dataset_format == "csv":
+            yield from csv.DictReader(dataset)
+            return
+
+        for line_number, line in enumerate(dataset, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.decoder.JSONDecodeError as e:
+                raise DatasetError(path, e.msg, line_number) from e
+            if not isinstance(row, dict):
+                raise DatasetError(path, "a row must be a JSON object", line_number)
+            yield row
+
+
+class DatasetCycle:
+    """Rows of a dataset handed out one at a time across threads, round and round
+
+    Only the row being handed out is held in memory, so the dataset is read again each
+    time it is gone through.
+    """
+
+    def __init__(self, path: str, dataset_format: Union[str, None] = None):
+        self.path = path
+        self.dataset_format = dataset_format
+        self._rows: Union[Iterator[dict], None] = None
+        self._lock = threading.Lock()
+
+    def next_row(self) -> dict:
+        """Get the row after the one handed out last
+
+        Raises:
+            DatasetError: The dataset has no rows
+        """
+        with self._lock:
+            for _ in range(2):
+                if self._rows is None:
+                    self._rows = read_dataset(self.path, self.dataset_format)
+                row = next(self._rows, None)
+                if row is not None:
+                    return row
+                self._rows = None
+            raise DatasetError(self.path, "it has no rows")
@@ -1,4 +1,4 @@
-from rich import print
+from typing import Union
 
 # TODO: Extend jsonschema.ValidationError class
 
@@ -10,10 +10,9 @@ class UndocumentedOperationError(BaseException):
     """
 
     def __init__(self, undocumented: set[str]):
+        self.undocumented = undocumented
         super().__init__(
-            print(
-                f"The following operations from the steps file are undocumented: [bold red]{undocumented}[/bold red]"
-            )
+            f"The following operations from the steps file are undocumented: {undocumented}"
         )
 
 
@@ -26,12 +25,12 @@ class InsufficientCoverageError(BaseException):
     def __init__(
         self, achieved_coverage: float, target_coverage: float, uncovered: set[str]
     ):
+        self.achieved_coverage = achieved_coverage
+        self.target_coverage = target_coverage
+        self.uncovered = uncovered
         super().__init__(
-            print(
-                f"""The operation coverage is [bold red]{achieved_coverage}[/bold red]
-but the target is [green]{target_coverage}[/green].\n
-The following operations are uncovered: [bold red]{uncovered}[/bold red]"""
-            )
+            f"The operation coverage is {achieved_coverage} but the target is "
+            f"{target_coverage}.\nThe following operations are uncovered: {uncovered}"
         )
 
 
@@ -42,20 +41,18 @@ class InvalidFileError(BaseException):
 
     def __init__(self, extension):
         super().__init__(
-            print(
-                f"Incorrect type for the API Spec file. Only [green]JSON[/green] and [green]YAML[/green] are supported. [bold red]{extension}[/bold red] supplied."
-            )
+            f"Incorrect type for the API Spec file. Only JSON and YAML are supported. {extension} supplied."
         )
 
 
 class BaseContextError(Exception):
     """
-    Raises when the base context of an expression is not either "env" or "steps".
+    Raises when the base context of an expression is not "env", "steps" or "data".
     """
 
     def __init__(self, value):
         super().__init__(
-            f"The base context must be either 'env' or 'steps', but found [bold red]'{value}'[/bold red]"
+            f"The base context must be 'env', 'steps' or 'data', but found [bold red]'{value}'[/bold red]"
         )
 
 
@@ -98,3 +95,135 @@ class UnsupportedSchemaError(Exception):
             f"- application/json\n"
             f"- application/octet-stream"
         )
+
+
+class StepFileFailuresError(Exception):
+    """
+    Raised after a batch run when one or more of its steps files failed.
+    """
+
+    def __init__(self, failures: dict, total: int):
+        self.failures = failures
+        lines = "\n".join(f"- {path}: {error}" for path, error in failures.items())
+        super().__init__(f"{len(failures)} of {total} steps files failed:\n{lines}")
+
+
+class DeadlineExceededError(Exception):
+    """
+    Raised when the run deadline passes before a step's request could be completed.
+    """
+
+    def __init__(self):
+        super().__init__("The run deadline was exceeded")
+
+
+class StepFailuresError(Exception):
+    """
+    Raised after a run that kept going past failed steps when more than one step failed.
+    """
+
+    def __init__(self, failures: dict, total: int):
+        self.failures = failures
+        lines = "\n".join(f"- {name}: {error}" for name, error in failures.items())
+        super().__init__(f"{len(failures)} of {total} steps failed:\n{lines}")
+
+
+class SkippedStepError(Exception):
+    """
+    Stands in for the result of a step that was not run because a step it depends on did not pass.
+    """
+
+    def __init__(self, name: str, dependencies: set[str]):
+        self.name = name
+        self.dependencies = dependencies
+        super().__init__(
+            f"Step {name} depends on steps that did not pass: {', '.join(sorted(dependencies))}"
+        )
+
+
+class StepCancelledError(Exception):
+    """
+    Raised by the steps that were cancelled when another step failed in fail-fast mode.
+    """
+
+    def __init__(self):
+        super().__init__("The step was cancelled after another step failed")
+
+
+class CassetteMismatchError(Exception):
+    """
+    Raised in replay mode when a request matches none of the exchanges recorded in the cassette.
+    """
+
+    def __init__(self, path: str, key: tuple, candidates: list[tuple]):
+        method, request_path, query, body_hash = key
+        message = (
+            f"No exchange in cassette {path} matches {method} {request_path} "
+            f"with query {query} and body sha256 {body_hash[:12]}"
+        )
+        if candidates:
+            recorded = "\n".join(
+                f"- query {c[2]} and body sha256 {c[3][:12]}" for c in candidates
+            )
+            message += f"\nRecorded for {method} {request_path}:\n{recorded}"
+        else:
+            message += f"\nNothing was recorded for {method} {request_path}"
+        super().__init__(message)
+
+
+class PlanMismatchError(Exception):
+    """
+    Raised when a compiled plan cannot be run as it is, such as when its sources changed since it was compiled.
+    """
+
+    def __init__(self, path: str, reason: str):
+        super().__init__(f"Plan {path} is out of date, as {reason}. Compile it again.")
+
+
+class DatasetError(Exception):
+    """
+    Raised when a row of a step's dataset cannot be read.
+    """
+
+    def __init__(self, path: str, reason: str, line: Union[int, None] = None):
+        self.path = path
+        self.line = line
+        location = f" at line {line}" if line is not None else ""
+        super().__init__(f"Dataset {path} is invalid{location}: {reason}")
+
+
+class DatasetFailuresError(Exception):
+    """
+    Raised when rows of a step that runs over a dataset failed.
+    """
+
+    def __init__(self, name: str, failed: int, total: int, first: Exception):
+        self.failed = failed
+        self.total = total
+        super().__init__(
+            f"{failed} of {total} rows of step {name} failed. "
+            f"The first failure: {first}"
+        )
+
+
+class FuzzFailuresError(Exception):
+    """
+    Raised after a fuzz run when the API answered generated bodies wrongly.
+    """
+
+    def __init__(self, failed: int, total: int, seed: int):
+        self.failed = failed
+        self.total = total
+        super().__init__(
+            f"{failed} of {total} generated bodies got a wrong response. "
+            f"Run again with --seed {seed} to send the same bodies."
+        )
+
+
+class ShardMergeError(Exception):
+    """
+    Raised when shard results cannot be merged into the results of a whole run.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(f"The shard results cannot be merged: {reason}")
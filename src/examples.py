@@ -0,0 +1,621 @@
+import math
+import random
+import re
+import string
+from functools import lru_cache
+from typing import Union
+
+# Values for the string formats that a fixed placeholder would not satisfy
+FORMAT_EXAMPLES = {
+    "date-time": "2024-01-01T00:00:00Z",
+    "date": "2024-01-01",
+    "time": "00:00:00Z",
+    "duration": "P1D",
+    "email": "pony@example.com",
+    "idn-email": "pony@example.com",
+    "hostname": "example.com",
+    "idn-hostname": "example.com",
+    "ipv4": "127.0.0.1",
+    "ipv6": "::1",
+    "uri": "https://example.com",
+    "uri-reference": "https://example.com",
+    "iri": "https://example.com",
+    "iri-reference": "https://example.com",
+    "url": "https://example.com",
+    "uuid": "00000000-0000-4000-8000-000000000000",
+    "byte": "cG9ueQ==",
+    "regex": ".*",
+}
+
+
+def generate_example(
+    schema: Union[dict, bool], ancestors: Union[set[int], None] = None
+) -> any:
+    """Generate a value that is valid against a resolved schema
+
+    Examples, defaults, consts and enums in the schema are used as they are. Otherwise
+    the smallest value that meets the constraints is built, so the same schema always
+    gives the same example. Recursive schemas are cut short by leaving out optional
+    properties and array items that would recurse.
+
+    Args:
+        schema (Union[dict, bool]): Schema with its $refs resolved
+        ancestors (Union[set[int], None]): ids of the schemas being generated above
+
+    Returns:
+        any: An instance of the schema
+    """
+    if not isinstance(schema, dict):
+        return None
+    if ancestors is None:
+        ancestors = set()
+
+    if "const" in schema:
+        return schema["const"]
+    if "example" in schema:
+        return schema["example"]
+    if isinstance(schema.get("examples"), list) and schema["examples"]:
+        return schema["examples"][0]
+    if "default" in schema:
+        return schema["default"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+
+    ancestors.add(id(schema))
+    try:
+        if "allOf" in schema:
+            return _generate_all_of(schema, ancestors)
+        for keyword in ("oneOf", "anyOf"):
+            if schema.get(keyword):
+                return generate_example(_pick_subschema(schema[keyword]), ancestors)
+        return _generate_type(schema, _get_type(schema), ancestors)
+    finally:
+        ancestors.discard(id(schema))
+
+
+def _get_type(schema: dict) -> Union[str, None]:
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        # Prefer a value over null when the type is nullable
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+    if schema_type is None:
+        if "properties" in schema or "required" in schema:
+            return "object"
+        if "items" in schema:
+            return "array"
+    return schema_type
+
+
+def _pick_subschema(subschemas: list) -> dict:
+    for subschema in subschemas:
+        if isinstance(subschema, dict) and subschema.get("type") != "null":
+            return subschema
+    return subschemas[0]
+
+
+def _generate_all_of(schema: dict, ancestors: set[int]) -> any:
+    # Objects are merged; for anything else the first constrained subschema wins
+    rest = {key: value for key, value in schema.items() if key != "allOf"}
+    values = [generate_example(s, ancestors) for s in schema["allOf"] + [rest]]
+    if all(isinstance(value, dict) or value is None for value in values):
+        merged = {}
+        for value in values:
+            merged.update(value or {})
+        return merged
+    return next(value for value in values if value is not None)
+
+
+def _generate_type(
+    schema: dict, schema_type: Union[str, None], ancestors: set[int]
+) -> any:
+    if schema_type == "object":
+        return _generate_object(schema, ancestors)
+    if schema_type == "array":
+        return _generate_array(schema, ancestors)
+    if schema_type == "string":
+        return _generate_string(schema)
+    if schema_type in ("integer", "number"):
+        return _generate_number(schema, schema_type == "integer")
+    if schema_type == "boolean":
+        return True
+    return None
+
+
+def _is_recursive(schema: any, ancestors: set[int]) -> bool:
+    return isinstance(schema, dict) and id(schema) in ancestors
+
+
+def _generate_object(schema: dict, ancestors: set[int]) -> dict:
+    required = set(schema.get("required", []))
+    value = {}
+    for name, subschema in schema.get("properties", {}).items():
+        if _is_recursive(subschema, ancestors):
+            if name in required:
+                value[name] = None
+            continue
+        value[name] = generate_example(subschema, ancestors)
+
+    # Required properties that are not described can hold anything
+    for name in required:
+        value.setdefault(name, "value")
+    return value
+
+
+def _generate_array(schema: dict, ancestors: set[int]) -> list:
+    items = schema.get("items", {})
+    if _is_recursive(items, ancestors):
+        return []
+
+    prefix = schema.get("prefixItems", [])
+    count = max(schema.get("minItems", 1), len(prefix))
+    if "maxItems" in schema:
+        count = min(count, schema["maxItems"])
+
+    value = [generate_example(s, ancestors) for s in prefix[:count]]
+    while len(value) < count:
+        item = generate_example(items, ancestors)
+        if schema.get("uniqueItems") and isinstance(item, (int, float)):
+            item = item + len(value)
+        elif schema.get("uniqueItems") and isinstance(item, str):
+            item = f"{item}{len(value)}" if value else item
+        value.append(item)
+    return value
+
+
+def _generate_string(schema: dict) -> str:
+    if "pattern" in schema:
+        try:
+            value = generate_from_pattern(
+                schema["pattern"],
+                min_length=schema.get("minLength", 0),
+                max_length=schema.get("maxLength"),
+            )
+        except (ValueError, TypeError, RecursionError):
+            value = "string"
+        else:
+            return value
+
+    value = FORMAT_EXAMPLES.get(schema.get("format"), "string")
+    min_length = schema.get("minLength", 0)
+    if len(value) < min_length:
+        value += "x" * (min_length - len(value))
+    if "maxLength" in schema:
+        value = value[: schema["maxLength"]]
+    return value
+
+
+def get_number_bounds(
+    schema: dict, integer: bool
+) -> tuple[Union[int, float, None], Union[int, float, None]]:
+    """Get the lowest and highest numbers a schema allows, exclusive bounds included
+
+    Args:
+        schema (dict): Schema of an integer or a number
+        integer (bool): Whether the schema is of an integer
+
+    Returns:
+        tuple[Union[int, float, None], Union[int, float, None]]: Inclusive bounds,
+            None where there is none. A number just inside an exclusive bound is
+            taken to be half a unit away from it.
+    """
+    low, high = schema.get("minimum"), schema.get("maximum")
+
+    # OpenAPI 3.0 uses booleans for the exclusive bounds, 3.1 uses numbers
+    step = 1 if integer else 0.5
+    exclusive_min = schema.get("exclusiveMinimum")
+    if exclusive_min is True and low is not None:
+        low += step
+    elif type(exclusive_min) in (int, float):
+        low = exclusive_min + step if low is None else max(low, exclusive_min + step)
+    exclusive_max = schema.get("exclusiveMaximum")
+    if exclusive_max is True and high is not None:
+        high -= step
+    elif type(exclusive_max) in (int, float):
+        high = exclusive_max - step if high is None else min(high, exclusive_max - step)
+    return low, high
+
+
+def _generate_number(schema: dict, integer: bool) -> Union[int, float]:
+    low, high = get_number_bounds(schema, integer)
+
+    value = 1 if low is None else low
+    if high is not None and value > high:
+        value = high
+
+    multiple = schema.get("multipleOf")
+    if multiple:
+        value = math.ceil(value / multiple) * multiple
+        if high is not None and value > high:
+            value -= multiple
+
+    if integer:
+        return int(math.ceil(value))
+    return float(value)
+
+
+def generate_from_pattern(
+    pattern: str,
+    rng: Union[random.Random, None] = None,
+    min_length: int = 0,
+    max_length: Union[int, None] = None,
+) -> str:
+    """Build a short string that matches a regular expression
+
+    The string is made as long as minLength and maxLength ask for when the pattern
+    allows it. A pattern that is not anchored at its end is padded to min_length.
+
+    Args:
+        pattern (str): ECMA 262 style pattern, as JSON Schema uses
+        rng (Union[random.Random, None]): Picks lengths, branches and characters at
+            random when given. Otherwise the shortest string is built.
+        min_length (int): minLength of the string
+        max_length (Union[int, None]): maxLength of the string
+
+    Raises:
+        ValueError: The pattern is invalid or uses a construct that cannot be generated
+
+    Returns:
+        str: A matching string
+    """
+    node = parse_pattern(pattern)
+
+    low = max(node.min_length, min_length)
+    high = _min_bound(node.max_length, max_length)
+    if high is not None and low > high:
+        # Out of reach; the pattern wins over the length
+        low = high = node.min_length
+    target = low
+    if rng:
+        target = rng.randint(low, _min_bound(high, low + MAX_EXTRA_PATTERN_LENGTH))
+
+    value = _generate_node(node, target, rng)
+    if len(value) < min_length and not _is_end_anchored(pattern):
+        value += "x" * (min_length - len(value))
+    return value
+
+
+# Characters picked from for the classes of a pattern, such as \d; the first one is
+# picked when the string is not random
+CATEGORY_CHARACTERS = {
+    "d": string.digits,
+    "D": string.ascii_letters + "-_.",
+    "s": " ",
+    "S": string.ascii_letters + string.digits,
+    "w": string.ascii_letters + string.digits + "_",
+    "W": "-.@ ",
+}
+
+# Characters that the negated classes of a pattern, such as [^abc], pick from
+NEGATED_CLASS_CHARACTERS = string.ascii_lowercase + string.digits + "-_.@ "
+
+# Characters that escapes outside of a character class stand for
+ESCAPED_CHARACTERS = {"n": "\n", "r": "\r", "t": "\t", "f": "\f", "v": "\v", "0": "\0"}
+
+QUANTIFIER_PATTERN = re.compile(r"\{(\d+)(,(\d*))?\}")
+
+# Characters added at random beyond the shortest string a pattern allows
+MAX_EXTRA_PATTERN_LENGTH = 8
+
+
+class PatternNode:
+    """Part of a parsed pattern, along with the lengths of the strings it matches
+
+    Attributes:
+        kind (str): "chars", "any", "empty", "sequence", "branch" or "repeat"
+        children (list[PatternNode]): Parts of a sequence, branches, or what repeats
+        items (list[tuple]): ("range", first, last) and ("category", letter) items of
+            a character class
+        negated (bool): Whether the character class is negated
+        low (int): Least number of repetitions
+        high (Union[int, None]): Most repetitions, None for no limit
+        min_length (int): Length of the shortest matching string
+        max_length (Union[int, None]): Length of the longest one, None for no limit
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        children: Union[list["PatternNode"], None] = None,
+        items: Union[list[tuple], None] = None,
+        negated: bool = False,
+        low: int = 1,
+        high: Union[int, None] = 1,
+    ):
+        self.kind = kind
+        self.children = children or []
+        self.items = items or []
+        self.negated = negated
+        self.low = low
+        self.high = high
+
+        if kind in ("chars", "any"):
+            self.min_length, self.max_length = 1, 1
+        elif kind == "empty":
+            self.min_length, self.max_length = 0, 0
+        elif kind == "sequence":
+            self.min_length = sum(child.min_length for child in self.children)
+            self.max_length = _sum_bounds(child.max_length for child in self.children)
+        elif kind == "branch":
+            self.min_length = min(child.min_length for child in self.children)
+            self.max_length = _max_bound(child.max_length for child in self.children)
+        else:
+            child = self.children[0]
+            self.min_length = low * child.min_length
+            if child.max_length == 0:
+                self.max_length = 0
+            elif high is None or child.max_length is None:
+                self.max_length = None
+            else:
+                self.max_length = high * child.max_length
+
+
+@lru_cache(maxsize=256)
+def parse_pattern(pattern: str) -> PatternNode:
+    """Parse an ECMA 262 style pattern into PatternNodes
+
+    Lookarounds, anchors and word boundaries match no characters, so they are kept
+    as empty nodes and not checked. Backreferences, inline flags and Unicode property
+    escapes are not supported.
+
+    Raises:
+        ValueError: The pattern is invalid or uses a construct that is not supported
+
+    Returns:
+        PatternNode: The root of the parsed pattern
+    """
+    parser = _PatternParser(pattern)
+    node = parser.parse_branches()
+    if parser.position < len(pattern):
+        raise ValueError(f"Unbalanced parenthesis in pattern: {pattern}")
+    return node
+
+
+class _PatternParser:
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.position = 0
+
+    def peek(self) -> str:
+        return self.pattern[self.position : self.position + 1]
+
+    def take(self) -> str:
+        if self.position >= len(self.pattern):
+            raise ValueError(f"Unexpected end of pattern: {self.pattern}")
+        self.position += 1
+        return self.pattern[self.position - 1]
+
+    def parse_branches(self) -> PatternNode:
+        branches = [self.parse_sequence()]
+        while self.peek() == "|":
+            self.position += 1
+            branches.append(self.parse_sequence())
+        return branches[0] if len(branches) == 1 else PatternNode("branch", branches)
+
+    def parse_sequence(self) -> PatternNode:
+        parts = []
+        while self.peek() not in ("", "|", ")"):
+            parts.append(self.parse_quantifier(self.parse_atom()))
+        return PatternNode("sequence", parts)
+
+    def parse_atom(self) -> PatternNode:
+        char = self.take()
+        if char == "(":
+            return self.parse_group()
+        if char == "[":
+            return self.parse_class()
+        if char == ".":
+            return PatternNode("any")
+        if char in "^$":
+            return PatternNode("empty")
+        if char in "*+?":
+            raise ValueError(f"Nothing to repeat in pattern: {self.pattern}")
+        if char == "\\":
+            return self.parse_escape()
+        return _literal(char)
+
+    def parse_quantifier(self, node: PatternNode) -> PatternNode:
+        char = self.peek()
+        if char in ("*", "+", "?"):
+            self.position += 1
+            low, high = {"*": (0, None), "+": (1, None), "?": (0, 1)}[char]
+        else:
+            match = QUANTIFIER_PATTERN.match(self.pattern, self.position)
+            if char != "{" or match is None:
+                # A brace that does not start a quantifier is a literal
+                return node
+            self.position = match.end()
+            low = int(match.group(1))
+            high = low if match.group(2) is None else int(match.group(3) or 0) or None
+            if high is not None and high < low:
+                raise ValueError(f"Invalid quantifier in pattern: {self.pattern}")
+
+        # Lazy and possessive quantifiers match the same strings
+        if self.peek() in ("?", "+"):
+            self.position += 1
+        return PatternNode("repeat", [node], low=low, high=high)
+
+    def parse_group(self) -> PatternNode:
+        lookaround = False
+        if self.pattern.startswith("?", self.position):
+            for prefix in ("?:", "?=", "?!", "?<=", "?<!", "?<", "?P<"):
+                if self.pattern.startswith(prefix, self.position):
+                    break
+            else:
+                raise ValueError(f"Unsupported group in pattern: {self.pattern}")
+            self.position += len(prefix)
+            lookaround = prefix in ("?=", "?!", "?<=", "?<!")
+            if prefix.endswith("<") and not lookaround:
+                # Skip the name of a named group
+                self.position = self.pattern.index(">", self.position) + 1
+
+        node = self.parse_branches()
+        if self.take() != ")":
+            raise ValueError(f"Unbalanced parenthesis in pattern: {self.pattern}")
+        return PatternNode("empty") if lookaround else node
+
+    def parse_escape(self) -> PatternNode:
+        char = self.take()
+        if char in CATEGORY_CHARACTERS:
+            return PatternNode("chars", items=[("category", char)])
+        if char in "bB":
+            return PatternNode("empty")
+        return _literal(self.parse_escaped_char(char))
+
+    def parse_escaped_char(self, char: str) -> str:
+        if char in ESCAPED_CHARACTERS:
+            return ESCAPED_CHARACTERS[char]
+        if char in "xu":
+            size = 2 if char == "x" else 4
+            digits = self.pattern[self.position : self.position + size]
+            if len(digits) != size or not all(c in string.hexdigits for c in digits):
+                raise ValueError(f"Invalid escape in pattern: {self.pattern}")
+            self.position += size
+            return chr(int(digits, 16))
+        if char.isdigit() or char in "cpPk":
+            raise ValueError(f"Unsupported escape \\{char} in pattern: {self.pattern}")
+        return char
+
+    def parse_class(self) -> PatternNode:
+        negated = self.peek() == "^"
+        if negated:
+            self.position += 1
+
+        items = []
+        while (char := self.take()) != "]":
+            if char == "\\":
+                char = self.take()
+                if char in CATEGORY_CHARACTERS:
+                    items.append(("category", char))
+                    continue
+                char = "\b" if char == "b" else self.parse_escaped_char(char)
+
+            last = char
+            following = self.pattern[self.position + 1 : self.position + 2]
+            if self.peek() == "-" and following not in ("]", ""):
+                self.position += 1
+                last = self.take()
+                if last == "\\":
+                    last = self.parse_escaped_char(self.take())
+                if last < char:
+                    raise ValueError(f"Invalid range in pattern: {self.pattern}")
+            items.append(("range", char, last))
+
+        return PatternNode("chars", items=items, negated=negated)
+
+
+def _literal(char: str) -> PatternNode:
+    return PatternNode("chars", items=[("range", char, char)])
+
+
+def _sum_bounds(bounds) -> Union[int, None]:
+    total = 0
+    for bound in bounds:
+        if bound is None:
+            return None
+        total += bound
+    return total
+
+
+def _max_bound(bounds) -> Union[int, None]:
+    bounds = list(bounds)
+    return None if None in bounds else max(bounds)
+
+
+def _min_bound(*bounds: Union[int, None]) -> Union[int, None]:
+    bounds = [bound for bound in bounds if bound is not None]
+    return min(bounds) if bounds else None
+
+
+def _is_end_anchored(pattern: str) -> bool:
+    # An escaped dollar sign is a literal, not an anchor
+    return pattern.endswith("$") and not pattern.endswith("\\$")
+
+
+def _fits(node: PatternNode, length: int) -> bool:
+    return node.min_length <= length and (
+        node.max_length is None or length <= node.max_length
+    )
+
+
+def _generate_node(
+    node: PatternNode, target: int, rng: Union[random.Random, None] = None
+) -> str:
+    """Generate a string that matches a node, as close to target characters as it can"""
+    if node.kind == "chars":
+        return _generate_char(node, rng)
+    if node.kind == "any":
+        return rng.choice(string.ascii_letters) if rng else "a"
+    if node.kind == "sequence":
+        return _generate_parts(node.children, target, rng)
+    if node.kind == "branch":
+        branches = [child for child in node.children if _fits(child, target)]
+        if not branches:
+            branches = [min(node.children, key=lambda child: child.min_length)]
+        branch = rng.choice(branches) if rng else branches[0]
+        return _generate_node(branch, target, rng)
+    if node.kind == "repeat":
+        child = node.children[0]
+        count = node.low
+        # Add repetitions until the target is within reach, without passing it
+        while (
+            (node.high is None or count < node.high)
+            and child.max_length != 0
+            and (count == 0 or child.max_length is not None)
+            and (count * (child.max_length or 0) < target)
+            and (count + 1) * child.min_length <= target
+        ):
+            count += 1
+        return _generate_parts([child] * count, target, rng)
+    return ""
+
+
+def _generate_parts(
+    parts: list[PatternNode], target: int, rng: Union[random.Random, None] = None
+) -> str:
+    # Every part gets its shortest length, then the rest goes to the parts that can grow
+    lengths = [part.min_length for part in parts]
+    extra = target - sum(lengths)
+    order = list(range(len(parts)))
+    if rng:
+        rng.shuffle(order)
+    for index in order:
+        if extra <= 0:
+            break
+        room = parts[index].max_length
+        grow = extra if room is None else min(extra, room - lengths[index])
+        lengths[index] += grow
+        extra -= grow
+    return "".join(
+        _generate_node(part, length, rng) for part, length in zip(parts, lengths)
+    )
+
+
+def _class_contains(items: list[tuple], char: str) -> bool:
+    for item in items:
+        if item[0] == "range" and item[1] <= char <= item[2]:
+            return True
+        if item[0] == "category" and (
+            char in CATEGORY_CHARACTERS[item[1].lower()]
+        ) != item[1].isupper():
+            return True
+    return False
+
+
+def _generate_char(node: PatternNode, rng: Union[random.Random, None] = None) -> str:
+    if node.negated:
+        candidates = [
+            char
+            for char in NEGATED_CLASS_CHARACTERS
+            if not _class_contains(node.items, char)
+        ]
+        if not candidates:
+            raise ValueError("No character matches the negated class")
+        return rng.choice(candidates) if rng else candidates[0]
+
+    if not node.items:
+        raise ValueError("No character matches the empty class")
+    item = rng.choice(node.items) if rng else node.items[0]
+    if item[0] == "range":
+        return chr(rng.randint(ord(item[1]), ord(item[2]))) if rng else item[1]
+    characters = CATEGORY_CHARACTERS[item[1]]
+    return rng.choice(characters) if rng else characters[0]
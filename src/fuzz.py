@@ -0,0 +1,759 @@
+import copy
+import json
+import math
+import random
+import re
+import string
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Union
+
+from jsonschema import ValidationError
+from jsonschema.protocols import Validator
+from rich.table import Table
+
+from .examples import (
+    FORMAT_EXAMPLES,
+    generate_example,
+    generate_from_pattern,
+    get_number_bounds,
+)
+from .models.step import Step
+from .preprocessing import Template
+from .requests import decode_response_body, get_global_auth, run_step_request
+from .transport import Transport
+from .verify import ValidatorRegistry, compile_validator, verify_response
+
+# Levels of nesting below which optional properties and extra array items are generated
+MAX_DEPTH = 4
+# Items generated at random beyond the minItems of an array
+MAX_EXTRA_ITEMS = 3
+# Characters generated at random beyond the minLength of a string
+MAX_EXTRA_LENGTH = 16
+# Range of the numbers generated when a schema does not bound them
+DEFAULT_NUMBER_RANGE = 1000
+# Chance of a number being one of its bounds, and of a value that may be null being so
+BOUNDARY_RATE = 0.25
+NULL_RATE = 0.1
+# Bodies generated at a time, while the bodies before them are being sent
+BATCH_SIZE = 256
+# Tries at breaking a body before it is sent as a valid one instead
+MAX_MUTATION_ATTEMPTS = 3
+# Failed cases kept with their bodies, so that they can be reported
+MAX_FAILURES = 10
+
+ALPHABET = string.ascii_letters + string.digits
+# Property added to objects that do not allow additional properties
+EXTRA_PROPERTY = "pypony_unexpected"
+# Values of every JSON type, to put where the schema expects another type
+WRONG_TYPE_VALUES = [None, True, 12345, 1.5, "string", {}, []]
+# Strings that break most patterns
+PATTERN_VIOLATIONS = ["", "!", " ", "\n", "0" * 256]
+
+# Random values for the string formats a fixed example would make repetitive
+FORMAT_GENERATORS: dict[str, Callable[[random.Random], str]] = {
+    "uuid": lambda rng: str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+    "date": lambda rng: f"{rng.randint(1970, 2099)}-{rng.randint(1, 12):02}-"
+    f"{rng.randint(1, 28):02}",
+    "date-time": lambda rng: f"{FORMAT_GENERATORS['date'](rng)}T"
+    f"{rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02}Z",
+    "email": lambda rng: "".join(rng.choices(string.ascii_lowercase, k=8))
+    + "@example.com",
+}
+
+
+def _json_types(value: any) -> set[str]:
+    """Get the JSON types a value is an instance of"""
+    if value is None:
+        return {"null"}
+    if isinstance(value, bool):
+        return {"boolean"}
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return {"integer", "number"}
+    if isinstance(value, float):
+        return {"number"}
+    if isinstance(value, str):
+        return {"string"}
+    if isinstance(value, dict):
+        return {"object"}
+    return {"array"}
+
+
+def _get_violations(
+    schema: dict, integer: bool
+) -> tuple[Union[int, float, None], Union[int, float, None]]:
+    """Get the numbers closest to a schema's bounds that fall outside of them"""
+    below = above = None
+    if type(schema.get("exclusiveMinimum")) in (int, float):
+        below = schema["exclusiveMinimum"]
+    elif schema.get("minimum") is not None:
+        below = schema["minimum"]
+        if schema.get("exclusiveMinimum") is not True:
+            below = below - 1 if integer else math.nextafter(below, -math.inf)
+    if type(schema.get("exclusiveMaximum")) in (int, float):
+        above = schema["exclusiveMaximum"]
+    elif schema.get("maximum") is not None:
+        above = schema["maximum"]
+        if schema.get("exclusiveMaximum") is not True:
+            above = above + 1 if integer else math.nextafter(above, math.inf)
+    return below, above
+
+
+class SchemaNode:
+    """A resolved schema compiled into a generator of instances and ways to break them
+
+    Nodes are shared the way their schemas are, so a recursive schema compiles into a
+    cycle of nodes. Generation stops adding optional parts past MAX_DEPTH, which ends
+    the recursion.
+    """
+
+    def __init__(self, schema: dict):
+        self.schema = schema
+        self.enum: Union[list, None] = None
+        self.all_of: list[SchemaNode] = []
+        self.any_of: list[SchemaNode] = []
+        self.types: list[str] = []
+        self.properties: dict[str, SchemaNode] = {}
+        self.required: list[str] = []
+        self.closed = False
+        self.items: Union[SchemaNode, None] = None
+        self.min_items = 0
+        self.max_items: Union[int, None] = None
+        self.unique = False
+        self.min_length = 0
+        self.max_length: Union[int, None] = None
+        self.pattern: Union[str, None] = None
+        self.pattern_violation: Union[str, None] = None
+        self.format: Union[str, None] = None
+        self.nullable = False
+        self.integer = False
+        self.low = self.high = self.below = self.above = None
+        self.multiple = None
+
+    def compile(self, nodes: dict[int, "SchemaNode"]):
+        schema = self.schema
+        if "const" in schema:
+            self.enum = [schema["const"]]
+        elif schema.get("enum"):
+            self.enum = list(schema["enum"])
+
+        self.all_of = [compile_schema(s, nodes) for s in schema.get("allOf", [])]
+        for keyword in ("oneOf", "anyOf"):
+            if schema.get(keyword):
+                self.any_of = [compile_schema(s, nodes) for s in schema[keyword]]
+
+        types = schema.get("type", [])
+        types = list(types) if isinstance(types, list) else [types]
+        if not types and ("properties" in schema or "required" in schema):
+            types = ["object"]
+        elif not types and "items" in schema:
+            types = ["array"]
+        self.types = types
+        # The validators ignore OpenAPI 3.0's nullable, so null is neither generated
+        # nor used to break such a value, as the API and the validator disagree on it
+        self.nullable = bool(schema.get("nullable"))
+
+        if "object" in types:
+            self.properties = {
+                name: compile_schema(s, nodes)
+                for name, s in schema.get("properties", {}).items()
+            }
+            self.required = list(schema.get("required", []))
+            self.closed = schema.get("additionalProperties") is False
+        if "array" in types:
+            self.items = compile_schema(schema.get("items", {}), nodes)
+            self.min_items = schema.get("minItems", 0)
+            self.max_items = schema.get("maxItems")
+            self.unique = schema.get("uniqueItems", False)
+        if "string" in types:
+            self.min_length = schema.get("minLength", 0)
+            self.max_length = schema.get("maxLength")
+            self.format = schema.get("format")
+            self.pattern = schema.get("pattern")
+            if self.pattern is not None:
+                try:
+                    compiled = re.compile(self.pattern)
+                except (re.error, TypeError):
+                    compiled = None
+                self.pattern_violation = next(
+                    (
+                        value
+                        for value in PATTERN_VIOLATIONS
+                        if compiled is not None and not compiled.search(value)
+                    ),
+                    None,
+                )
+        if "integer" in types or "number" in types:
+            self.integer = "number" not in types
+            self.low, self.high = get_number_bounds(schema, self.integer)
+            self.below, self.above = _get_violations(schema, self.integer)
+            self.multiple = schema.get("multipleOf")
+
+    def generate(self, rng: random.Random, depth: int = 0) -> any:
+        """Generate an instance of the schema
+
+        Most instances are valid, but constraints that conflict across subschemas or
+        patterns that cannot be generated may give invalid ones; callers check.
+        """
+        if self.enum is not None:
+            return copy.deepcopy(rng.choice(self.enum))
+        if self.all_of:
+            return self._generate_all_of(rng, depth)
+        if self.any_of:
+            return rng.choice(self.any_of).generate(rng, depth)
+        return self._generate_type(self._pick_type(rng), rng, depth)
+
+    def _pick_type(self, rng: random.Random) -> str:
+        if not self.types:
+            return rng.choice(("string", "integer", "boolean"))
+        values = [t for t in self.types if t != "null"]
+        if "null" in self.types and (not values or rng.random() < NULL_RATE):
+            return "null"
+        return rng.choice(values)
+
+    def _generate_all_of(self, rng: random.Random, depth: int) -> any:
+        # Objects are merged; for anything else the first subschema wins
+        values = [node.generate(rng, depth) for node in self.all_of]
+        if self.types:
+            values.append(self._generate_type(self._pick_type(rng), rng, depth))
+        if all(isinstance(value, dict) for value in values):
+            merged = {}
+            for value in values:
+                merged.update(value)
+            return merged
+        return values[0]
+
+    def _generate_type(self, schema_type: str, rng: random.Random, depth: int) -> any:
+        if schema_type == "object":
+            return self._generate_object(rng, depth)
+        if schema_type == "array":
+            return self._generate_array(rng, depth)
+        if schema_type == "string":
+            return self._generate_string(rng)
+        if schema_type in ("integer", "number"):
+            return self._generate_number(rng)
+        if schema_type == "boolean":
+            return rng.random() < 0.5
+        return None
+
+    def _generate_object(self, rng: random.Random, depth: int) -> dict:
+        value = {}
+        for name, node in self.properties.items():
+            if name in self.required:
+                if depth >= 2 * MAX_DEPTH:
+                    # Only a cycle of required properties gets this deep
+                    value[name] = generate_example(node.schema)
+                else:
+                    value[name] = node.generate(rng, depth + 1)
+            elif depth < MAX_DEPTH and rng.random() < 0.5:
+                value[name] = node.generate(rng, depth + 1)
+
+        # Required properties that are not described can hold anything
+        for name in self.required:
+            value.setdefault(name, "value")
+        return value
+
+    def _generate_array(self, rng: random.Random, depth: int) -> list:
+        count = self.min_items
+        if depth < MAX_DEPTH:
+            count += rng.randint(0, MAX_EXTRA_ITEMS)
+        if self.max_items is not None:
+            count = min(count, self.max_items)
+
+        value, seen = [], set()
+        for _ in range(2 * count if self.unique else count):
+            if len(value) == count:
+                break
+            item = self.items.generate(rng, depth + 1)
+            if self.unique:
+                key = json.dumps(item, sort_keys=True, default=str)
+                if key in seen:
+                    continue
+                seen.add(key)
+            value.append(item)
+        return value
+
+    def _generate_string(self, rng: random.Random) -> str:
+        if self.format in FORMAT_GENERATORS:
+            return FORMAT_GENERATORS[self.format](rng)
+        if self.format in FORMAT_EXAMPLES:
+            return FORMAT_EXAMPLES[self.format]
+        if self.pattern is not None:
+            try:
+                return generate_from_pattern(
+                    self.pattern, rng, self.min_length, self.max_length
+                )
+            except (ValueError, TypeError, RecursionError):
+                pass
+
+        high = self.min_length + MAX_EXTRA_LENGTH
+        if self.max_length is not None:
+            high = max(min(high, self.max_length), self.min_length)
+        return "".join(rng.choices(ALPHABET, k=rng.randint(self.min_length, high)))
+
+    def _generate_number(self, rng: random.Random) -> Union[int, float]:
+        low, high = self.low, self.high
+        if low is None:
+            low = (high if high is not None else 0) - DEFAULT_NUMBER_RANGE
+        if high is None:
+            high = low + 2 * DEFAULT_NUMBER_RANGE
+        if self.integer:
+            low, high = math.ceil(low), math.floor(high)
+        if low > high:
+            return generate_example(self.schema)
+
+        if self.multiple:
+            first = math.ceil(low / self.multiple)
+            last = math.floor(high / self.multiple)
+            if first > last:
+                return generate_example(self.schema)
+            value = rng.randint(first, last) * self.multiple
+            return int(value) if self.integer else value
+
+        if rng.random() < BOUNDARY_RATE:
+            return rng.choice((low, high))
+        if self.integer:
+            return rng.randint(low, high)
+        return rng.uniform(low, high)
+
+    def mutations(self, value: any) -> list[Callable[[random.Random], any]]:
+        """Get the ways to replace a value with one the schema does not allow
+
+        Nodes that combine subschemas are not broken, since a replacement that breaks
+        one subschema may still match another.
+        """
+        if self.all_of or self.any_of:
+            return []
+
+        found = []
+        if self.enum is not None:
+            outside = next(
+                (v for v in ("pypony", 0, False, None) if v not in self.enum), None
+            )
+            found.append(lambda rng: outside)
+        if self.types:
+            types = set(self.types)
+            if self.nullable:
+                types.add("null")
+            wrong = [v for v in WRONG_TYPE_VALUES if not _json_types(v) & types]
+            if wrong:
+                found.append(lambda rng: copy.deepcopy(rng.choice(wrong)))
+
+        if isinstance(value, str):
+            if self.min_length > 0:
+                found.append(lambda rng: value[: self.min_length - 1])
+            if self.max_length is not None:
+                found.append(
+                    lambda rng: value.ljust(self.max_length + 1, "x")[
+                        : self.max_length + 1
+                    ]
+                )
+            if self.pattern_violation is not None:
+                found.append(lambda rng: self.pattern_violation)
+            if self.format in FORMAT_EXAMPLES:
+                found.append(lambda rng: f"not-a-{self.format}")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            for bound in (self.below, self.above):
+                if bound is not None:
+                    found.append(lambda rng, bound=bound: bound)
+            if self.multiple:
+                found.append(lambda rng: value + self.multiple / 2)
+        elif isinstance(value, dict):
+            for name in self.required:
+                if name in value:
+                    found.append(
+                        lambda rng, name=name: {
+                            k: v for k, v in value.items() if k != name
+                        }
+                    )
+            if self.closed and EXTRA_PROPERTY not in self.properties:
+                found.append(lambda rng: {**value, EXTRA_PROPERTY: "value"})
+        elif isinstance(value, list) and self.items is not None:
+            if self.min_items > 0:
+                found.append(lambda rng: value[: self.min_items - 1])
+            if self.max_items is not None:
+                found.append(
+                    lambda rng: value
+                    + [
+                        self.items.generate(rng, MAX_DEPTH)
+                        for _ in range(self.max_items + 1 - len(value))
+                    ]
+                )
+            if self.unique and value:
+                found.append(lambda rng: value + [copy.deepcopy(value[0])])
+        return found
+
+    def children(self, value: any) -> list[tuple[Union[str, int], "SchemaNode"]]:
+        """Get the keys of a value's members along with the nodes that describe them"""
+        if self.all_of or self.any_of:
+            return []
+        if isinstance(value, dict):
+            return [
+                (name, self.properties[name])
+                for name in value
+                if name in self.properties
+            ]
+        if isinstance(value, list) and self.items is not None:
+            return [(index, self.items) for index in range(len(value))]
+        return []
+
+    def mutate(self, value: any, rng: random.Random) -> any:
+        """Break one constraint somewhere in a copy of a value, if any can be broken"""
+        value = copy.deepcopy(value)
+        sites = []
+        pending = [(None, None, self, value)]
+        while pending:
+            container, key, node, item = pending.pop()
+            mutations = node.mutations(item)
+            if mutations:
+                sites.append((container, key, mutations))
+            for child_key, child in node.children(item):
+                pending.append((item, child_key, child, item[child_key]))
+
+        if not sites:
+            return value
+        container, key, mutations = rng.choice(sites)
+        replacement = rng.choice(mutations)(rng)
+        if container is None:
+            return replacement
+        container[key] = replacement
+        return value
+
+
+def compile_schema(
+    schema: Union[dict, bool], nodes: Union[dict[int, SchemaNode], None] = None
+) -> SchemaNode:
+    """Compile a resolved schema into a SchemaNode
+
+    Args:
+        schema (Union[dict, bool]): Schema with its $refs resolved
+        nodes (Union[dict[int, SchemaNode], None]): Nodes already compiled, by the id
+            of their schema
+
+    Returns:
+        SchemaNode: The node of the schema
+    """
+    if nodes is None:
+        nodes = {}
+    if not isinstance(schema, dict):
+        schema = {}
+    if id(schema) in nodes:
+        return nodes[id(schema)]
+
+    # Register the node first so that recursive schemas find it
+    node = SchemaNode(schema)
+    nodes[id(schema)] = node
+    node.compile(nodes)
+    return node
+
+
+class FuzzCase:
+    """A generated request body and whether its schema allows it
+
+    Attributes:
+        index (int): Position of the case, which with the seed is all that is needed
+            to generate it again
+        body (any): The request body
+        valid (bool): Whether the body is valid against the request body schema
+    """
+
+    def __init__(self, index: int, body: any, valid: bool):
+        self.index = index
+        self.body = body
+        self.valid = valid
+
+
+class BodyGenerator:
+    """Seeded generator of request bodies for one schema, compiled once
+
+    Each body only depends on the seed and its index, so any case can be generated
+    again on its own. Whether a body is valid is decided by validating it, not by how
+    it was generated.
+    """
+
+    def __init__(self, schema: dict, validator: Union[Validator, None] = None):
+        self.root = compile_schema(schema)
+        self.validator = validator or compile_validator(schema)
+
+    def case(self, seed: str, index: int, invalid_ratio: float = 0.0) -> FuzzCase:
+        """Generate the case at an index
+
+        Args:
+            seed (str): Seed of the run, along with whatever tells generators apart
+            index (int): Position of the case
+            invalid_ratio (float): Chance of the body breaking a constraint
+
+        Returns:
+            FuzzCase: The case
+        """
+        rng = random.Random(f"{seed}:{index}")
+        body = self.root.generate(rng)
+        if rng.random() < invalid_ratio:
+            for _ in range(MAX_MUTATION_ATTEMPTS):
+                mutated = self.root.mutate(body, rng)
+                if not self.validator.is_valid(mutated):
+                    return FuzzCase(index, mutated, False)
+        return FuzzCase(index, body, self.validator.is_valid(body))
+
+    def batches(
+        self,
+        seed: str,
+        start: int,
+        count: int,
+        invalid_ratio: float = 0.0,
+        size: int = BATCH_SIZE,
+    ) -> Iterator[list[FuzzCase]]:
+        """Generate the cases from start on, a batch at a time"""
+        for first in range(start, start + count, size):
+            last = min(first + size, start + count)
+            yield [
+                self.case(seed, index, invalid_ratio) for index in range(first, last)
+            ]
+
+
+class FuzzFailure:
+    """A case whose response was wrong, with what is needed to send it again"""
+
+    def __init__(
+        self,
+        step: str,
+        case: FuzzCase,
+        reason: str,
+        status_code: Union[int, None] = None,
+    ):
+        self.step = step
+        self.case = case
+        self.reason = reason
+        self.status_code = status_code
+
+    def __str__(self) -> str:
+        kind = "valid" if self.case.valid else "invalid"
+        return (
+            f"Case {self.case.index} of step {self.step} ({kind} body): {self.reason}"
+        )
+
+
+class FuzzStats:
+    """Cases sent for one step and how the API answered them"""
+
+    def __init__(self, operation_id: str):
+        self.operation_id = operation_id
+        self.cases = 0
+        self.valid = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.failures = 0
+        self.elapsed = 0.0
+
+
+class FuzzResult:
+    """Stats of a fuzz run, keyed by step name in file order
+
+    Attributes:
+        seed (int): Seed the bodies were generated from
+        steps (dict[str, FuzzStats]): Stats of every step that was fuzzed
+        failures (list[FuzzFailure]): The first MAX_FAILURES failed cases
+        elapsed (float): Wall-clock seconds the run took
+    """
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.steps: dict[str, FuzzStats] = {}
+        self.failures: list[FuzzFailure] = []
+        self.elapsed = 0.0
+
+    @property
+    def cases(self) -> int:
+        return sum(stats.cases for stats in self.steps.values())
+
+    @property
+    def failed(self) -> int:
+        return sum(stats.failures for stats in self.steps.values())
+
+    def table(self) -> Table:
+        """Summarize the run as a table with one row per step"""
+        table = Table(
+            title=f"{self.cases} cases in {self.elapsed:.2f}s with seed {self.seed}"
+        )
+        table.add_column("Step")
+        table.add_column("Operation")
+        for column in ("Cases", "Valid", "2XX", "4XX", "Failures", "Cases/s"):
+            table.add_column(column, justify="right")
+
+        for name, stats in self.steps.items():
+            throughput = stats.cases / stats.elapsed if stats.elapsed else 0.0
+            table.add_row(
+                name,
+                stats.operation_id,
+                str(stats.cases),
+                str(stats.valid),
+                str(stats.accepted),
+                str(stats.rejected),
+                str(stats.failures),
+                f"{throughput:.1f}",
+            )
+        return table
+
+
+def check_fuzz_response(
+    response, case: FuzzCase, schemas: dict, validators: ValidatorRegistry, op_id: str
+) -> Union[str, None]:
+    """Check the response to a generated body against the documented responses
+
+    A server error always fails, as does accepting an invalid body. Any other status
+    code must be documented, and the body must match its schema. A valid body may
+    still be rejected, for instance as a duplicate.
+
+    Returns:
+        Union[str, None]: Why the response is wrong, or None
+    """
+    status = response.status_code
+    if status >= 500:
+        return f"The API answered with server error {status}"
+    if not case.valid and 200 <= status < 300:
+        return f"The API accepted an invalid body with {status}"
+
+    # The exact status code wins over a range, which wins over the default
+    responses = schemas["responses"]
+    keys = (str(status), f"{str(status)[0]}XX", "default")
+    documented = next((key for key in keys if key in responses), None)
+    if documented is None:
+        return f"Status code {status} is not documented for {op_id}"
+
+    try:
+        decode_response_body(response, responses[documented])
+        verify_response(
+            response,
+            status,
+            responses[documented],
+            validators.response(op_id, documented),
+        )
+    except ValidationError as e:
+        cause = e.__cause__ if e.__cause__ is not None else e
+        return f"The response does not match its {documented} schema: {cause.message}"
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def run_fuzz(
+    steps_data: dict,
+    operation_schemas: dict,
+    transport: Transport,
+    validators: Union[ValidatorRegistry, None] = None,
+    cases: int = 100,
+    seed: int = 0,
+    invalid_ratio: float = 0.25,
+    jobs: int = 1,
+    start: int = 0,
+) -> FuzzResult:
+    """Send generated request bodies in place of the bodies of the steps file
+
+    The steps run in file order as usual, so that later steps can reference earlier
+    responses. After each step whose operation has a request body schema passes, its
+    request is sent again with each generated body instead of its own. The bodies of a
+    step are generated in batches while the previous batch is being sent.
+
+    Args:
+        steps_data (dict): The parsed steps file
+        operation_schemas (dict): Operation schemas from parse_spec_file
+        transport (Transport): Sends the requests
+        validators (Union[ValidatorRegistry, None]): Compiled validators of
+            operation_schemas
+        cases (int): Bodies sent per step
+        seed (int): Seed the bodies are generated from
+        invalid_ratio (float): Share of the bodies that break a constraint
+        jobs (int): Cases sent at once
+        start (int): Index of the first case, to send a range of cases again
+
+    Raises:
+        Exception: The error of a step that failed with its own body
+
+    Returns:
+        FuzzResult: Stats of the run and the first failed cases
+    """
+    base_url: str = steps_data["base_url"]
+    validators = validators or ValidatorRegistry(operation_schemas)
+    global_auth = get_global_auth(steps_data)
+    generators: dict[str, BodyGenerator] = {}
+
+    result = FuzzResult(seed)
+    started = time.perf_counter()
+    steps: dict = {}
+
+    def send_case(step: Step, case: FuzzCase) -> tuple[FuzzCase, any, Union[str, None]]:
+        request = step.construct_request(base_url, global_auth, transport)
+        request.body = case.body
+        request.stream = False
+        try:
+            response = request.send()
+        except Exception as e:
+            return case, None, f"The request failed: {e}"
+        schemas = operation_schemas[step.operation_id]
+        return (
+            case,
+            response,
+            check_fuzz_response(response, case, schemas, validators, step.operation_id),
+        )
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for s in steps_data["steps"]:
+            template = Template(s)
+            run_step_request(
+                s,
+                steps,
+                base_url,
+                global_auth,
+                operation_schemas,
+                transport,
+                validators=validators,
+                template=template,
+            )
+
+            op_id = s["operation_id"]
+            if "body" not in s or "foreach" in s:
+                continue
+            if "requestBody" not in operation_schemas[op_id]:
+                continue
+
+            if op_id not in generators:
+                generators[op_id] = BodyGenerator(
+                    operation_schemas[op_id]["requestBody"],
+                    validators.request_body(op_id),
+                )
+            step = Step(s, steps, template)
+            stats = result.steps[s["name"]] = FuzzStats(op_id)
+            step_started = time.perf_counter()
+
+            def record(outcomes: Iterator[tuple]):
+                for case, response, reason in outcomes:
+                    stats.cases += 1
+                    stats.valid += case.valid
+                    status = response.status_code if response is not None else None
+                    if status is not None and 200 <= status < 300:
+                        stats.accepted += 1
+                    elif status is not None and 400 <= status < 500:
+                        stats.rejected += 1
+                    if reason is not None:
+                        stats.failures += 1
+                        if len(result.failures) < MAX_FAILURES:
+                            result.failures.append(
+                                FuzzFailure(s["name"], case, reason, status)
+                            )
+
+            # Each batch is submitted before the previous one is collected
+            pending = None
+            for batch in generators[op_id].batches(
+                f"{seed}:{s['name']}", start, cases, invalid_ratio
+            ):
+                submitted = executor.map(lambda case: send_case(step, case), batch)
+                if pending is not None:
+                    record(pending)
+                pending = submitted
+            if pending is not None:
+                record(pending)
+            stats.elapsed = time.perf_counter() - step_started
+
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,290 @@
+import asyncio
+import json
+import re
+import threading
+from http import HTTPStatus
+from typing import Union
+from urllib.parse import urlsplit
+
+from .catalog import OperationCatalog
+from .examples import generate_example
+
+# Largest request head accepted, as asyncio streams buffer it whole
+MAX_HEAD_SIZE = 64 * 1024
+
+PREFER_CODE_PATTERN = re.compile(r"\bcode=(\d{3})\b")
+
+
+def get_example_body(response: dict) -> tuple[Union[str, None], bytes]:
+    """Serialize an example body for a response object of the spec
+
+    Examples given for the media type are preferred over one generated from its schema.
+
+    Args:
+        response (dict): Response object, with its $refs resolved
+
+    Returns:
+        tuple[Union[str, None], bytes]: Content type, or None without content, and body
+    """
+    content = response.get("content")
+    if not content:
+        return None, b""
+
+    content_type = next(
+        (ct for ct in content if ct == "application/json" or ct.endswith("+json")),
+        next(iter(content)),
+    )
+    media = content[content_type] or {}
+    if "example" in media:
+        value = media["example"]
+    elif media.get("examples"):
+        value = next(iter(media["examples"].values())).get("value")
+    else:
+        value = generate_example(media.get("schema", {}))
+
+    if "json" in content_type:
+        return content_type, json.dumps(value, separators=(",", ":")).encode("utf-8")
+    if isinstance(value, bytes):
+        return content_type, value
+    return content_type, ("" if value is None else str(value)).encode("utf-8")
+
+
+def serialize_response(
+    status_code: int, content_type: Union[str, None], body: bytes
+) -> tuple[bytes, bytes]:
+    """Build the status line and headers of a response, minus the closing blank line"""
+    try:
+        reason = HTTPStatus(status_code).phrase
+    except ValueError:
+        reason = ""
+    head = f"HTTP/1.1 {status_code} {reason}\r\n"
+    if content_type is not None:
+        head += f"Content-Type: {content_type}\r\n"
+    head += f"Content-Length: {len(body)}\r\n"
+    return head.encode("latin-1"), body
+
+
+def get_default_status(status_codes: list[str]) -> str:
+    """Pick the status code a mocked operation answers with unless asked for another
+
+    That is the lowest documented 2XX code, or else the first documented code.
+    """
+    success = sorted(code for code in status_codes if code.startswith("2"))
+    if success:
+        return success[0]
+    return next((code for code in status_codes if code != "default"), "default")
+
+
+class MockServer:
+    """Asyncio HTTP/1.1 server that answers every operation of a spec with an example
+
+    Requests are routed to operations by method and path template, and the path of
+    the spec's servers, such as /v1, may prefix the path. An operation answers with its
+    lowest documented 2XX status code, or with the documented code named by a
+    `Prefer: code=<status>` request header. The responses of every operation are
+    serialized once, up front, so a request costs little more than parsing it.
+
+    Usage:
+        with MockServer(spec) as server:
+            validate(steps_path, spec_path)  # with base_url set to server.url
+    """
+
+    def __init__(
+        self,
+        spec: dict,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        uds: Union[str, None] = None,
+        catalog: Union[OperationCatalog, None] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.uds = uds
+        self.catalog = catalog or OperationCatalog(spec)
+
+        self.prefixes = []
+        for server in spec.get("servers", []):
+            prefix = urlsplit(server.get("url", "")).path.rstrip("/")
+            if prefix and prefix not in self.prefixes:
+                self.prefixes.append(prefix)
+
+        # Serialized responses keyed by operationId, then by documented status code
+        self.responses: dict[str, dict[str, tuple[bytes, bytes]]] = {}
+        self.defaults: dict[str, str] = {}
+        for op_id in self.catalog.operation_ids:
+            responses = self.catalog.operation(op_id).get("responses", {})
+            self.responses[op_id] = {}
+            for code, response in responses.items():
+                status_code = 200 if code == "default" else int(code.replace("X", "0"))
+                self.responses[op_id][code] = serialize_response(
+                    status_code, *get_example_body(response)
+                )
+            self.defaults[op_id] = get_default_status(list(responses))
+
+        self._server: Union[asyncio.AbstractServer, None] = None
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self._thread: Union[threading.Thread, None] = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server; with a Unix domain socket, any host will do"""
+        if self.uds:
+            return "http://localhost"
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        """Start listening, and pick the port if it was 0"""
+        if self.uds:
+            self._server = await asyncio.start_unix_server(
+                self._handle, self.uds, limit=MAX_HEAD_SIZE
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle, self.host, self.port, limit=MAX_HEAD_SIZE
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    def serve_forever(self):
+        """Serve requests until interrupted"""
+
+        async def serve():
+            await self.start()
+            print(f"--Serving Mock API at {self.url}--")
+            async with self._server:
+                await self._server.serve_forever()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+
+    def __enter__(self) -> "MockServer":
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="pypony-mock", daemon=True
+        )
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc_info):
+        async def stop():
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed up
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def match(self, method: str, path: str) -> Union[str, None]:
+        """Find the operation of a request path, which may start with a server's path"""
+        op_id = self.catalog.match(method, path)
+        for prefix in self.prefixes:
+            if op_id is not None:
+                break
+            if path.startswith(prefix + "/"):
+                op_id = self.catalog.match(method, path[len(prefix) :])
+        return op_id
+
+    def get_response(
+        self, method: str, target: str, prefer: str
+    ) -> tuple[bytes, bytes]:
+        """Find the serialized response to a request
+
+        Args:
+            method (str): HTTP method of the request
+            target (str): Request target, such as /person/1?verbose=true
+            prefer (str): Value of the Prefer header, which may name a status code
+
+        Returns:
+            tuple[bytes, bytes]: Status line and headers, and the body
+        """
+        path = urlsplit(target).path or "/"
+        op_id = self.match(method, path)
+        if op_id is None and method == "HEAD":
+            # HEAD gets the headers of GET unless it is documented itself
+            op_id = self.match("GET", path)
+
+        if op_id is None:
+            body = json.dumps({"error": f"No operation matches {method} {path}"})
+            return serialize_response(404, "application/json", body.encode("utf-8"))
+
+        responses = self.responses[op_id]
+        match = PREFER_CODE_PATTERN.search(prefer)
+        if match and match.group(1) in responses:
+            return responses[match.group(1)]
+        return responses[self.defaults[op_id]]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.LimitOverrunError:
+                    writer.write(b"HTTP/1.1 431 Request Header Fields Too Large\r\n")
+                    writer.write(b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\n")
+                    writer.write(b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+                    break
+
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                if headers.get("expect", "").lower() == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                await self._read_body(reader, headers)
+
+                connection = headers.get("connection", "").lower()
+                if version == "HTTP/1.0":
+                    keep_alive = connection == "keep-alive"
+                else:
+                    keep_alive = connection != "close"
+
+                response_head, body = self.get_response(
+                    method, target, headers.get("prefer", "")
+                )
+                writer.write(response_head)
+                writer.write(b"\r\n" if keep_alive else b"Connection: close\r\n\r\n")
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _read_body(reader: asyncio.StreamReader, headers: dict):
+        # Bodies are read to keep the connection usable, but otherwise ignored
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Skip any trailers up to the blank line ending the body
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                await reader.readexactly(size + 2)
+
+        length = int(headers.get("content-length") or 0)
+        if length:
+            await reader.readexactly(length)
@@ -1,3 +1,4 @@
 from .request import Request
 from .response import Response
 from .step import Step
+from .step_result import StepResult
@@ -1,9 +1,14 @@
+import threading
+import time
+
 import requests
-from requests.auth import HTTPBasicAuth
 from requests.structures import CaseInsensitiveDict
 from typing import Union
 
+from src.errors import StepCancelledError
 from src.models.response import Response
+from src.retry import RetryPolicy, remaining
+from src.transport import Transport, default_transport
 
 
 class Request:
@@ -17,6 +22,12 @@ class Request:
         global_auth: dict,
         auth: dict,
         body: Union[dict, str],
+        transport: Union[Transport, None] = None,
+        stream: bool = False,
+        timeout: Union[float, dict, None] = None,
+        retry: Union[RetryPolicy, None] = None,
+        deadline: Union[float, None] = None,
+        cancelled: Union[threading.Event, None] = None,
     ):
         self.base_url = base_url
         self.method = method
@@ -26,6 +37,17 @@ class Request:
         self.global_auth = global_auth
         self.auth = auth
         self.body = body
+        self.transport = transport or default_transport()
+        self.stream = stream
+        # A number applies to both connecting and reading
+        self.timeout = timeout
+        self.retry = retry
+        # time.monotonic() by which the request must be done
+        self.deadline = deadline
+        # Set when the run is cancelled, which stops any further attempt
+        self.cancelled = cancelled
+        # Times the request was sent by the last call to send
+        self.attempts = 0
 
         if not self.auth:
             if not self.global_auth:
@@ -33,29 +55,92 @@ class Request:
             else:
                 self.auth = self.global_auth
 
-    def send(self):
-        if isinstance(self.body, str):
-            r = requests.request(
-                url=self.base_url + self.path,
-                method=self.method,
-                params=self.params,
-                headers=self.headers,
-                # TODO: Beef up this logic to ensure a strict data type (binary/bytes?)
-                data=self.body,
-                auth=HTTPBasicAuth(self.auth["username"], self.auth["password"]),
-            )
-            return Response(
-                status_code=r.status_code, headers=dict(r.headers), body=str(r.text)
-            )
+    def send(self) -> Response:
+        url = self.base_url + self.path
+        auth = (self.auth["username"], self.auth["password"])
+
+        attempt = 1
+        while True:
+            self.check_cancelled()
+            try:
+                response = self.transport.send(
+                    self.method,
+                    url,
+                    self.params,
+                    self.headers,
+                    auth,
+                    self.body,
+                    timeout=self.get_timeout(),
+                    stream=self.stream,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # The transport aborts the requests in flight when the run is cancelled
+                self.check_cancelled(e)
+                if not (self.should_retry(attempt) and self.retry.connection_errors):
+                    raise
+                if not self.wait(self.retry.delay(attempt)):
+                    raise
+            else:
+                retryable = self.should_retry(attempt) and (
+                    response.status_code in self.retry.status_codes
+                )
+                if not retryable:
+                    break
+                # Without time for another attempt, the last response is the result
+                retry_after = CaseInsensitiveDict(response.headers).get("Retry-After")
+                if not self.wait(self.retry.delay(attempt, retry_after)):
+                    break
+                if hasattr(response.body, "close"):
+                    # Release the connection of a streamed body that is not read
+                    response.body.close()
+            attempt += 1
+
+        self.attempts = attempt
+        return response
+
+    def get_timeout(self) -> Union[tuple, None]:
+        """The (connect, read) timeout of the next attempt
+
+        The step's own timeout takes precedence over the transport's, and neither may
+        run past the deadline.
+
+        Raises:
+            DeadlineExceededError: The deadline has passed
+        """
+        if isinstance(self.timeout, dict):
+            timeout = (self.timeout.get("connect"), self.timeout.get("read"))
+        elif self.timeout is not None:
+            timeout = (self.timeout, self.timeout)
         else:
-            r = requests.request(
-                url=self.base_url + self.path,
-                method=self.method,
-                params=self.params,
-                headers=self.headers,
-                json=self.body,
-                auth=HTTPBasicAuth(self.auth["username"], self.auth["password"]),
-            )
-            return Response(
-                status_code=r.status_code, headers=dict(r.headers), body=str(r.text)
-            )
+            timeout = self.transport.timeout or (None, None)
+
+        left = remaining(self.deadline)
+        if left is not None:
+            timeout = tuple(left if t is None else min(t, left) for t in timeout)
+
+        return None if timeout == (None, None) else timeout
+
+    def check_cancelled(self, cause: Union[BaseException, None] = None):
+        """Raise StepCancelledError if the run has been cancelled"""
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise StepCancelledError() from cause
+
+    def should_retry(self, attempt: int) -> bool:
+        return self.retry is not None and attempt < self.retry.attempts
+
+    def wait(self, delay: float) -> bool:
+        """Sleep before the next attempt, unless that would pass the deadline
+
+        Raises:
+            StepCancelledError: The run was cancelled while waiting
+
+        Returns:
+            bool: Whether there is time left for another attempt
+        """
+        if self.deadline is not None and time.monotonic() + delay >= self.deadline:
+            return False
+        if self.cancelled is None:
+            time.sleep(delay)
+        elif self.cancelled.wait(delay):
+            raise StepCancelledError()
+        return True
@@ -1,5 +1,6 @@
 from src.models.request import Request
-from src.preprocessing import evaluate
+from src.retry import RetryPolicy
+from src.preprocessing import Template
 
 
 class Step:
@@ -8,15 +9,20 @@ class Step:
         self,
         step: dict,
         steps: dict,
+        template: Template = None,
+        data: dict = None,
     ):
-        for key in step:
-            step[key] = evaluate(step[key], steps)
+        # A template compiled ahead of time only has its expression slots evaluated
+        if template is None:
+            template = Template(step)
+        step = template.render(steps, data)
 
         self.name = step["name"]
         self.operation_id = step["operation_id"]
         self.method = step["method"]
         self.path = step["path"]
-        self.status_code = step["status_code"]
+        # Rows of a dataset may give the expected status code, as text in a CSV
+        self.status_code = int(step["status_code"])
 
         if "headers" in step:
             self.headers = step["headers"]
@@ -41,7 +47,13 @@ class Step:
         else:
             self.auth = None
 
-    def construct_request(self, base_url, global_auth):
+        self.stream = step.get("stream", False)
+        self.timeout = step.get("timeout")
+        self.retry = RetryPolicy.from_step(step.get("retry"))
+
+    def construct_request(
+        self, base_url, global_auth, transport=None, deadline=None, cancelled=None
+    ):
         return Request(
             base_url=base_url,
             method=self.method,
@@ -51,4 +63,10 @@ class Step:
             global_auth=global_auth,
             auth=self.auth,
             body=self.body,
+            transport=transport,
+            stream=self.stream,
+            timeout=self.timeout,
+            retry=self.retry,
+            deadline=deadline,
+            cancelled=cancelled,
         )
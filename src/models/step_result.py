@@ -0,0 +1,61 @@
+from typing import Union
+
+from src.timing import StepTimings
+
+
+class StepResult:
+    """Outcome and timings of a single step, as written to the run reports"""
+
+    def __init__(
+        self,
+        name: str,
+        operation_id: str,
+        status: str,
+        duration: float = 0.0,
+        timings: Union[StepTimings, None] = None,
+        status_code: Union[int, None] = None,
+        error: Union[str, None] = None,
+        step_file: Union[str, None] = None,
+        cached: bool = False,
+        rows: Union[int, None] = None,
+        failed_rows: int = 0,
+    ):
+        self.name = name
+        self.operation_id = operation_id
+        # One of "passed", "failed" or "skipped"
+        self.status = status
+        self.duration = duration
+        self.timings = timings or StepTimings()
+        self.status_code = status_code
+        self.error = error
+        self.step_file = step_file
+        # Passed in an earlier run and was not run again
+        self.cached = cached
+        # Rows of the dataset the step ran over, if it has one
+        self.rows = rows
+        self.failed_rows = failed_rows
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "operation_id": self.operation_id,
+            "status": self.status,
+            "duration": self.duration,
+            "timings": self.timings.to_dict(),
+            "status_code": self.status_code,
+            "error": self.error,
+            "step_file": self.step_file,
+            "cached": self.cached,
+            "rows": self.rows,
+            "failed_rows": self.failed_rows,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StepResult":
+        """Rebuild a result written by to_dict, such as one read from a shard result"""
+        return cls(
+            **{
+                **data,
+                "timings": StepTimings.from_dict(data.get("timings", {})),
+            }
+        )
@@ -1,13 +1,16 @@
 import os
 import json
+from typing import Union
 
 import yaml
 from jsonschema import validate, ValidationError
 from json_ref_dict import materialize, RefDict
-from openapi_spec_validator import validate as validate_spec
-from openapi_spec_validator.exceptions import OpenAPISpecValidatorError
 
+from .catalog import OperationCatalog
 from .errors import *
+from .refs import LazySpec, LazyOperationCatalog
+from .reporter import get_reporter
+from .spec_cache import get_cache_key, load_cached_spec, store_cached_spec
 
 
 def parse_steps_file(step_file_path: str) -> dict:
@@ -42,129 +45,153 @@ def parse_steps_file(step_file_path: str) -> dict:
     except FileNotFoundError as e:
         raise FileNotFoundError(f"Steps file {step_file_path} not found") from e
 
-    print("[bold green]--Successfully Validated Steps File--[/bold green]")
+    # Datasets are found next to the steps file that names them
+    for step in steps["steps"]:
+        if "foreach" in step:
+            step["foreach"]["dataset"] = os.path.join(
+                os.path.dirname(step_file_path), step["foreach"]["dataset"]
+            )
+
+    get_reporter().stage("--Successfully Validated Steps File--", "success")
     return steps
 
 
-def parse_spec_file(steps: dict, spec_file_path: str) -> tuple:
-    """Parse a valid OpenAPI document into a python dictionary
+def load_spec_file(spec_file_path: str, cache_dir: str = None) -> dict:
+    """Materialize and validate an OpenAPI document, using the on-disk cache if given
 
     Args:
         spec_file_path (str): Relative path to OpenAPI spec file
+        cache_dir (str): Directory of the spec cache, or None to skip the cache
 
     Raises:
         OpenAPIValidationError: Invalid API Definition
         FileNotFoundError: Spec file not found
-        UnsupportedSchemaError: Schema not supported
 
     Returns:
-        tuple: Returns a tuple containing two dictionaries - the parsed API spec and
-            a dictionary with all the openapi operations for quick reference
+        dict: The materialized API spec
     """
     try:
+        key = None
+        if cache_dir:
+            key = get_cache_key(spec_file_path)
+            entry = load_cached_spec(cache_dir, key)
+            if entry is not None:
+                if entry["error"] is None:
+                    return entry["spec"]
+                raise_spec_error(entry["kind"], entry["error"])
+
         spec = materialize(RefDict(spec_file_path))
-        validate_spec(spec)
+        error = validate_spec(spec)
+        if key is not None:
+            kind, message = error or (None, None)
+            entry = {"spec": None if error else spec, "error": message, "kind": kind}
+            store_cached_spec(cache_dir, key, entry)
+        if error is not None:
+            raise_spec_error(*error)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"API Spec file {spec_file_path} not found") from e
+
+    return spec
+
+
+def validate_spec(spec: dict) -> Union[tuple[str, str], None]:
+    """Validate a materialized spec against the OpenAPI schema
+
+    openapi_spec_validator takes longer to import than a run with a cached spec takes
+    to start, so it is only imported here.
+
+    Args:
+        spec (dict): The materialized API spec
+
+    Returns:
+        Union[tuple[str, str], None]: The kind of error, "schema" or "spec", and its
+            message, or None if the spec is valid
+    """
+    from openapi_spec_validator import validate
+    from openapi_spec_validator.exceptions import OpenAPISpecValidatorError
+
+    try:
+        validate(spec)
     except OpenAPISpecValidatorError as e:
-        raise OpenAPISpecValidatorError(
-            f"API Spec file has the following syntax errors: {e} "
-        ) from e
+        return "spec", str(e)
     except ValidationError as e:
-        raise ValidationError(
-            f"API Spec file has the following syntax errors: {e.message} "
-        ) from e
+        return "schema", e.message
+    return None
+
+
+def raise_spec_error(kind: str, message: str):
+    """Raise the error that validate_spec found
+
+    Raises:
+        ValidationError: The spec does not match the OpenAPI schema
+        OpenAPISpecValidatorError: The spec is invalid in some other way
+    """
+    message = f"API Spec file has the following syntax errors: {message} "
+    if kind == "schema":
+        raise ValidationError(message)
+
+    from openapi_spec_validator.exceptions import OpenAPISpecValidatorError
+
+    raise OpenAPISpecValidatorError(message)
+
+
+def load_lazy_spec_file(spec_file_path: str) -> LazyOperationCatalog:
+    """Index an OpenAPI document without resolving its $refs up front
+
+    Only the path items are read here; each operation is resolved when its schemas
+    are first needed. The document is not validated against the OpenAPI schema.
+
+    Args:
+        spec_file_path (str): Relative path to OpenAPI spec file
+
+    Raises:
+        FileNotFoundError: Spec file not found
+
+    Returns:
+        LazyOperationCatalog: Catalog of the operations in the spec
+    """
+    try:
+        return LazyOperationCatalog(LazySpec(spec_file_path))
     except FileNotFoundError as e:
         raise FileNotFoundError(f"API Spec file {spec_file_path} not found") from e
 
-    # Get list of steps operationIds
-    steps_operation_id_list = []
-    for step in steps["steps"]:
-        steps_operation_id_list.append(step["operation_id"])
-
-    # Create operation schemas dict for easier parsing
-    operation_schemas: dict = {}
-    for path in spec["paths"]:
-        for method in spec["paths"][path]:
-            op_id = spec["paths"][path][method]["operationId"]
-            if op_id in steps_operation_id_list:
-                operation = spec["paths"][path][method]
-                operation_schemas[op_id] = {}
-
-                # Parse and Validate Request Bodies
-                if "requestBody" in operation.keys():
-                    # TODO: Support multiple content types if one of them is JSON
-                    if len(operation["requestBody"]["content"]) > 1:
-                        if (
-                            "application/json"
-                            not in operation["responses"][status_code]["content"]
-                        ):
-                            raise UnsupportedSchemaError(
-                                f"There are too many request body content types for"
-                                f" the operation: {op_id}"
-                            )
-                    if "application/json" in operation["requestBody"]["content"].keys():
-                        operation_schemas[op_id]["requestBody"] = operation[
-                            "requestBody"
-                        ]["content"]["application/json"]["schema"]
-                    elif (
-                        "application/octet-stream"
-                        in operation["requestBody"]["content"].keys()
-                    ):
-                        operation_schemas[op_id]["requestBody"] = operation[
-                            "requestBody"
-                        ]["content"]["application/octet-stream"]["schema"]
-                    else:
-                        raise UnsupportedSchemaError(
-                            f"request body content type: "
-                            f"{list(operation['requestBody']['content'].keys())[0]}"
-                            f" unsupported for the operation: {op_id}"
-                        )
-
-                # Parse and Validate Response Bodies
-                operation_schemas[op_id]["responses"] = {}
-                for status_code in operation["responses"].keys():
-                    if "content" in operation["responses"][status_code].keys():
-                        # TODO: Support multiple content types if one of them is JSON
-                        if len(operation["responses"][status_code]["content"]) > 1:
-                            if (
-                                "application/json"
-                                not in operation["responses"][status_code]["content"]
-                            ):
-                                raise UnsupportedSchemaError(
-                                    f"There are too many response body content types for"
-                                    f" the operation: {op_id}"
-                                )
-                        if (
-                            "application/json"
-                            in operation["responses"][status_code]["content"].keys()
-                        ):
-                            operation_schemas[op_id]["responses"][
-                                status_code
-                            ] = operation["responses"][status_code]["content"][
-                                "application/json"
-                            ][
-                                "schema"
-                            ]
-                        elif (
-                            "application/octet-stream"
-                            in operation["responses"][status_code]["content"].keys()
-                        ):
-                            operation_schemas[op_id]["responses"][
-                                status_code
-                            ] = operation["responses"][status_code]["content"][
-                                "application/octet-stream"
-                            ][
-                                "schema"
-                            ]
-                        else:
-                            raise UnsupportedSchemaError(
-                                f"response body content type: "
-                                f"{list(operation['responses'][status_code]['content'].keys())[0]}"
-                                f" unsupported for the operation: {op_id}"
-                            )
-                    else:
-                        operation_schemas[op_id]["responses"][status_code] = operation[
-                            "responses"
-                        ][status_code]
-
-    print("[bold green]--Successfully Validated Spec File--[/bold green]")
-    return spec, operation_schemas
+
+def parse_operation_schemas(steps: dict, catalog: OperationCatalog) -> dict:
+    """Get the schemas of every documented operation used by the steps file
+
+    Args:
+        steps (dict): Parsed steps file
+        catalog (OperationCatalog): Catalog of the parsed API spec
+
+    Raises:
+        UnsupportedSchemaError: Schema not supported
+
+    Returns:
+        dict: Request body and response schemas keyed by operationId
+    """
+    operation_schemas = catalog.operation_schemas(
+        step["operation_id"] for step in steps["steps"]
+    )
+
+    get_reporter().stage("--Successfully Validated Spec File--", "success")
+    return operation_schemas
+
+
+def parse_spec_file(steps: dict, spec_file_path: str, cache_dir: str = None) -> tuple:
+    """Parse a valid OpenAPI document into a python dictionary
+
+    Args:
+        spec_file_path (str): Relative path to OpenAPI spec file
+        cache_dir (str): Directory of the spec cache, or None to skip the cache
+
+    Raises:
+        OpenAPIValidationError: Invalid API Definition
+        FileNotFoundError: Spec file not found
+        UnsupportedSchemaError: Schema not supported
+
+    Returns:
+        tuple: Returns a tuple containing two dictionaries - the parsed API spec and
+            a dictionary with all the openapi operations for quick reference
+    """
+    spec = load_spec_file(spec_file_path, cache_dir)
+    return spec, parse_operation_schemas(steps, OperationCatalog(spec))
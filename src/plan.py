@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterable
+
+from .errors import PlanMismatchError
+from .shared_json import decode_shared, encode_shared
+from .spec_cache import get_referenced_files
+
+# Bumped whenever the layout of a plan file changes
+PLAN_VERSION = 2
+
+
+def get_file_hash(path: str) -> str:
+    """Hash the contents of a file"""
+    with open(path, "rb") as source:
+        return hashlib.sha256(source.read()).hexdigest()
+
+
+def get_source_hashes(
+    step_file_paths: Iterable[str], spec_file_path: str
+) -> dict[str, str]:
+    """Hash the steps files, the spec file and every local file the spec references
+
+    Args:
+        step_file_paths (Iterable[str]): Steps files compiled into the plan
+        spec_file_path (str): The OpenAPI spec file
+
+    Returns:
+        dict[str, str]: sha256 digests keyed by path, relative to the working directory
+    """
+    paths = list(step_file_paths) + [
+        os.path.relpath(path) for path in get_referenced_files(spec_file_path)
+    ]
+    return {path: get_file_hash(path) for path in dict.fromkeys(paths)}
+
+
+def build_plan(
+    spec_file_path: str,
+    step_files: dict[str, dict],
+    graphs: dict[str, dict[str, set[str]]],
+    operation_schemas: dict,
+    spec_operations: Iterable[str] = (),
+) -> dict:
+    """Assemble a plan from steps files that were parsed and checked against the spec
+
+    Args:
+        spec_file_path (str): The OpenAPI spec file
+        step_files (dict[str, dict]): Parsed steps files keyed by path, in run order
+        graphs (dict[str, dict[str, set[str]]]): Dependency graph of each steps file
+        operation_schemas (dict): Schemas of every operation the steps files use
+        spec_operations (Iterable[str]): operationIds of the spec, which coverage is
+            measured against
+
+    Returns:
+        dict: The plan, ready to be written with write_plan
+    """
+    body, definitions = encode_shared(
+        {
+            "files": [
+                {
+                    "path": path,
+                    "steps": steps,
+                    "graph": {
+                        name: sorted(dependencies)
+                        for name, dependencies in graphs[path].items()
+                    },
+                }
+                for path, steps in step_files.items()
+            ],
+            "schemas": operation_schemas,
+        }
+    )
+    return {
+        "version": PLAN_VERSION,
+        "spec_file": spec_file_path,
+        "sources": get_source_hashes(step_files, spec_file_path),
+        "operations": sorted(spec_operations),
+        **body,
+        "$defs": definitions,
+    }
+
+
+def write_plan(plan: dict, path: str):
+    """Write a plan atomically, so runners never read a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as plan_file:
+            json.dump(plan, plan_file, separators=(",", ":"))
+        # mkstemp makes the file private, but a plan is meant to be shared
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load_plan(path: str, check_sources: bool = True) -> dict:
+    """Read a plan written by write_plan
+
+    Nothing is parsed or validated beyond the JSON itself: the steps and schemas are
+    used as they were when the plan was compiled.
+
+    Args:
+        path (str): Plan file
+        check_sources (bool): Compare the sources that are present in the working
+            directory against the hashes they were compiled from. Sources that are
+            missing are not checked, so a plan can run on its own.
+
+    Raises:
+        FileNotFoundError: Plan file not found
+        PlanMismatchError: The plan has another version, or a source changed since
+            it was compiled
+
+    Returns:
+        dict: The plan, with "files" holding each steps file's "path", parsed "steps"
+            and dependency "graph", "schemas" holding the operation schemas and
+            "operations" the operationIds of the spec
+    """
+    try:
+        with open(path, "r") as plan_file:
+            plan = json.load(plan_file)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Plan file {path} not found") from e
+
+    if plan.get("version") != PLAN_VERSION:
+        raise PlanMismatchError(
+            path, f"it has version {plan.get('version')}, not {PLAN_VERSION}"
+        )
+
+    if check_sources:
+        changed = [
+            source
+            for source, digest in plan["sources"].items()
+            if os.path.isfile(source) and get_file_hash(source) != digest
+        ]
+        if changed:
+            raise PlanMismatchError(path, f"these sources changed: {changed}")
+
+    body = decode_shared(
+        {"files": plan["files"], "schemas": plan["schemas"]}, plan["$defs"]
+    )
+    for step_file in body["files"]:
+        step_file["graph"] = {
+            name: set(dependencies) for name, dependencies in step_file["graph"].items()
+        }
+    return {**plan, **body}
@@ -1,33 +1,62 @@
 import os
 import re
+from typing import Union
 
+from .catalog import OperationCatalog
 from .errors import (
     InsufficientCoverageError,
     UndocumentedOperationError,
     BaseContextError,
     EvaluationError,
     EnvironmentVariableError,
+    InvalidExpressionError,
 )
-from rich import print
 
+EXPRESSION_PATTERN = re.compile(r"(\${{[^/}]*}})")
 
-def get_operation_coverage(steps: dict, spec: dict):
+
+def get_operation_coverage(
+    steps: dict, spec: dict, catalog: Union[OperationCatalog, None] = None
+):
     steps_operations = set()
     for operation in steps["steps"]:
         steps_operations.add(operation["operation_id"])
 
-    spec_operations = set()
-    for path in spec["paths"]:
-        for method in spec["paths"][path]:
-            op_id = spec["paths"][path][method]["operationId"]
-            spec_operations.add(op_id)
+    if catalog is None:
+        catalog = OperationCatalog(spec)
+    spec_operations = catalog.operation_ids
 
     return steps_operations, spec_operations
 
 
-def check_operation_coverage(steps: dict, spec: dict):
-    steps_operations, spec_operations = get_operation_coverage(steps, spec)
+def check_operation_coverage(
+    steps: dict,
+    spec: dict,
+    catalog: Union[OperationCatalog, None] = None,
+    enforce_threshold: bool = True,
+):
+    steps_operations, spec_operations = get_operation_coverage(steps, spec, catalog)
+    target_coverage = steps.get("coverage_threshold") if enforce_threshold else None
+    check_coverage(steps_operations, spec_operations, target_coverage)
+
+
+def check_coverage(
+    steps_operations: set[str],
+    spec_operations: set[str],
+    target_coverage: Union[float, None] = None,
+):
+    """Check the operations run by some steps against the operations of the spec
+
+    Args:
+        steps_operations (set[str]): operationIds of the steps
+        spec_operations (set[str]): operationIds of the spec
+        target_coverage (Union[float, None]): Share of the spec's operations the
+            steps must cover, if any
 
+    Raises:
+        UndocumentedOperationError: Some steps run operations the spec does not have
+        InsufficientCoverageError: The steps cover less than target_coverage
+    """
     covered = spec_operations & steps_operations
     uncovered = spec_operations - steps_operations
     undocumented = steps_operations - spec_operations
@@ -41,80 +70,219 @@ def check_operation_coverage(steps: dict, spec: dict):
     else:
         has_undocumented_operations = False
 
+    # The reporter imports the models, which import this module
+    from .reporter import get_reporter
+
+    reporter = get_reporter()
+
     # If any undocumented operations, immediately halt
-    print("--Checking for Uncovered Operations--")
+    reporter.stage("--Checking for Uncovered Operations--")
     if has_undocumented_operations:
         raise UndocumentedOperationError(undocumented)
 
     # Check if operation coverage meets threshold
-    print("--Validating Coverage Threshold--")
-    if "coverage_threshold" in steps:
-        target_coverage: float = steps["coverage_threshold"]
-
+    reporter.stage("--Validating Coverage Threshold--")
+    if target_coverage is not None:
         if proportion_covered < target_coverage:
             raise InsufficientCoverageError(
                 proportion_covered, target_coverage, uncovered
             )
 
-    print("[bold green]--Coverage Threshold Met--[/bold green]")
+    reporter.stage("--Coverage Threshold Met--", "success")
 
 
-def evaluate(expression: any, steps={}) -> any:
-    """
-    Recursively evaluate nested expressions using depth-first search.
-    Eventually the evaluation result as a string is returned.
-    The only allowed base contexts are "env" and "steps".
-    Args:
-        expression (str): Object of any type that may contain expression(s)
-        steps (dict): Dictionary of steps
-    Raises:
-        EnvironmentVariableError:
-            if the expression represents an environment variable but it cannot be found
-    Returns:
-        The evaluated result as a string if there is any expression, original value otherwise.
+class Template:
+    """A steps file value compiled once into the expression slots it contains
+
+    Literal subtrees are shared as-is between renders, and each `${{ }}` slot becomes
+    an accessor: an environment lookup, an attribute/key path into a step result or a
+    key path into the row of a dataset. Rendering only walks the parts of the value
+    that contain slots.
+
+    Attributes:
+        value (any): The value the template was compiled from
+        references (set[str]): Names of the steps the slots read from
+        paths (set[tuple[str, ...]]): Full paths read from step results, such as
+            ("create", "response", "body", "id")
+        uses_data (bool): Whether a slot reads from the row of a dataset
     """
 
-    if expression is None:
-        return
+    def __init__(self, value: any):
+        self.value = value
+        self.references: set[str] = set()
+        self.paths: set[tuple[str, ...]] = set()
+        self.uses_data = False
+        self._render = self._compile(value)
+
+    def render(self, steps: dict = {}, data: Union[dict, None] = None) -> any:
+        """Evaluate every slot against the results of previous steps
+
+        Args:
+            steps (dict): Dictionary of steps
+            data (Union[dict, None]): Row of the dataset the step runs over, if any
+
+        Raises:
+            EnvironmentVariableError: An environment variable cannot be found
+            EvaluationError: A step result has no such attribute, or the row has no
+                such key
+
+        Returns:
+            A copy of the value with each expression replaced by its result as a
+            string. A value that is a single data expression gets the row's value
+            as it is, so JSON Lines rows keep their types.
+        """
+        if self._render is None:
+            return self.value
+        return self._render(steps, data)
+
+    def _compile(self, value: any):
+        # Returns a function rendering the value, or None if the value is literal
+        if isinstance(value, dict):
+            slots = [
+                (key, render)
+                for key, render in ((k, self._compile(v)) for k, v in value.items())
+                if render is not None
+            ]
+            if not slots:
+                return None
+
+            def render_dict(steps: dict, data: Union[dict, None]) -> dict:
+                result = dict(value)
+                for key, render in slots:
+                    result[key] = render(steps, data)
+                return result
+
+            return render_dict
 
-    # Evaluate each value in a dictionary
-    if isinstance(expression, dict):
-        return dict(map(lambda x: (x[0], evaluate(x[1], steps)), expression.items()))
+        if isinstance(value, list):
+            slots = [
+                (index, render)
+                for index, render in enumerate(map(self._compile, value))
+                if render is not None
+            ]
+            if not slots:
+                return None
 
-    # Evaluate each element in a list
-    if isinstance(expression, list):
-        return list(map(lambda x: evaluate(x, steps), expression))
+            def render_list(steps: dict, data: Union[dict, None]) -> list:
+                result = list(value)
+                for index, render in slots:
+                    result[index] = render(steps, data)
+                return result
 
-    if not isinstance(expression, str):
-        return expression
+            return render_list
 
-    matches: list[str] = re.findall(r"(\${{[^/}]*}})", expression)
-    if not matches:
-        return expression
+        if not isinstance(value, str):
+            return None
 
-    for match in matches:
+        # The capturing group makes every odd part an expression
+        parts = EXPRESSION_PATTERN.split(value)
+        if len(parts) == 1:
+            return None
+
+        pieces = [
+            self._compile_expression(part) if index % 2 else part
+            for index, part in enumerate(parts)
+            if part
+        ]
+        if len(parts) == 3 and not parts[0] and not parts[2]:
+            expression = parts[1].removeprefix("${{").strip()
+            if expression.startswith("data."):
+                return pieces[0]
+
+        def render_string(steps: dict, data: Union[dict, None]) -> str:
+            return "".join(
+                piece if isinstance(piece, str) else str(piece(steps, data))
+                for piece in pieces
+            )
+
+        return render_string
+
+    def _compile_expression(self, match: str):
         value = match.removeprefix("${{").removesuffix("}}").strip()
         base = value.split(".").pop(0)
 
         if base == "env":
             # Only split at the first dot
-            result = os.environ.get(value.split(".", 1)[1])
-            if result is None:
-                raise EnvironmentVariableError(value)
-        elif base == "steps":
+            if "." not in value:
+                raise InvalidExpressionError(value)
+            name = value.split(".", 1)[1]
+
+            def access_env(steps: dict, data: Union[dict, None]) -> str:
+                result = os.environ.get(name)
+                if result is None:
+                    raise EnvironmentVariableError(value)
+                return result
+
+            return access_env
+
+        if base == "steps":
+            # steps.<name>.<entry>.<attribute>[.<key>...]
             value_array = value.split(".")
-            value_dict = f"{value_array[0]}['{value_array[1]}']['{value_array[2]}'].{value_array[3]}"
-            for idx, val in enumerate(value_array):
-                if idx > 3:
-                    value_dict += f"['{val}']"
-            try:
-                result = eval(value_dict)
-            except AttributeError as e:
-                raise EvaluationError(e)
-        else:
-            raise BaseContextError(base)
-
-        # Only replace the first occurrence
-        expression = expression.replace(match, str(result), 1)
-
-    return expression
+            if len(value_array) < 4:
+                raise InvalidExpressionError(value)
+            step_name, entry, attribute, keys = (
+                value_array[1],
+                value_array[2],
+                value_array[3],
+                value_array[4:],
+            )
+            self.references.add(step_name)
+            self.paths.add(tuple(value_array[1:]))
+
+            def access_step(steps: dict, data: Union[dict, None]) -> any:
+                try:
+                    result = getattr(steps[step_name][entry], attribute)
+                except AttributeError as e:
+                    raise EvaluationError(e)
+                for key in keys:
+                    if isinstance(result, list) and key.isdigit():
+                        result = result[int(key)]
+                    else:
+                        result = result[key]
+                return result
+
+            return access_step
+
+        if base == "data":
+            # data.<column>[.<key>...]
+            keys = value.split(".")[1:]
+            if not keys or not all(keys):
+                raise InvalidExpressionError(value)
+            self.uses_data = True
+
+            def access_data(steps: dict, data: Union[dict, None]) -> any:
+                if data is None:
+                    raise EvaluationError(
+                        f"{value} can only be used in a step with a foreach dataset"
+                    )
+                result = data
+                try:
+                    for key in keys:
+                        if isinstance(result, list) and key.isdigit():
+                            result = result[int(key)]
+                        else:
+                            result = result[key]
+                except (KeyError, IndexError, TypeError) as e:
+                    raise EvaluationError(f"The row has no value for {value}") from e
+                return result
+
+            return access_data
+
+        raise BaseContextError(base)
+
+
+def evaluate(expression: any, steps={}) -> any:
+    """
+    Recursively evaluate nested expressions using depth-first search.
+    Eventually the evaluation result as a string is returned.
+    The only allowed base contexts are "env", "steps" and "data".
+    Args:
+        expression (str): Object of any type that may contain expression(s)
+        steps (dict): Dictionary of steps
+    Raises:
+        EnvironmentVariableError:
+            if the expression represents an environment variable but it cannot be found
+    Returns:
+        The evaluated result as a string if there is any expression, original value otherwise.
+    """
+    return Template(expression).render(steps)
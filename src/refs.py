@@ -0,0 +1,138 @@
+import os
+from urllib.parse import unquote
+
+import yaml
+
+from .catalog import OperationCatalog
+from .errors import UnsupportedSchemaError
+
+# The C loader is several times faster on large specs when libyaml is available
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class LazySpec:
+    """An OpenAPI document whose $refs are only resolved when a subtree is asked for
+
+    Every referenced target is resolved once and shared by all of its referrers, and
+    recursive references point back at the object being resolved instead of expanding
+    forever, the same way json_ref_dict.materialize does.
+    """
+
+    def __init__(self, spec_file_path: str):
+        self.spec_file_path = os.path.abspath(spec_file_path)
+
+        self._documents: dict[str, any] = {}
+        self._resolved: dict[str, any] = {}
+        self._path_items: dict[str, tuple[dict, str]] = {}
+
+        # Shallow pass: only path items are dereferenced so operationIds can be read
+        root = self.document(self.spec_file_path)
+        for path, path_item in root.get("paths", {}).items():
+            base = self.spec_file_path
+            while isinstance(path_item, dict) and "$ref" in path_item:
+                path_item, base = self._lookup(path_item["$ref"], base)
+            self._path_items[path] = (path_item, base)
+
+        self.spec = {
+            **{key: value for key, value in root.items() if key != "paths"},
+            "paths": {path: item for path, (item, _) in self._path_items.items()},
+        }
+
+    def document(self, path: str) -> any:
+        """Load a YAML or JSON document once"""
+        if path not in self._documents:
+            with open(path, "r") as document_file:
+                self._documents[path] = yaml.load(document_file, Loader=YamlLoader)
+        return self._documents[path]
+
+    def operation(self, method: str, path: str) -> dict:
+        """Get an operation with every $ref under it resolved
+
+        Args:
+            method (str): HTTP method of the operation
+            path (str): Path template of the operation
+
+        Returns:
+            dict: The resolved operation object
+        """
+        path_item, base = self._path_items[path]
+        for key, operation in path_item.items():
+            if key.lower() == method.lower():
+                return self.resolve(operation, base)
+        raise KeyError(f"{method} {path}")
+
+    def resolve(self, node: any, base: str) -> any:
+        """Resolve every $ref in a node
+
+        Args:
+            node (any): Node of a document
+            base (str): Absolute path of the document the node belongs to
+
+        Returns:
+            any: Copy of the node with its references replaced by their targets
+        """
+        if isinstance(node, dict):
+            if isinstance(node.get("$ref"), str):
+                return self._resolve_ref(node["$ref"], base)
+            return {key: self.resolve(value, base) for key, value in node.items()}
+
+        if isinstance(node, list):
+            return [self.resolve(value, base) for value in node]
+
+        return node
+
+    def _resolve_ref(self, ref: str, base: str) -> any:
+        target, target_base = self._lookup(ref, base)
+        uri = f"{target_base}#{ref.partition('#')[2]}"
+        if uri in self._resolved:
+            return self._resolved[uri]
+
+        # Register a placeholder first so that recursive references resolve to it
+        if isinstance(target, dict):
+            placeholder = self._resolved[uri] = {}
+            resolved = self.resolve(target, target_base)
+            if isinstance(resolved, dict):
+                placeholder.update(resolved)
+                return placeholder
+        elif isinstance(target, list):
+            placeholder = self._resolved[uri] = []
+            placeholder.extend(self.resolve(target, target_base))
+            return placeholder
+        else:
+            resolved = target
+
+        self._resolved[uri] = resolved
+        return resolved
+
+    def _lookup(self, ref: str, base: str) -> tuple[any, str]:
+        file_part, _, pointer = ref.partition("#")
+        if "://" in file_part:
+            raise UnsupportedSchemaError(f"Remote reference {ref} in lazy mode")
+
+        path = (
+            os.path.normpath(os.path.join(os.path.dirname(base), file_part))
+            if file_part
+            else base
+        )
+
+        target = self.document(path)
+        for token in filter(None, unquote(pointer).split("/")):
+            token = token.replace("~1", "/").replace("~0", "~")
+            target = target[int(token)] if isinstance(target, list) else target[token]
+
+        return target, path
+
+
+class LazyOperationCatalog(OperationCatalog):
+    """OperationCatalog over a LazySpec that resolves an operation on first use"""
+
+    def __init__(self, lazy_spec: LazySpec):
+        super().__init__(lazy_spec.spec)
+        self.lazy_spec = lazy_spec
+        self._resolved_operations: dict[str, dict] = {}
+
+    def operation(self, op_id: str) -> dict:
+        if op_id not in self._resolved_operations:
+            method, path = self.route(op_id)
+            self._resolved_operations[op_id] = self.lazy_spec.operation(method, path)
+        return self._resolved_operations[op_id]
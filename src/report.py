@@ -0,0 +1,146 @@
+import json
+import xml.etree.ElementTree as ET
+
+from rich.table import Table
+
+from .models import StepResult
+from .timing import PHASES
+
+# Column headers of the timing phases in the slowest steps table
+PHASE_LABELS = {
+    "eval": "Eval",
+    "request_validation": "Request Check",
+    "dns": "DNS",
+    "connect": "Connect",
+    "tls": "TLS",
+    "ttfb": "TTFB",
+    "body": "Body",
+    "response_validation": "Response Check",
+}
+
+
+def get_summary(results: list[StepResult]) -> dict:
+    """Count the steps by status and add up their durations"""
+    summary = {"tests": len(results), "passed": 0, "failed": 0, "skipped": 0}
+    for result in results:
+        summary[result.status] += 1
+    summary["cached"] = sum(result.cached for result in results)
+    summary["duration"] = sum(result.duration for result in results)
+    return summary
+
+
+def write_json_report(results: list[StepResult], path: str):
+    """Write the results of a run as JSON
+
+    A path ending in .jsonl gets one JSON object per step, one per line. Any other
+    path gets a single object with a summary and the list of steps.
+
+    Args:
+        results (list[StepResult]): Results of every step in file order
+        path (str): File to write the report to
+    """
+    with open(path, "w") as report_file:
+        if path.endswith(".jsonl"):
+            for result in results:
+                report_file.write(json.dumps(result.to_dict()) + "\n")
+        else:
+            json.dump(
+                {**get_summary(results), "steps": [r.to_dict() for r in results]},
+                report_file,
+                indent=2,
+            )
+
+
+def write_junit_report(results: list[StepResult], path: str, name: str = "pypony"):
+    """Write the results of a run as JUnit XML, with a test suite per steps file
+
+    Args:
+        results (list[StepResult]): Results of every step in file order
+        path (str): File to write the report to
+        name (str): Name of the test suite of results without a steps file
+    """
+    suites: dict[str, list[StepResult]] = {}
+    for result in results:
+        suites.setdefault(result.step_file or name, []).append(result)
+
+    summary = get_summary(results)
+    root = ET.Element(
+        "testsuites",
+        tests=str(summary["tests"]),
+        failures=str(summary["failed"]),
+        skipped=str(summary["skipped"]),
+        time=f"{summary['duration']:.6f}",
+    )
+    for suite_name, suite_results in suites.items():
+        root.append(get_junit_suite(suite_results, suite_name))
+
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def get_junit_suite(results: list[StepResult], name: str) -> ET.Element:
+    """Build a JUnit test suite with a test case per step"""
+    summary = get_summary(results)
+    suite = ET.Element(
+        "testsuite",
+        name=name,
+        tests=str(summary["tests"]),
+        failures=str(summary["failed"]),
+        skipped=str(summary["skipped"]),
+        time=f"{summary['duration']:.6f}",
+    )
+
+    for result in results:
+        case = ET.SubElement(
+            suite,
+            "testcase",
+            name=result.name,
+            classname=result.operation_id,
+            time=f"{result.duration:.6f}",
+        )
+        if result.status == "failed":
+            ET.SubElement(case, "failure", message=result.error or "").text = result.error
+        elif result.status == "skipped":
+            ET.SubElement(case, "skipped")
+
+        properties = ET.SubElement(case, "properties")
+        if result.cached:
+            ET.SubElement(properties, "property", name="cached", value="true")
+        if result.rows is not None:
+            for name in ("rows", "failed_rows"):
+                value = str(getattr(result, name))
+                ET.SubElement(properties, "property", name=name, value=value)
+        for phase in PHASES:
+            ET.SubElement(
+                properties,
+                "property",
+                name=f"timing.{phase}",
+                value=f"{result.timings.phases[phase]:.6f}",
+            )
+
+    return suite
+
+
+def get_slowest_steps_table(results: list[StepResult], count: int = 5) -> Table:
+    """Tabulate the slowest steps that ran, with the time spent in each phase
+
+    Args:
+        results (list[StepResult]): Results of every step
+        count (int): Number of steps to show
+
+    Returns:
+        Table: One row per step, slowest first, in milliseconds
+    """
+    table = Table(title="Slowest Steps")
+    table.add_column("Step")
+    table.add_column("Total", justify="right")
+    for phase in PHASES:
+        table.add_column(PHASE_LABELS[phase], justify="right")
+
+    ran = [result for result in results if result.status != "skipped"]
+    for result in sorted(ran, key=lambda result: result.duration, reverse=True)[:count]:
+        table.add_row(
+            result.name,
+            f"{result.duration * 1000:.1f}",
+            *(f"{result.timings.phases[phase] * 1000:.1f}" for phase in PHASES),
+        )
+    return table
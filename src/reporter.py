@@ -0,0 +1,369 @@
+import io
+import json
+import sys
+import threading
+import traceback
+from typing import TextIO, Union
+
+from rich import get_console
+from rich.console import Console
+from rich.errors import MarkupError
+from rich.table import Table
+from rich.text import Text
+
+from .models import StepResult
+from .models.response import Response
+from .report import get_slowest_steps_table, get_summary
+
+# Characters of a response body printed with --verbose
+MAX_BODY_CHARS = 10_000
+
+# Longer bodies are printed as they are instead of being parsed to indent them
+MAX_PARSED_BODY_CHARS = 1_000_000
+
+# Seconds that output may wait in the buffer before it is written
+FLUSH_INTERVAL = 0.1
+
+# Buffered characters after which output is written right away
+FLUSH_SIZE = 64 * 1024
+
+LEVEL_STYLES = {
+    "info": None,
+    "success": "bold green",
+    "warning": "yellow",
+    "failure": "bold red",
+}
+
+
+class Reporter:
+    """Receives what happens during a run and presents it
+
+    Events are sent from one thread at a time, in the order they should be shown.
+    Every event is ignored here, so a sink only overrides the events it shows.
+    """
+
+    def stage(self, message: str, level: str = "info"):
+        """A stage of the run started or ended
+
+        Args:
+            message (str): Plain text, such as "--Validating Spec--"
+            level (str): "info", "success", "warning" or "failure"
+        """
+
+    def step(
+        self,
+        result: StepResult,
+        messages: Union[list[str], None] = None,
+        response: Union[Response, None] = None,
+        reason: Union[str, None] = None,
+        verbose: bool = False,
+    ):
+        """A step finished, or was skipped
+
+        Args:
+            result (StepResult): Outcome and timings of the step
+            messages (Union[list[str], None]): Failure and retry messages, in rich markup
+            response (Union[Response, None]): Full response, given with verbose
+            reason (Union[str, None]): Why the step was skipped
+            verbose (bool): Show the response and a line for passed steps
+        """
+
+    def summary(self, results: list[StepResult], slowest: int = 0):
+        """The run is over
+
+        Args:
+            results (list[StepResult]): Results of every step of every file
+            slowest (int): Number of slowest steps to show
+        """
+
+    def table(self, table: Table):
+        """A table for the terminal, such as the results of a benchmark"""
+
+    def error(self, error: BaseException, verbose: bool = False):
+        """The run failed with an error, shown with its traceback if verbose"""
+
+    def flush(self):
+        """Write out any buffered output"""
+
+    def close(self):
+        self.flush()
+
+
+class BufferedReporter(Reporter):
+    """Reporter that writes its output in batches rather than line by line
+
+    Output is written once FLUSH_SIZE characters are buffered, FLUSH_INTERVAL
+    seconds after the first of them was buffered, or when flushed.
+    """
+
+    def __init__(self, stream: Union[TextIO, None] = None):
+        # None writes to whatever sys.stdout is at the time
+        self.stream = stream
+        self._buffer = io.StringIO()
+        self._lock = threading.RLock()
+        self._timer: Union[threading.Timer, None] = None
+
+    def write(self, text: str):
+        with self._lock:
+            self._buffer.write(text)
+            if self._buffer.tell() >= FLUSH_SIZE:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            text = self._buffer.getvalue()
+            if not text:
+                return
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            stream = self.stream or sys.stdout
+            stream.write(text)
+            stream.flush()
+
+
+class TextReporter(BufferedReporter):
+    """Reporter that prints the run for people to read, in color on a terminal"""
+
+    def __init__(self, stream: Union[TextIO, None] = None):
+        super().__init__(stream)
+        self._console: Union[Console, None] = None
+
+    @property
+    def console(self) -> Console:
+        """Console that renders into the buffer as the stream would show it"""
+        if self._console is None:
+            target = get_console() if self.stream is None else Console(file=self.stream)
+            self._console = Console(
+                file=_ConsoleBuffer(self),
+                force_terminal=target.is_terminal,
+                color_system=target.color_system,
+                width=target.width,
+                highlight=False,
+                soft_wrap=True,
+            )
+        return self._console
+
+    def stage(self, message: str, level: str = "info"):
+        self.console.print(message, style=LEVEL_STYLES[level], markup=False)
+
+    def step(
+        self,
+        result: StepResult,
+        messages: Union[list[str], None] = None,
+        response: Union[Response, None] = None,
+        reason: Union[str, None] = None,
+        verbose: bool = False,
+    ):
+        console = self.console
+        console.print(f"Step Name: {result.name}", markup=False)
+        if reason is not None:
+            console.print(f"--Step Skipped: {reason}--", style="yellow", markup=False)
+            return
+        if result.cached:
+            console.print("--Cached Pass--", style="green", markup=False)
+        if result.rows is not None:
+            passed = result.rows - result.failed_rows
+            console.print(
+                f"Rows: {passed} passed, {result.failed_rows} failed", markup=False
+            )
+        if verbose and response is not None and response.body:
+            console.print("---Response---")
+            console.print(f"Status Code: {response.status_code}", markup=False)
+            console.out(format_body(response.body), highlight=False)
+        for message in messages or []:
+            console.print(message)
+        if verbose and result.status == "passed" and not result.cached:
+            console.print("--Step Verified--", style="bold green", markup=False)
+
+    def summary(self, results: list[StepResult], slowest: int = 0):
+        if slowest and results:
+            self.console.print(get_slowest_steps_table(results, slowest))
+
+    def table(self, table: Table):
+        self.console.print(table)
+
+    def error(self, error: BaseException, verbose: bool = False):
+        if verbose:
+            text = "".join(
+                traceback.format_exception(type(error), error, error.__traceback__)
+            )
+        else:
+            text = str(error)
+        self.console.out(text, highlight=False)
+
+
+class QuietReporter(TextReporter):
+    """TextReporter that only prints failed steps, failed stages and errors"""
+
+    def stage(self, message: str, level: str = "info"):
+        if level == "failure":
+            super().stage(message, level)
+
+    def step(
+        self,
+        result: StepResult,
+        messages: Union[list[str], None] = None,
+        response: Union[Response, None] = None,
+        reason: Union[str, None] = None,
+        verbose: bool = False,
+    ):
+        if result.status == "failed":
+            super().step(result, messages, response, reason, verbose)
+
+    def summary(self, results: list[StepResult], slowest: int = 0):
+        pass
+
+    def table(self, table: Table):
+        pass
+
+
+class JsonlReporter(BufferedReporter):
+    """Reporter that writes one JSON object per event, for tools to consume
+
+    Every object has an "event" key: "stage", "step", "summary" or "error". Step
+    events hold the step's result as in the JSON report, along with its messages as
+    plain text.
+    """
+
+    def emit(self, event: str, **fields):
+        self.write(json.dumps({"event": event, **fields}) + "\n")
+
+    def stage(self, message: str, level: str = "info"):
+        self.emit("stage", level=level, message=message)
+
+    def step(
+        self,
+        result: StepResult,
+        messages: Union[list[str], None] = None,
+        response: Union[Response, None] = None,
+        reason: Union[str, None] = None,
+        verbose: bool = False,
+    ):
+        self.emit(
+            "step",
+            **result.to_dict(),
+            messages=[to_plain(message) for message in messages or []],
+            reason=reason,
+        )
+
+    def summary(self, results: list[StepResult], slowest: int = 0):
+        self.emit("summary", **get_summary(results))
+
+    def error(self, error: BaseException, verbose: bool = False):
+        fields = {"type": type(error).__name__, "message": str(error)}
+        if verbose:
+            fields["traceback"] = "".join(
+                traceback.format_exception(type(error), error, error.__traceback__)
+            )
+        self.emit("error", **fields)
+
+
+class DeferredReporter(Reporter):
+    """Reporter that holds on to events to send them to another reporter later
+
+    Steps files running side by side each report to one, so that their output can be
+    shown whole, in the order the files were given.
+    """
+
+    def __init__(self):
+        self.events: list[tuple[str, tuple, dict]] = []
+
+    def stage(self, *args, **kwargs):
+        self.events.append(("stage", args, kwargs))
+
+    def step(self, *args, **kwargs):
+        self.events.append(("step", args, kwargs))
+
+    def summary(self, *args, **kwargs):
+        self.events.append(("summary", args, kwargs))
+
+    def table(self, *args, **kwargs):
+        self.events.append(("table", args, kwargs))
+
+    def error(self, *args, **kwargs):
+        self.events.append(("error", args, kwargs))
+
+    def replay(self, reporter: Reporter):
+        """Send the events held so far to reporter, and forget them"""
+        for name, args, kwargs in self.events:
+            getattr(reporter, name)(*args, **kwargs)
+        self.events = []
+
+
+class _ConsoleBuffer(io.TextIOBase):
+    # What rich renders is handed to the reporter's buffer as it is written
+
+    def __init__(self, reporter: BufferedReporter):
+        self.reporter = reporter
+
+    def write(self, text: str) -> int:
+        self.reporter.write(text)
+        return len(text)
+
+
+def format_body(body: Union[dict, list, str], limit: int = MAX_BODY_CHARS) -> str:
+    """Indent a JSON body for printing, cut short after limit characters
+
+    Only as much of the body as is printed is serialized.
+
+    Args:
+        body (Union[dict, list, str]): Parsed or raw response body
+        limit (int): Maximum number of characters to return, before the marker
+
+    Returns:
+        str: The body, ending in a marker if it was cut short
+    """
+    if isinstance(body, str):
+        if len(body) > MAX_PARSED_BODY_CHARS:
+            return _truncate(body, limit)
+        try:
+            body = json.loads(body)
+        except json.decoder.JSONDecodeError:
+            return _truncate(body, limit)
+
+    text = io.StringIO()
+    for chunk in json.JSONEncoder(indent=2, ensure_ascii=False).iterencode(body):
+        text.write(chunk)
+        if text.tell() > limit:
+            return text.getvalue()[:limit] + "\n... (truncated)"
+    return text.getvalue()
+
+
+def to_plain(message: str) -> str:
+    """Strip the rich markup from a message"""
+    try:
+        return Text.from_markup(message).plain
+    except MarkupError:
+        return message
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}\n... ({len(text) - limit} more characters)"
+
+
+REPORTERS = {"text": TextReporter, "quiet": QuietReporter, "jsonl": JsonlReporter}
+
+_reporter: Union[Reporter, None] = None
+
+
+def get_reporter() -> Reporter:
+    """Get the reporter of the run, a TextReporter on stdout unless one was set"""
+    global _reporter
+    if _reporter is None:
+        _reporter = TextReporter()
+    return _reporter
+
+
+def set_reporter(reporter: Union[Reporter, None]):
+    """Make reporter the one get_reporter returns; None goes back to the default"""
+    global _reporter
+    _reporter = reporter
@@ -1,26 +1,156 @@
-from .preprocessing import evaluate
-from .models import Step
+from .datasets import read_dataset
+from .errors import (
+    DatasetFailuresError,
+    SkippedStepError,
+    StepCancelledError,
+    StepFailuresError,
+)
+from .preprocessing import evaluate, Template
+from .models import Step, StepResult
+from .reporter import Reporter, get_reporter
+from .scheduler import build_dependency_graph, run_steps
+from .streaming import group_paths, project
+from .transport import Transport, default_transport
+from .timing import StepTimings, collect_timings
 from .verify import *
 
-from rich import print, print_json
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Union
 
+# Failed rows of a dataset step whose messages are reported; the rest are counted
+MAX_ROW_FAILURES = 10
+
+
+def get_global_auth(steps_data: dict) -> Union[dict, None]:
+    """Evaluate the auth shared by every step, if the step file defines one"""
+    if "auth" not in steps_data.keys():
+        return None
+
+    global_auth: dict = {}
+    for key, value in steps_data["auth"].items():
+        global_auth[key] = evaluate(value)
+    return global_auth
+
+
+def get_body_paths(templates: dict[str, Template]) -> dict[str, list[tuple]]:
+    """Collect the key paths into each step's response body that other steps read
+
+    Args:
+        templates (dict[str, Template]): Compiled steps keyed by name
+
+    Returns:
+        dict[str, list[tuple]]: Key paths keyed by the name of the step they read from
+    """
+    body_paths: dict[str, list[tuple]] = {}
+    for template in templates.values():
+        for name, entry, attribute, *keys in template.paths:
+            if entry == "response" and attribute == "body":
+                body_paths.setdefault(name, []).append(tuple(keys))
+    return body_paths
+
+
+def get_retained_paths(templates: dict[str, Template]) -> dict[str, list[tuple]]:
+    """Collect the paths into each step's result that other steps read
+
+    Args:
+        templates (dict[str, Template]): Compiled steps keyed by name
+
+    Returns:
+        dict[str, list[tuple]]: Paths following the step name, such as
+            ("response", "body", "id"), keyed by the name of the step they read from
+    """
+    retained_paths: dict[str, list[tuple]] = {}
+    for template in templates.values():
+        for name, *path in template.paths:
+            retained_paths.setdefault(name, []).append(tuple(path))
+    return retained_paths
+
+
+def retain_response(response: Response, paths: list[tuple]) -> Response:
+    """Copy a verified response keeping only the headers and body that paths reach
+
+    The status code is always kept for the step's result.
+
+    Args:
+        response (Response): The verified response
+        paths (list[tuple]): Paths from get_retained_paths for the step
+
+    Returns:
+        Response: The projected response
+    """
+    groups = group_paths(path[1:] for path in paths if path[0] == "response")
+    return Response(
+        status_code=response.status_code,
+        headers=project(response.headers, groups["headers"])
+        if "headers" in groups
+        else {},
+        body=project(response.body, groups["body"]) if "body" in groups else None,
+    )
+
+
+def decode_response_body(response: Response, response_schema: dict):
+    """Parse the body of a response in place when its schema expects JSON
+
+    Raises:
+        Exception: The response data is not valid JSON
+    """
+    if response_schema.get("type") in ("object", "array"):
+        try:
+            response.body = json.loads(response.body)
+        except json.decoder.JSONDecodeError as e:
+            raise Exception(f"Response data is not valid JSON: {e}") from e
+
 
 def make_requests(
-    steps_data: dict, operation_schemas: dict, fail_fast: bool, verbose: bool
-):
+    steps_data: dict,
+    operation_schemas: dict,
+    fail_fast: bool,
+    verbose: bool,
+    jobs: int = 1,
+    transport: Union[Transport, None] = None,
+    validators: Union[ValidatorRegistry, None] = None,
+    results: Union[list, None] = None,
+    reporter: Union[Reporter, None] = None,
+    deadline: Union[float, None] = None,
+    cancelled: Union[threading.Event, None] = None,
+    cached: Union[set[str], None] = None,
+) -> list[StepResult]:
+    """Run every step of the steps file, printing their results in file order
+
+    With fail_fast, the first failure cancels the run: no further step is started,
+    the requests in flight are aborted and the failure is raised. Otherwise every step
+    that does not depend on a failed step still runs, the ones that do are skipped,
+    and the failures are raised together at the end.
+
+    Each step is reported to reporter, or to the one of the run if it is not given.
+    Steps fail with DeadlineExceededError once the time.monotonic() deadline has passed.
+
+    Args:
+        cancelled (Union[threading.Event, None]): Set to cancel the run, which a
+            failure does with fail_fast. Runs sharing it are cancelled together.
+        cached (Union[set[str], None]): Names of the steps that passed in an earlier
+            run, which are reported as passed without running them
+
+    Raises:
+        StepFailuresError: More than one step failed; a single failure is raised as is
+
+    Returns:
+        list[StepResult]: Outcome and timings of every step, which are also appended
+            to results when given so they are available when a step fails
+    """
 
     base_url: str = steps_data["base_url"]
+    transport = transport or default_transport()
+    validators = validators or ValidatorRegistry(operation_schemas)
+    if cancelled is None:
+        cancelled = threading.Event()
+    cached = cached or set()
 
     # Set global auth if it exists in the step file
-    global_auth: Union[dict, None] = None
-    if "auth" in steps_data.keys():
-        global_auth: dict = {}
-        for key, value in steps_data["auth"].items():
-            global_auth[key] = evaluate(value)
-    else:
-        global_auth = None
+    global_auth = get_global_auth(steps_data)
 
     # Get steps list
     steps_data: list = steps_data["steps"]
@@ -28,56 +158,461 @@ def make_requests(
     # Create Global Steps List
     steps: dict = {}
 
-    for s in steps_data:
-        print(f"Step Name: {s['name']}")
-        step = Step(s, steps)
-        request = step.construct_request(base_url, global_auth)
+    # Compile every step once; running a step then only evaluates its expression slots
+    templates = {s["name"]: Template(s) for s in steps_data}
+
+    # Parts of each step's response body that later steps read
+    body_paths = get_body_paths(templates)
+
+    # Only these parts of a step's result are kept once it is verified, so memory
+    # does not grow with the size of the responses over a long run
+    retained_paths = get_retained_paths(templates)
 
+    # Independent steps may run concurrently, dependent ones wait for their inputs
+    graph = build_dependency_graph(steps_data, templates)
+
+    # Output of every step, written by the workers and printed here in file order
+    reports: dict = {}
+
+    # The failure that cancelled the run when failing fast
+    failure = None
+    lock = threading.Lock()
+
+    def cancel_run(error: Exception) -> bool:
+        # Returns whether this error is the one that cancelled the run
+        nonlocal failure
+        with lock:
+            if cancelled.is_set():
+                return False
+            failure = error
+            cancelled.set()
+        transport.cancel()
+        return True
+
+    def run_step(s: dict):
+        report = reports[s["name"]] = {
+            "response": None,
+            "messages": [],
+            "error": None,
+            "timings": StepTimings(),
+            "duration": 0.0,
+            "cached": s["name"] in cached,
+        }
+        if report["cached"]:
+            return
+        started = time.perf_counter()
         try:
-            response_schema = operation_schemas[s["operation_id"]]["responses"][
-                str(s["status_code"])
-            ]
-        except KeyError as e:
-            print("[bold red]Response Validation Error[/bold red]")
-            raise KeyError(
-                f"Response code of {e} not found in responses for {s['operation_id']}"
-            ) from e
-
-        if "requestBody" in operation_schemas[s["operation_id"]].keys():
-            verify_request_body(
-                request.body, operation_schemas[s["operation_id"]]["requestBody"]
+            if cancelled.is_set():
+                raise StepCancelledError()
+            if "foreach" in s:
+                run_dataset_step(
+                    s,
+                    steps,
+                    base_url,
+                    global_auth,
+                    operation_schemas,
+                    transport,
+                    report,
+                    validators,
+                    templates[s["name"]],
+                    jobs,
+                    fail_fast,
+                    deadline,
+                    cancelled,
+                )
+                return
+            with collect_timings(report["timings"]):
+                run_step_request(
+                    s,
+                    steps,
+                    base_url,
+                    global_auth,
+                    operation_schemas,
+                    transport,
+                    report,
+                    validators,
+                    templates[s["name"]],
+                    body_paths.get(s["name"], []),
+                    deadline=deadline,
+                    retained_paths=retained_paths.get(s["name"], []),
+                    cancelled=cancelled,
+                )
+            # The full response is only needed to report it
+            if not verbose:
+                report["response"] = steps[s["name"]]["response"]
+        except Exception as e:
+            if fail_fast and not isinstance(e, StepCancelledError) and not cancel_run(e):
+                # Aborted by the cancellation rather than failed on its own
+                report["error"] = StepCancelledError()
+                raise report["error"] from e
+            report["error"] = e
+            raise
+        finally:
+            report["duration"] = time.perf_counter() - started
+
+    reporter = reporter or get_reporter()
+
+    def print_report(s: dict):
+        report = reports[s["name"]]
+        reporter.step(
+            get_step_result(s, report),
+            report["messages"],
+            report["response"] if verbose else None,
+            verbose=verbose,
+        )
+
+    if results is None:
+        results = []
+
+    failures: dict = {}
+    reported = 0
+    try:
+        for s, outcome in run_steps(steps_data, graph, run_step, jobs, fail_fast):
+            if isinstance(outcome, SkippedStepError):
+                reporter.step(get_step_result(s, None), reason=str(outcome))
+            else:
+                print_report(s)
+                if isinstance(outcome, Exception):
+                    failures[s["name"]] = outcome
+                elif s["name"] in steps:
+                    reports[s["name"]]["response"] = steps[s["name"]]["response"]
+            reported += 1
+    except Exception as e:
+        # Report the failure that stopped the run rather than a step it cancelled
+        error = failure or e
+        # Steps after the last reported one that were not the failure never ran
+        for s in steps_data[reported:]:
+            if isinstance(error, StepCancelledError):
+                # Cancelled by a failure in another steps file
+                break
+            if s["name"] in reports and reports[s["name"]]["error"] is error:
+                print_report(s)
+                break
+        raise error
+    finally:
+        results.extend(get_step_result(s, reports.get(s["name"])) for s in steps_data)
+        reporter.flush()
+
+    if len(failures) == 1:
+        raise next(iter(failures.values()))
+    if failures:
+        raise StepFailuresError(failures, len(steps_data))
+
+    return results
+
+
+def get_step_result(s: dict, report: Union[dict, None]) -> StepResult:
+    """Summarize a step's report as a StepResult; steps that never ran are skipped
+
+    Steps cancelled by a failure elsewhere in the run count as never having run.
+    """
+    if report is not None and report.get("cached"):
+        return StepResult(s["name"], s["operation_id"], "passed", cached=True)
+    if (
+        report is None
+        or (
+            report["error"] is None
+            and report["response"] is None
+            and report.get("rows") is None
+        )
+        or isinstance(report["error"], StepCancelledError)
+    ):
+        return StepResult(s["name"], s["operation_id"], "skipped")
+
+    response = report["response"]
+    return StepResult(
+        s["name"],
+        s["operation_id"],
+        "failed" if report["error"] is not None else "passed",
+        report["duration"],
+        report["timings"],
+        response.status_code if response is not None else None,
+        str(report["error"]) if report["error"] is not None else None,
+        rows=report.get("rows"),
+        failed_rows=report.get("failed_rows", 0),
+    )
+
+
+def run_step_request(
+    s: dict,
+    steps: dict,
+    base_url: str,
+    global_auth: Union[dict, None],
+    operation_schemas: dict,
+    transport: Union[Transport, None] = None,
+    report: Union[dict, None] = None,
+    validators: Union[ValidatorRegistry, None] = None,
+    template: Union[Template, None] = None,
+    body_paths: Union[list[tuple], None] = None,
+    verify: bool = True,
+    deadline: Union[float, None] = None,
+    retained_paths: Union[list[tuple], None] = None,
+    cancelled: Union[threading.Event, None] = None,
+    data: Union[dict, None] = None,
+):
+    """Construct, send and verify the request of a single step
+
+    Nothing is printed here since steps may run on worker threads; the response and
+    any failure messages are recorded in report for make_requests to print in order.
+
+    Args:
+        s (dict): Step from the steps file
+        steps (dict): Results of the steps that have already run, keyed by step name
+        base_url (str): Base URL of the API
+        global_auth (Union[dict, None]): Auth used by steps that do not define their own
+        operation_schemas (dict): Operation schemas from parse_spec_file
+        transport (Union[Transport, None]): Transport to send the request with
+        report (Union[dict, None]): Collects the response and failure messages of the step
+        validators (Union[ValidatorRegistry, None]): Compiled validators of operation_schemas
+        template (Union[Template, None]): The step compiled ahead of time
+        body_paths (Union[list[tuple], None]): Key paths into the response body that
+            later steps read, which is all a streamed response body keeps
+        verify (bool): Validate the request and response against their schemas.
+            The status code is always checked.
+        deadline (Union[float, None]): time.monotonic() by which the request must be done
+        retained_paths (Union[list[tuple], None]): Paths into the step's result that
+            later steps read, which is all that is recorded in steps. The whole
+            response is recorded when not given.
+        cancelled (Union[threading.Event, None]): Set when the run is cancelled
+        data (Union[dict, None]): Row of the step's dataset to send. The response
+            to a row is not recorded in steps.
+
+    Returns:
+        Response: The verified response, which is also recorded in steps
+    """
+    if report is None:
+        report = {"response": None, "messages": [], "error": None}
+    report["elapsed"] = None
+    timings = report.setdefault("timings", StepTimings())
+    if validators is None:
+        validators = ValidatorRegistry(operation_schemas)
+
+    with timings.measure("eval"):
+        step = Step(s, steps, template, data)
+        request = step.construct_request(
+            base_url, global_auth, transport, deadline, cancelled
+        )
+
+    try:
+        response_schema = operation_schemas[step.operation_id]["responses"][
+            str(step.status_code)
+        ]
+    except KeyError as e:
+        report["messages"].append("[bold red]Response Validation Error[/bold red]")
+        raise KeyError(
+            f"Response code of {e} not found in responses for {step.operation_id}"
+        ) from e
+
+    if verify and "requestBody" in operation_schemas[step.operation_id].keys():
+        try:
+            with timings.measure("request_validation"):
+                verify_request_body(
+                    request.body,
+                    operation_schemas[step.operation_id]["requestBody"],
+                    validators.request_body(step.operation_id),
+                )
+        except ValidationError:
+            report["messages"].append(
+                "[bold red]--Request Validation Failed--[/bold red]"
+            )
+            raise
+
+    started = time.perf_counter()
+    response = request.send()
+    report["elapsed"] = time.perf_counter() - started
+    report["response"] = response
+    if request.attempts > 1:
+        report["messages"].append(
+            f"[yellow]Retried {request.attempts - 1} time(s)[/yellow]"
+        )
+
+    if step.stream:
+        # The body arrives while it is validated, so its transfer time is taken out
+        body = timings.phases["body"]
+        started = time.perf_counter()
+        try:
+            if verify:
+                verify_streamed_response(
+                    response,
+                    step.status_code,
+                    response_schema,
+                    validators.response_items(step.operation_id, step.status_code),
+                    body_paths,
+                )
+            else:
+                # Only the type is kept so the body is still parsed and projected
+                verify_streamed_response(
+                    response,
+                    step.status_code,
+                    {k: v for k, v in response_schema.items() if k == "type"},
+                    None,
+                    body_paths,
+                )
+        except ValidationError as e:
+            report["messages"].append(
+                "[bold red]--Response Validation Failed--[/bold red]"
             )
+            if e.__cause__ is not None:
+                report["messages"].append(str(e.__cause__))
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            timings.add("response_validation", elapsed - (timings.phases["body"] - body))
 
-        response = request.send()
-        if verbose:
-            if response.body:
-                print("---Response---")
-                print(f"Status Code: {response.status_code}")
-                print_json(response.body)
-
-        response_type = ""
-        if (
-            "type"
-            in operation_schemas[s["operation_id"]]["responses"][
-                str(s["status_code"])
-            ].keys()
-        ):
-            response_type = operation_schemas[s["operation_id"]]["responses"][
-                str(s["status_code"])
-            ]["type"]
-
-        if response_type == "object" or response_type == "array":
-            try:
-                response.body = json.loads(response.body)
-            except json.decoder.JSONDecodeError as e:
-                print("[bold red]Response Validation Error[/bold red]")
-                raise Exception(
-                    f"Response data is not valid JSON: {e}"
-                ) from e
-
-        verify_response(response, s["status_code"], response_schema)
-        if verbose:
-            print("[bold green]--Step Verified--[/bold green]")
-
-        steps[s["name"]] = {}
-        steps[s["name"]]["response"] = response
+        if data is None:
+            record_response(steps, s["name"], response, retained_paths)
+        return response
+
+    try:
+        with timings.measure("response_validation"):
+            decode_response_body(response, response_schema)
+    except Exception:
+        report["messages"].append("[bold red]Response Validation Error[/bold red]")
+        raise
+
+    try:
+        if verify:
+            with timings.measure("response_validation"):
+                verify_response(
+                    response,
+                    step.status_code,
+                    response_schema,
+                    validators.response(step.operation_id, step.status_code),
+                )
+        elif response.status_code != step.status_code:
+            raise ValidationError(
+                "HTTP Status Code does not match the expected value from the step file."
+            )
+    except ValidationError as e:
+        report["messages"].append("[bold red]--Response Validation Failed--[/bold red]")
+        if e.__cause__ is not None:
+            report["messages"].append(str(e.__cause__))
+        raise
+
+    if data is None:
+        record_response(steps, s["name"], response, retained_paths)
+    return response
+
+
+def run_dataset_step(
+    s: dict,
+    steps: dict,
+    base_url: str,
+    global_auth: Union[dict, None],
+    operation_schemas: dict,
+    transport: Transport,
+    report: dict,
+    validators: ValidatorRegistry,
+    template: Template,
+    jobs: int = 1,
+    fail_fast: bool = False,
+    deadline: Union[float, None] = None,
+    cancelled: Union[threading.Event, None] = None,
+):
+    """Run a step once for every row of its foreach dataset
+
+    Rows are read as they are sent and up to jobs of them are in flight at once, so
+    the first requests go out before the dataset has been read and memory does not
+    grow with its size. The responses are not kept: report only counts the "rows"
+    and "failed_rows", adds up their timings and holds the messages of the first
+    MAX_ROW_FAILURES failed rows.
+
+    Args:
+        s (dict): Step from the steps file, with a foreach
+        jobs (int): Maximum number of rows in flight at once
+        fail_fast (bool): Stop sending rows once one failed
+
+    Raises:
+        DatasetFailuresError: Rows failed
+        StepCancelledError: The run was cancelled before every row was sent
+    """
+    report["rows"] = 0
+    report["failed_rows"] = 0
+    first_failure = None
+    lock = threading.Lock()
+    # Set with fail_fast once a row failed, so the rows in the window are not sent
+    stopped = threading.Event()
+
+    def run_row(index: int, row: dict):
+        nonlocal first_failure
+        timings = StepTimings()
+        row_report = {"messages": [], "timings": timings}
+        error = None
+        try:
+            if stopped.is_set() or cancelled is not None and cancelled.is_set():
+                return
+            with collect_timings(timings):
+                run_step_request(
+                    s,
+                    steps,
+                    base_url,
+                    global_auth,
+                    operation_schemas,
+                    transport,
+                    row_report,
+                    validators,
+                    template,
+                    [],
+                    deadline=deadline,
+                    cancelled=cancelled,
+                    data=row,
+                )
+        except StepCancelledError:
+            return
+        except Exception as e:
+            error = e
+
+        with lock:
+            report["rows"] += 1
+            for phase, seconds in timings.phases.items():
+                report["timings"].add(phase, seconds)
+            if error is None:
+                return
+            report["failed_rows"] += 1
+            first_failure = first_failure or error
+            if report["failed_rows"] <= MAX_ROW_FAILURES:
+                report["messages"].append(
+                    f"[bold red]--Row {index} Failed--[/bold red]"
+                )
+                report["messages"].extend(row_report["messages"] or [str(error)])
+            if fail_fast:
+                stopped.set()
+
+    foreach = s["foreach"]
+    rows = enumerate(read_dataset(foreach["dataset"], foreach.get("format")), 1)
+    if jobs <= 1:
+        for index, row in rows:
+            if stopped.is_set():
+                break
+            run_row(index, row)
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # Only a window of rows is read ahead of the ones in flight
+            pending = set()
+            for index, row in rows:
+                if stopped.is_set():
+                    break
+                if len(pending) >= 2 * jobs:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                pending.add(executor.submit(run_row, index, row))
+            wait(pending)
+
+    if report["failed_rows"] > MAX_ROW_FAILURES:
+        report["messages"].append(
+            f"...and {report['failed_rows'] - MAX_ROW_FAILURES} more failed rows"
+        )
+    if first_failure is not None:
+        raise DatasetFailuresError(
+            s["name"], report["failed_rows"], report["rows"], first_failure
+        )
+    if cancelled is not None and cancelled.is_set():
+        raise StepCancelledError()
+
+
+def record_response(
+    steps: dict, name: str, response: Response, retained_paths: Union[list[tuple], None]
+):
+    """Record the parts of a verified response that later steps read in steps"""
+    if retained_paths is not None:
+        response = retain_response(response, retained_paths)
+    steps[name] = {"response": response}
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Union
+
+from .catalog import OperationCatalog
+from .preprocessing import EXPRESSION_PATTERN
+
+
+def resolve_env(value: any) -> any:
+    """Replace the `${{ env.<NAME> }}` expressions of a value, leaving any other as is
+
+    Variables that are not set are left as expressions too; the step reports them.
+    """
+    if isinstance(value, dict):
+        return {key: resolve_env(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_env(item) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    def replace(match) -> str:
+        expression = match.group(0).removeprefix("${{").removesuffix("}}").strip()
+        if not expression.startswith("env."):
+            return match.group(0)
+        return os.environ.get(expression.split(".", 1)[1], match.group(0))
+
+    return EXPRESSION_PATTERN.sub(replace, value)
+
+
+def to_canonical(value: any, ancestors: Union[set[int], None] = None) -> any:
+    """Copy a value into plain JSON types, replacing recursive references with a marker
+
+    Specs with recursive schemas resolve into self-referencing dicts, which cannot be
+    dumped or compared as they are.
+    """
+    if ancestors is None:
+        ancestors = set()
+    if isinstance(value, (dict, list)):
+        if id(value) in ancestors:
+            return "$recursive"
+        ancestors.add(id(value))
+        try:
+            if isinstance(value, dict):
+                return {str(k): to_canonical(v, ancestors) for k, v in value.items()}
+            return [to_canonical(item, ancestors) for item in value]
+        finally:
+            ancestors.discard(id(value))
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def get_digest(value: any) -> str:
+    """Hash a value by its content"""
+    return hashlib.sha256(
+        json.dumps(to_canonical(value), sort_keys=True).encode()
+    ).hexdigest()
+
+
+def get_dataset_digest(path: str) -> Union[str, None]:
+    """Hash a dataset a chunk at a time, or get None if it cannot be read"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as dataset:
+            for chunk in iter(lambda: dataset.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except OSError:
+        # The step reports it when it runs
+        return None
+    return digest.hexdigest()
+
+
+def get_step_keys(
+    steps_data: dict, operation_schemas: dict, graph: dict[str, set[str]]
+) -> dict[str, str]:
+    """Hash every step along with everything that decides its outcome
+
+    A key covers the step after resolving its env expressions, the base URL and auth
+    of the steps file, the schemas of the step's operation, the contents of its
+    dataset and the keys of the steps it depends on, since their responses feed its
+    request.
+
+    Args:
+        steps_data (dict): Parsed steps file
+        operation_schemas (dict): Operation schemas from parse_operation_schemas
+        graph (dict[str, set[str]]): Dependency graph from build_dependency_graph
+
+    Returns:
+        dict[str, str]: Hex digests keyed by step name
+    """
+    shared = resolve_env(
+        {"base_url": steps_data["base_url"], "auth": steps_data.get("auth")}
+    )
+
+    keys: dict[str, str] = {}
+    for step in steps_data["steps"]:
+        content = {
+            **shared,
+            "step": resolve_env(step),
+            "schemas": operation_schemas.get(step["operation_id"]),
+            "dependencies": sorted(keys[name] for name in graph[step["name"]]),
+        }
+        if "foreach" in step:
+            content["dataset"] = get_dataset_digest(step["foreach"]["dataset"])
+        keys[step["name"]] = get_digest(content)
+    return keys
+
+
+def get_affected_operations(
+    op_ids: set[str], old_catalog: OperationCatalog, new_catalog: OperationCatalog
+) -> set[str]:
+    """Find the operations whose route or schemas differ between two versions of a spec
+
+    Args:
+        op_ids (set[str]): operationIds to compare
+        old_catalog (OperationCatalog): Catalog of the previous spec
+        new_catalog (OperationCatalog): Catalog of the current spec
+
+    Returns:
+        set[str]: The operations that changed, were added or were removed
+    """
+    affected = set()
+    for op_id in op_ids:
+        if op_id not in old_catalog or op_id not in new_catalog:
+            if op_id in old_catalog or op_id in new_catalog:
+                affected.add(op_id)
+            continue
+        if old_catalog.route(op_id) != new_catalog.route(op_id) or get_digest(
+            old_catalog.schemas(op_id)
+        ) != get_digest(new_catalog.schemas(op_id)):
+            affected.add(op_id)
+    return affected
+
+
+def get_cached_steps(
+    steps_data: dict,
+    graph: dict[str, set[str]],
+    keys: dict[str, str],
+    cache_dir: Union[str, None] = None,
+    affected: Union[set[str], None] = None,
+) -> set[str]:
+    """Decide which steps can be reported as cached passes instead of running
+
+    The steps that have to run are those without a cached pass and, with affected
+    operations, the steps of those operations even if they passed before. Every step
+    that has to run also needs the steps it depends on, directly or not, to run.
+
+    Args:
+        steps_data (dict): Parsed steps file
+        graph (dict[str, set[str]]): Dependency graph from build_dependency_graph
+        keys (dict[str, str]): Step keys from get_step_keys
+        cache_dir (Union[str, None]): Directory of the result cache, or None to run
+            every step
+        affected (Union[set[str], None]): operationIds that changed since a previous spec
+
+    Returns:
+        set[str]: Names of the steps that need not run
+    """
+    if cache_dir is None:
+        return set()
+
+    run = {
+        s["name"]
+        for s in steps_data["steps"]
+        if not has_cached_pass(cache_dir, keys[s["name"]])
+        or affected is not None
+        and s["operation_id"] in affected
+    }
+
+    pending = list(run)
+    while pending:
+        for dependency in graph[pending.pop()]:
+            if dependency not in run:
+                run.add(dependency)
+                pending.append(dependency)
+
+    return {s["name"] for s in steps_data["steps"]} - run
+
+
+def has_cached_pass(cache_dir: str, key: str) -> bool:
+    """Whether a step with this key has passed before"""
+    return os.path.exists(os.path.join(cache_dir, f"{key}.json"))
+
+
+def store_cached_pass(cache_dir: str, key: str, entry: dict):
+    """Record that a step passed, atomically so concurrent runs never read a partial file
+
+    Failing to write the cache never fails the run.
+
+    Args:
+        cache_dir (str): Directory the cache entries are stored in
+        key (str): Step key from get_step_keys
+        entry (dict): Details of the pass, such as its StepResult as a dict
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as cache_file:
+                json.dump(entry, cache_file)
+            os.replace(temp_path, os.path.join(cache_dir, f"{key}.json"))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except (OSError, TypeError, ValueError):
+        return
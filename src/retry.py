@@ -0,0 +1,111 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Union
+
+from .errors import DeadlineExceededError
+
+# Status codes retried when a step's retry policy does not list its own
+DEFAULT_RETRY_STATUS_CODES = [429, 502, 503, 504]
+
+
+class RetryPolicy:
+    """How often and how long to wait before resending the request of a step
+
+    Retries are only made for steps that define a retry policy, since repeating a
+    request that is not idempotent, such as most POSTs, may have side effects.
+
+    Attributes:
+        attempts (int): Maximum number of times the request is sent, the first included
+        backoff (float): Seconds the backoff starts from, doubled after every attempt
+        max_backoff (float): Upper bound of the backoff in seconds
+        status_codes (set[int]): Response status codes that are retried
+        connection_errors (bool): Retry when the connection fails or times out
+    """
+
+    def __init__(
+        self,
+        attempts: int,
+        backoff: float = 0.5,
+        max_backoff: float = 10,
+        status_codes: Union[list[int], None] = None,
+        connection_errors: bool = True,
+    ):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.status_codes = set(
+            DEFAULT_RETRY_STATUS_CODES if status_codes is None else status_codes
+        )
+        self.connection_errors = connection_errors
+
+    @classmethod
+    def from_step(cls, retry: Union[dict, None]) -> Union["RetryPolicy", None]:
+        """Build the policy from the retry field of a step, if it has one"""
+        if retry is None:
+            return None
+        return cls(**retry)
+
+    def delay(
+        self,
+        attempt: int,
+        retry_after: Union[str, None] = None,
+        rng: random.Random = random,
+    ) -> float:
+        """Seconds to wait before the next attempt
+
+        A Retry-After header is honored up to max_backoff, so a server cannot stall a
+        step for longer than the policy allows. Otherwise the delay is drawn uniformly
+        up to the exponential backoff ("full jitter"), so that clients that failed at
+        the same time do not retry at the same time.
+
+        Args:
+            attempt (int): Number of the attempt that just failed, starting at 1
+            retry_after (Union[str, None]): Retry-After header of the response
+            rng (random.Random): Source of the jitter
+
+        Returns:
+            float: Seconds to sleep
+        """
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None:
+            return min(seconds, self.max_backoff)
+        return rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+def parse_retry_after(value: Union[str, None]) -> Union[float, None]:
+    """Parse a Retry-After header given in seconds or as an HTTP date
+
+    Returns:
+        Union[float, None]: Seconds to wait, or None if there is no valid header
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def remaining(deadline: Union[float, None]) -> Union[float, None]:
+    """Seconds left until a time.monotonic() deadline
+
+    Raises:
+        DeadlineExceededError: The deadline has passed
+
+    Returns:
+        Union[float, None]: Seconds left, or None without a deadline
+    """
+    if deadline is None:
+        return None
+
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceededError()
+    return left
@@ -0,0 +1,172 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterator
+
+from .errors import EvaluationError, SkippedStepError
+from .preprocessing import Template
+
+
+def get_step_references(expression: any) -> set[str]:
+    """Collect the names of the steps referenced by `${{ steps.<name>... }}` expressions
+
+    Args:
+        expression (any): Object of any type that may contain expression(s)
+
+    Returns:
+        set[str]: Names of the steps the expression depends on
+    """
+    return Template(expression).references
+
+
+def build_dependency_graph(
+    steps: list[dict], templates: dict[str, Template] = None
+) -> dict[str, set[str]]:
+    """Build the dependency DAG of a steps list
+
+    Args:
+        steps (list[dict]): Steps from the steps file, in file order
+        templates (dict[str, Template]): Compiled steps keyed by name, compiled here if None
+
+    Raises:
+        EvaluationError: A step references a step that is not defined before it, or
+            one that runs over a dataset, whose responses are not kept
+
+    Returns:
+        dict[str, set[str]]: Maps each step name to the names of the steps it depends on
+    """
+    graph: dict[str, set[str]] = {}
+    datasets: set[str] = set()
+    for step in steps:
+        if templates is None:
+            dependencies = get_step_references(step)
+        else:
+            dependencies = templates[step["name"]].references
+        unknown = dependencies - graph.keys()
+        if unknown:
+            raise EvaluationError(
+                f"Step {step['name']} references steps that are not defined before it: {unknown}"
+            )
+        if dependencies & datasets:
+            raise EvaluationError(
+                f"Step {step['name']} references steps that run over a dataset: "
+                f"{dependencies & datasets}"
+            )
+        graph[step["name"]] = dependencies
+        if "foreach" in step:
+            datasets.add(step["name"])
+
+    return graph
+
+
+def run_steps(
+    steps: list[dict],
+    graph: dict[str, set[str]],
+    run_step: Callable[[dict], any],
+    jobs: int = 1,
+    fail_fast: bool = True,
+) -> Iterator[tuple[dict, any]]:
+    """Run steps concurrently while respecting their dependencies
+
+    A step is only started once every step it depends on has completed successfully.
+    Results are yielded in file order regardless of completion order.
+
+    With fail_fast, no further steps are started once a step fails; the steps already
+    in flight are drained and the first failure in file order is re-raised when it is
+    reached. Otherwise every step that does not depend on a failed one still runs,
+    and failures are yielded instead of raised: the exception a step raised, or a
+    SkippedStepError for a step that depends on a step that did not pass.
+
+    Args:
+        steps (list[dict]): Steps from the steps file, in file order
+        graph (dict[str, set[str]]): Dependency graph from build_dependency_graph
+        run_step (Callable[[dict], any]): Executes a single step and returns its result
+        jobs (int): Maximum number of steps in flight at once
+        fail_fast (bool): Stop at the first failure
+
+    Yields:
+        tuple[dict, any]: Each step along with the result of run_step, or the error
+            in its place when not failing fast
+    """
+    # Names of the steps that failed or were skipped
+    failed: set[str] = set()
+
+    if jobs <= 1:
+        for step in steps:
+            blocked = graph[step["name"]] & failed
+            if blocked:
+                failed.add(step["name"])
+                yield step, SkippedStepError(step["name"], blocked)
+                continue
+            try:
+                result = run_step(step)
+            except Exception as e:
+                if fail_fast:
+                    raise
+                failed.add(step["name"])
+                yield step, e
+                continue
+            yield step, result
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        skipped = {}
+        running = {}
+        completed: set[str] = set()
+        waiting = list(range(len(steps)))
+        next_index = 0
+        stopped = False
+
+        try:
+            while next_index < len(steps):
+                if not stopped:
+                    blocked = []
+                    for index in waiting:
+                        name = steps[index]["name"]
+                        if graph[name] & failed:
+                            skipped[index] = SkippedStepError(name, graph[name] & failed)
+                            failed.add(name)
+                        elif graph[name] <= completed and len(running) < jobs:
+                            future = executor.submit(run_step, steps[index])
+                            futures[index] = future
+                            running[future] = index
+                        else:
+                            blocked.append(index)
+                    waiting = blocked
+
+                while True:
+                    if next_index in skipped:
+                        yield steps[next_index], skipped.pop(next_index)
+                    elif next_index in futures and futures[next_index].done():
+                        # Results are not held on to once they are yielded
+                        future = futures.pop(next_index)
+                        if future.exception() is None:
+                            yield steps[next_index], future.result()
+                        elif fail_fast:
+                            raise future.exception()
+                        else:
+                            yield steps[next_index], future.exception()
+                    else:
+                        break
+                    next_index += 1
+
+                if next_index >= len(steps):
+                    break
+
+                if not running:
+                    # The next step will never start, so surface the earliest failure
+                    for index in sorted(futures):
+                        if futures[index].exception() is not None:
+                            raise futures[index].exception()
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    if future.exception() is None:
+                        completed.add(steps[index]["name"])
+                    elif fail_fast:
+                        stopped = True
+                    else:
+                        failed.add(steps[index]["name"])
+        finally:
+            for future in futures.values():
+                future.cancel()
@@ -0,0 +1,249 @@
+import socket
+import threading
+import time
+import weakref
+from typing import Iterable, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.auth import HTTPBasicAuth
+from urllib3.exceptions import HTTPError
+
+from .models.response import Response
+from .timing import (
+    StepTimings,
+    TimedHTTPAdapter,
+    TimedHTTPConnectionPool,
+    TimedHTTPSConnectionPool,
+    current_timings,
+)
+from .transport import STREAM_CHUNK_SIZE, Transport
+
+
+def iter_body(r: requests.Response, timings: Union[StepTimings, None] = None):
+    """Iterate over the body of a streamed response, releasing the connection when done
+
+    Time spent waiting for each chunk is added to the body phase of timings.
+    """
+    try:
+        chunks = r.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            if timings is not None:
+                timings.add("body", time.perf_counter() - started)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        r.close()
+
+
+class CancellablePoolMixin:
+    """Keeps track of the connections in use so that the requests on them can be aborted"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Connections that fail are dropped rather than returned, hence the weak refs
+        self.in_use = weakref.WeakSet()
+
+    def _get_conn(self, timeout=None):
+        connection = super()._get_conn(timeout)
+        self.in_use.add(connection)
+        return connection
+
+    def _put_conn(self, conn):
+        # urllib3 puts back None in place of a connection it had to close
+        if conn is not None:
+            self.in_use.discard(conn)
+        super()._put_conn(conn)
+
+    def cancel(self):
+        """Shut down the sockets of the connections in use
+
+        Threads blocked reading from them wake up and fail with a connection error.
+        """
+        for connection in list(self.in_use):
+            sock = connection.sock
+            if sock is None:
+                continue
+            try:
+                # Bypass the TLS layer, which must not be torn down under the reader
+                socket.socket.shutdown(sock, socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class CancellableHTTPConnectionPool(CancellablePoolMixin, TimedHTTPConnectionPool):
+    pass
+
+
+class CancellableHTTPSConnectionPool(CancellablePoolMixin, TimedHTTPSConnectionPool):
+    pass
+
+
+class CancellableHTTPAdapter(TimedHTTPAdapter):
+    """TimedHTTPAdapter whose requests in flight can be aborted from another thread"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CancellableHTTPConnectionPool,
+            "https": CancellableHTTPSConnectionPool,
+        }
+
+    def cancel(self):
+        for pool_key in list(self.poolmanager.pools.keys()):
+            pool = self.poolmanager.pools.get(pool_key)
+            if pool is not None:
+                pool.cancel()
+
+
+class SessionRegistry(Transport):
+    """Transport that keeps one pooled, keep-alive requests.Session per scheme and host
+
+    Connections are returned to the pool after every request, so steps that hit the
+    same host reuse the open TCP/TLS connection instead of handshaking again. TLS
+    session resumption across new connections is not supported by urllib3, so a
+    connection that the server closes still costs a full handshake to replace.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        connect_timeout: Union[float, None] = None,
+        read_timeout: Union[float, None] = None,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self._sessions: dict[tuple[str, str], requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> Union[tuple, None]:
+        """The (connect, read) timeout passed to requests, or None to wait forever"""
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return self.connect_timeout, self.read_timeout
+
+    def get(self, url: str) -> requests.Session:
+        """Get the session for the host of a URL, creating it on first use
+
+        Args:
+            url (str): Any URL on the host
+
+        Returns:
+            requests.Session: Session shared by every request to that host
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme.lower(), parts.netloc.lower())
+
+        with self._lock:
+            if key not in self._sessions:
+                session = requests.Session()
+                adapter = CancellableHTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+            return self._sessions[key]
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        params: Union[dict, None],
+        headers: Union[dict, None],
+        auth: tuple[str, str],
+        body: Union[dict, list, str, None],
+        timeout: Union[tuple, None] = None,
+        stream: bool = False,
+    ) -> Response:
+        if isinstance(body, str):
+            # TODO: Beef up this logic to ensure a strict data type (binary/bytes?)
+            payload = {"data": body}
+        else:
+            payload = {"json": body}
+
+        timings = current_timings()
+        network = timings.network if timings is not None else 0.0
+        started = time.perf_counter()
+
+        r = self.get(url).request(
+            url=url,
+            method=method,
+            params=params,
+            headers=headers,
+            auth=HTTPBasicAuth(*auth),
+            timeout=timeout,
+            stream=stream,
+            **payload,
+        )
+        if stream:
+            # The body is read from the socket as it is consumed
+            return Response(
+                status_code=r.status_code,
+                headers=dict(r.headers),
+                body=iter_body(r, timings),
+            )
+
+        if timings is not None:
+            # Whatever the connection did not account for was spent reading the body
+            elapsed = time.perf_counter() - started
+            timings.add("body", elapsed - (timings.network - network))
+        return Response(
+            status_code=r.status_code, headers=dict(r.headers), body=str(r.text)
+        )
+
+    def warm(self, urls: Iterable[str]):
+        """Resolve DNS and open a pooled connection to every host ahead of the first request
+
+        A HEAD request to each URL opens the connection, which then stays in the pool
+        for the first step. Failures are ignored here; the step that uses the host
+        reports them instead.
+
+        Args:
+            urls (Iterable[str]): URLs of the hosts to connect to
+        """
+        hosts = {}
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.hostname:
+                hosts.setdefault((parts.scheme.lower(), parts.netloc.lower()), url)
+
+        for url in hosts.values():
+            try:
+                self.get(url).head(url, timeout=self.timeout, allow_redirects=False)
+            except (ValueError, HTTPError, requests.RequestException):
+                continue
+
+    def cancel(self):
+        """Abort every request in flight, which then fails with requests.ConnectionError"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            for adapter in dict.fromkeys(session.adapters.values()):
+                if isinstance(adapter, CancellableHTTPAdapter):
+                    adapter.cancel()
+
+    def close(self):
+        """Close every session and the connections they hold"""
+        with self._lock:
+            for session in self._sessions.values():
+                # PoolManager.clear() drops pools without closing their idle connections
+                for adapter in session.adapters.values():
+                    for pool_key in list(adapter.poolmanager.pools.keys()):
+                        pool = adapter.poolmanager.pools.get(pool_key)
+                        if pool is not None:
+                            pool.close()
+                session.close()
+            self._sessions.clear()
+
+
+default_registry = SessionRegistry()
@@ -0,0 +1,228 @@
+import json
+from typing import Iterable, Union
+
+from .errors import ShardMergeError
+from .models import StepResult
+
+# Bumped whenever the layout of a shard result file changes
+SHARD_RESULT_VERSION = 1
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a shard given as "i/N", the i-th of N shards counting from 1
+
+    Raises:
+        ValueError: The value is not of that form, or i is not between 1 and N
+
+    Returns:
+        tuple[int, int]: The shard's index and the number of shards
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError as e:
+        raise ValueError(f"A shard is given as i/N, such as 2/4, not {value}") from e
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard {index} is not between 1 and {count}")
+    return index, count
+
+
+def get_components(steps: list[dict], graph: dict[str, set[str]]) -> list[list[str]]:
+    """Split a steps file into groups of steps that reference each other
+
+    Steps that are connected through references, in either direction, land in the
+    same group, so every group runs on its own.
+
+    Args:
+        steps (list[dict]): Steps from the steps file, in file order
+        graph (dict[str, set[str]]): Dependency graph from build_dependency_graph
+
+    Returns:
+        list[list[str]]: Names of the steps of each group in file order, ordered by
+            their first step
+    """
+    parents = {s["name"]: s["name"] for s in steps}
+
+    def find(name: str) -> str:
+        while parents[name] != name:
+            parents[name] = parents[parents[name]]
+            name = parents[name]
+        return name
+
+    for name, dependencies in graph.items():
+        for dependency in dependencies:
+            parents[find(dependency)] = find(name)
+
+    components: dict[str, list[str]] = {}
+    for s in steps:
+        components.setdefault(find(s["name"]), []).append(s["name"])
+    return list(components.values())
+
+
+def select_shard(
+    step_files: dict[str, dict],
+    graphs: dict[str, dict[str, set[str]]],
+    index: int,
+    count: int,
+) -> dict[str, set[str]]:
+    """Pick the steps that one of several shards runs
+
+    The groups of connected steps of every file are handed out largest first, each to
+    the shard with the fewest steps so far. Every shard works out the same split from
+    the same files, so the shards run every step exactly once between them.
+
+    Args:
+        step_files (dict[str, dict]): Parsed steps files keyed by path, in run order
+        graphs (dict[str, dict[str, set[str]]]): Dependency graph of each steps file
+        index (int): The shard, counting from 1
+        count (int): Number of shards
+
+    Returns:
+        dict[str, set[str]]: Names of the steps the shard runs, keyed by the path of
+            every file it runs steps of
+    """
+    groups = [
+        (path, component)
+        for path, steps_data in step_files.items()
+        for component in get_components(steps_data["steps"], graphs[path])
+    ]
+    # A stable sort keeps equal groups in file order
+    groups.sort(key=lambda group: len(group[1]), reverse=True)
+
+    loads = [0] * count
+    selected: dict[str, set[str]] = {}
+    for path, component in groups:
+        shard = loads.index(min(loads))
+        loads[shard] += len(component)
+        if shard == index - 1:
+            selected.setdefault(path, set()).update(component)
+    # Keep the order the files run in
+    return {path: selected[path] for path in step_files if path in selected}
+
+
+def build_shard_result(
+    shard: tuple[int, int],
+    step_files: dict[str, list[str]],
+    results: list[StepResult],
+    failures: dict[str, str],
+    spec_operations: Iterable[str],
+    coverage_threshold: Union[float, None] = None,
+) -> dict:
+    """Assemble what pypony merge needs from one shard
+
+    Args:
+        shard (tuple[int, int]): The shard's index and the number of shards
+        step_files (dict[str, list[str]]): Names of every step of every steps file
+            of the run in file order, including the steps of other shards
+        results (list[StepResult]): Results of the steps the shard ran
+        failures (dict[str, str]): Error of every steps file that failed
+        spec_operations (Iterable[str]): operationIds of the spec
+        coverage_threshold (Union[float, None]): Highest coverage_threshold of the
+            steps files, which is enforced once the shards are merged
+
+    Returns:
+        dict: The shard result, ready to be written with write_shard_result
+    """
+    return {
+        "version": SHARD_RESULT_VERSION,
+        "shard": list(shard),
+        "files": step_files,
+        "operations": sorted(spec_operations),
+        "covered": sorted({result.operation_id for result in results}),
+        "coverage_threshold": coverage_threshold,
+        "failures": failures,
+        "steps": [result.to_dict() for result in results],
+    }
+
+
+def write_shard_result(shard_result: dict, path: str):
+    with open(path, "w") as result_file:
+        json.dump(shard_result, result_file, indent=2)
+
+
+def load_shard_results(paths: Iterable[str]) -> list[dict]:
+    """Read the result files of every shard of a run
+
+    Raises:
+        FileNotFoundError: A result file was not found
+        ShardMergeError: The files have another version, come from runs split into
+            different numbers of shards or over other steps files or specs, or some
+            shards are missing or given twice
+
+    Returns:
+        list[dict]: The shard results, ordered by shard
+    """
+    shard_results = []
+    for path in paths:
+        try:
+            with open(path, "r") as result_file:
+                shard_result = json.load(result_file)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Shard result file {path} not found") from e
+        if shard_result.get("version") != SHARD_RESULT_VERSION:
+            raise ShardMergeError(
+                f"{path} has version {shard_result.get('version')}, "
+                f"not {SHARD_RESULT_VERSION}"
+            )
+        shard_results.append(shard_result)
+
+    if not shard_results:
+        raise ShardMergeError("no shard results were given")
+
+    count = shard_results[0]["shard"][1]
+    indexes = sorted(shard_result["shard"][0] for shard_result in shard_results)
+    if any(shard_result["shard"][1] != count for shard_result in shard_results):
+        raise ShardMergeError("the runs were split into different numbers of shards")
+    if indexes != list(range(1, count + 1)):
+        missing = sorted(set(range(1, count + 1)) - set(indexes))
+        raise ShardMergeError(
+            f"expected shards 1 to {count} once each, got {indexes}; "
+            f"missing: {missing}"
+        )
+    for key, kind in (("files", "steps files"), ("operations", "specs")):
+        if any(result[key] != shard_results[0][key] for result in shard_results):
+            raise ShardMergeError(f"the shards ran with different {kind}")
+
+    return sorted(shard_results, key=lambda shard_result: shard_result["shard"][0])
+
+
+def merge_shard_results(shard_results: list[dict]) -> dict:
+    """Combine the results of every shard of a run into the results of the whole run
+
+    Returns:
+        dict: "results" of every step in file order, "failures" of every steps file,
+            "covered" and "operations" as sets of operationIds, and the
+            "coverage_threshold" to enforce
+    """
+    files = shard_results[0]["files"]
+    order = {
+        (path, name): position
+        for position, (path, name) in enumerate(
+            (path, name) for path, names in files.items() for name in names
+        )
+    }
+
+    results = [
+        StepResult.from_dict(step)
+        for shard_result in shard_results
+        for step in shard_result["steps"]
+    ]
+    results.sort(key=lambda result: order[(result.step_file, result.name)])
+
+    failures: dict[str, list[str]] = {}
+    covered: set[str] = set()
+    for shard_result in shard_results:
+        # A file that failed to parse fails the same way in every shard
+        for path, error in shard_result["failures"].items():
+            if error not in failures.setdefault(path, []):
+                failures[path].append(error)
+        covered.update(shard_result["covered"])
+
+    return {
+        "results": results,
+        "failures": {
+            path: "\n".join(failures[path]) for path in files if path in failures
+        },
+        "covered": covered,
+        "operations": set(shard_results[0]["operations"]),
+        "coverage_threshold": shard_results[0]["coverage_threshold"],
+    }
@@ -0,0 +1,83 @@
+from typing import Union
+
+# Key of the objects that stand in for an entry of the list of definitions. Plans
+# store these, so changing it needs a new PLAN_VERSION.
+DEF_KEY = "$plan_def"
+
+
+def encode_shared(value: any) -> tuple[any, list]:
+    """Copy a value into plain JSON types, storing shared objects once
+
+    Resolved specs share one dict between every schema that references it, and
+    recursive schemas contain themselves. Every dict or list that is reached more
+    than once is moved into a list of definitions and replaced by {DEF_KEY: index}
+    wherever it appears, so neither kind is expanded.
+
+    Args:
+        value (any): Value to encode, such as the schemas of some operations
+
+    Returns:
+        tuple[any, list]: The encoded value and the encoded definitions
+    """
+    counts: dict[int, int] = {}
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        if not isinstance(item, (dict, list)):
+            continue
+        counts[id(item)] = counts.get(id(item), 0) + 1
+        if counts[id(item)] == 1:
+            pending.extend(item.values() if isinstance(item, dict) else item)
+
+    definitions: list = []
+    indexes: dict[int, int] = {}
+
+    def encode(item: any) -> any:
+        if isinstance(item, (dict, list)) and counts[id(item)] > 1:
+            if id(item) not in indexes:
+                # Claim the index first so that the object can refer to itself
+                indexes[id(item)] = len(definitions)
+                definitions.append(None)
+                definitions[indexes[id(item)]] = encode_container(item)
+            return {DEF_KEY: indexes[id(item)]}
+        if isinstance(item, (dict, list)):
+            return encode_container(item)
+        if item is None or isinstance(item, (str, int, float, bool)):
+            return item
+        # Such as the dates YAML turns some examples into
+        return str(item)
+
+    def encode_container(item: Union[dict, list]) -> Union[dict, list]:
+        if isinstance(item, dict):
+            return {str(key): encode(child) for key, child in item.items()}
+        return [encode(child) for child in item]
+
+    return encode(value), definitions
+
+
+def decode_shared(value: any, definitions: list) -> any:
+    """Rebuild a value encoded by encode_shared, sharing and recursion included"""
+    decoded: dict[int, Union[dict, list]] = {}
+
+    def decode(item: any) -> any:
+        if isinstance(item, dict):
+            if len(item) == 1 and DEF_KEY in item:
+                return decode_definition(item[DEF_KEY])
+            return {key: decode(child) for key, child in item.items()}
+        if isinstance(item, list):
+            return [decode(child) for child in item]
+        return item
+
+    def decode_definition(index: int) -> Union[dict, list]:
+        if index not in decoded:
+            # Register the empty container first so that references to it resolve
+            definition = definitions[index]
+            container = {} if isinstance(definition, dict) else []
+            decoded[index] = container
+            if isinstance(container, dict):
+                container.update(decode(definition))
+            else:
+                container.extend(decode(definition))
+        return decoded[index]
+
+    return decode(value)
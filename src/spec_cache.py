@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from importlib import metadata
+from typing import Union
+
+from .shared_json import decode_shared, encode_shared
+
+# Matches the file part of "$ref" values in both YAML and JSON documents. It also
+# matches "$ref" in descriptions and examples, so what it finds may not exist.
+REF_PATTERN = re.compile(r"""["']?\$ref["']?\s*:\s*["']?([^"'\s#}]+)""")
+
+# Packages whose behaviour changes what ends up in a cache entry
+CACHE_KEY_PACKAGES = ["pypony", "json-ref-dict", "openapi-spec-validator", "jsonschema"]
+
+
+def default_cache_dir() -> str:
+    """Get the directory specs are cached in when no cache dir is given"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "pypony", "specs")
+
+
+def get_referenced_files(spec_file_path: str) -> list[str]:
+    """Find the spec file and every local file it references through $ref, recursively
+
+    The files are found without parsing them, so text that only looks like a $ref
+    is followed too. Paths that do not lead to a file are skipped, since a spec that
+    really references a missing file fails when it is resolved.
+
+    Args:
+        spec_file_path (str): Relative path to OpenAPI spec file
+
+    Raises:
+        FileNotFoundError: Spec file not found
+
+    Returns:
+        list[str]: Absolute paths of the spec file and its referenced files, sorted
+    """
+    pending = [os.path.abspath(spec_file_path)]
+    found: set[str] = set()
+
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+
+        with open(path, "r") as spec_file:
+            contents = spec_file.read()
+
+        for ref in REF_PATTERN.findall(contents):
+            # Remote references are part of the key by URL only
+            if "://" in ref:
+                continue
+            ref_path = os.path.normpath(os.path.join(os.path.dirname(path), ref))
+            if os.path.isfile(ref_path):
+                pending.append(ref_path)
+
+    return sorted(found)
+
+
+def _version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def get_cache_key(spec_file_path: str) -> str:
+    """Hash the spec file, every file it references and the versions of the tools involved
+
+    Args:
+        spec_file_path (str): Relative path to OpenAPI spec file
+
+    Raises:
+        FileNotFoundError: Spec file not found
+
+    Returns:
+        str: Hex digest identifying the materialized and validated spec
+    """
+    digest = hashlib.sha256()
+    digest.update(f"python {sys.version_info.major}.{sys.version_info.minor}\n".encode())
+    for package in CACHE_KEY_PACKAGES:
+        digest.update(f"{package} {_version(package)}\n".encode())
+
+    root = os.path.dirname(os.path.abspath(spec_file_path))
+    for path in get_referenced_files(spec_file_path):
+        digest.update(os.path.relpath(path, root).encode() + b"\n")
+        with open(path, "rb") as spec_file:
+            digest.update(hashlib.sha256(spec_file.read()).digest())
+
+    return digest.hexdigest()
+
+
+def load_cached_spec(cache_dir: str, key: str) -> Union[dict, None]:
+    """Load a cache entry
+
+    Entries are plain JSON, so a cache directory shared between jobs cannot be used to
+    run code in them.
+
+    Args:
+        cache_dir (str): Directory the cache entries are stored in
+        key (str): Cache key from get_cache_key
+
+    Returns:
+        Union[dict, None]: The entry, or None if it is missing or unreadable. An entry
+            holds either the materialized "spec" or the validation "error" and its "kind".
+    """
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json"), "r") as cache_file:
+            stored = json.load(cache_file)
+        spec = stored["spec"]
+        if spec is not None:
+            spec = decode_shared(spec, stored["definitions"])
+        return {"spec": spec, "error": stored["error"], "kind": stored["kind"]}
+    except (OSError, ValueError, KeyError, TypeError, IndexError, RecursionError):
+        return None
+
+
+def store_cached_spec(cache_dir: str, key: str, entry: dict):
+    """Store a cache entry atomically, so concurrent runs never read a partial file
+
+    Schemas that are shared or recursive are stored once, with encode_shared. Failing
+    to write the cache never fails the run.
+
+    Args:
+        cache_dir (str): Directory the cache entries are stored in
+        key (str): Cache key from get_cache_key
+        entry (dict): Entry as described in load_cached_spec
+    """
+    try:
+        spec, definitions = None, []
+        if entry["spec"] is not None:
+            spec, definitions = encode_shared(entry["spec"])
+        stored = {**entry, "spec": spec, "definitions": definitions}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as cache_file:
+                json.dump(stored, cache_file, separators=(",", ":"))
+            os.replace(temp_path, os.path.join(cache_dir, f"{key}.json"))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except (OSError, TypeError, ValueError, RecursionError):
+        return
@@ -0,0 +1,116 @@
+import codecs
+import json
+from typing import Iterable, Iterator
+
+# Whitespace allowed between JSON tokens
+WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[any]:
+    """Parse a top-level JSON array incrementally, yielding each item as soon as it is complete
+
+    Only the current, partially received item is ever buffered.
+
+    Args:
+        chunks (Iterable[bytes]): The UTF-8 encoded body as it arrives
+
+    Raises:
+        json.decoder.JSONDecodeError: The body is not a JSON array
+
+    Yields:
+        any: Each item of the array
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    state = "start"
+
+    def feed(data: str, final: bool) -> Iterator[any]:
+        nonlocal buffer, state
+        buffer += data
+        position = 0
+
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            if position >= len(buffer):
+                break
+
+            character = buffer[position]
+            if state == "start":
+                if character != "[":
+                    raise json.decoder.JSONDecodeError(
+                        "Expecting a JSON array", buffer, position
+                    )
+                state = "first"
+                position += 1
+            elif state == "first" and character == "]":
+                state = "end"
+                position += 1
+            elif state in ("first", "item"):
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.decoder.JSONDecodeError:
+                    if final:
+                        raise
+                    break
+                # A number at the end of the buffer may continue in the next chunk
+                if end == len(buffer) and not final:
+                    break
+                yield item
+                state = "separator"
+                position = end
+            elif state == "separator" and character in ",]":
+                state = "item" if character == "," else "end"
+                position += 1
+            else:
+                raise json.decoder.JSONDecodeError(
+                    "Unexpected character in JSON array", buffer, position
+                )
+
+        buffer = buffer[position:]
+
+    for chunk in chunks:
+        yield from feed(text_decoder.decode(chunk), False)
+    yield from feed(text_decoder.decode(b"", final=True), True)
+
+    if state != "end":
+        raise json.decoder.JSONDecodeError("Unterminated JSON array", buffer, len(buffer))
+
+
+def group_paths(paths: Iterable[tuple]) -> dict[str, list[tuple]]:
+    """Group key paths by their first key"""
+    groups: dict[str, list[tuple]] = {}
+    for path in paths:
+        groups.setdefault(path[0], []).append(path[1:])
+    return groups
+
+
+def project(value: any, paths: list[tuple]) -> any:
+    """Keep only the parts of a value that the given key paths reach
+
+    List elements that are kept end up in a dict keyed by their index as a string,
+    which step expressions such as body.items.0.name read the same way.
+
+    Args:
+        value (any): A parsed JSON value
+        paths (list[tuple]): Key paths into the value; an empty path keeps everything
+
+    Returns:
+        any: The projected value
+    """
+    if any(len(path) == 0 for path in paths):
+        return value
+
+    groups = group_paths(paths)
+    if isinstance(value, dict):
+        return {
+            key: project(value[key], rest) for key, rest in groups.items() if key in value
+        }
+    if isinstance(value, list):
+        return {
+            key: project(value[int(key)], rest)
+            for key, rest in groups.items()
+            if key.isdigit() and int(key) < len(value)
+        }
+    return value
@@ -0,0 +1,193 @@
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Union
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+# Phases of a step in the order they happen
+PHASES = [
+    "eval",
+    "request_validation",
+    "dns",
+    "connect",
+    "tls",
+    "ttfb",
+    "body",
+    "response_validation",
+]
+
+# Phases spent opening a connection, which are zero when a pooled one is reused
+CONNECTION_PHASES = ["dns", "connect", "tls"]
+
+_local = threading.local()
+
+
+class StepTimings:
+    """Seconds spent in each phase of a step
+
+    Attributes:
+        phases (dict[str, float]): Seconds keyed by the names in PHASES
+    """
+
+    def __init__(self):
+        self.phases: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] += max(seconds, 0.0)
+
+    @contextmanager
+    def measure(self, phase: str):
+        """Add the time spent in the with block to a phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    @property
+    def setup(self) -> float:
+        """Seconds spent opening connections"""
+        return sum(self.phases[phase] for phase in CONNECTION_PHASES)
+
+    @property
+    def network(self) -> float:
+        """Seconds spent opening connections and waiting for response headers"""
+        return self.setup + self.phases["ttfb"]
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> dict[str, float]:
+        return dict(self.phases)
+
+    @classmethod
+    def from_dict(cls, phases: dict[str, float]) -> "StepTimings":
+        timings = cls()
+        timings.phases.update(phases)
+        return timings
+
+
+def current_timings() -> Union[StepTimings, None]:
+    """Get the timings that the current thread is collecting, if any"""
+    return getattr(_local, "timings", None)
+
+
+@contextmanager
+def collect_timings(timings: StepTimings):
+    """Record the timings of the HTTP requests sent by this thread in the with block"""
+    previous = current_timings()
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+class TimedConnectionMixin:
+    """Records DNS, connect and time-to-first-byte phases of a urllib3 connection
+
+    Nothing is recorded unless the thread is inside collect_timings.
+    """
+
+    def _new_conn(self):
+        timings = current_timings()
+        if timings is None:
+            return super()._new_conn()
+
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(
+                host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM
+            )
+        except OSError:
+            addresses = []
+        resolved = time.perf_counter()
+        timings.add("dns", resolved - started)
+
+        if not addresses:
+            # Let urllib3 raise its usual error for the host
+            return super()._new_conn()
+
+        # Connect to the resolved addresses in order, as urllib3 itself would, moving
+        # on when one refuses or times out and raising the last error once all failed
+        error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    error = e
+            raise error
+        finally:
+            self._dns_host = host
+            timings.add("connect", time.perf_counter() - resolved)
+
+    def request(self, *args, **kwargs):
+        timings = current_timings()
+        if timings is None:
+            return super().request(*args, **kwargs)
+
+        # Plain HTTP connections are opened while sending the request
+        setup = timings.setup
+        started = time.perf_counter()
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            timings.add("ttfb", elapsed - (timings.setup - setup))
+
+    def getresponse(self, *args, **kwargs):
+        timings = current_timings()
+        if timings is None:
+            return super().getresponse(*args, **kwargs)
+
+        with timings.measure("ttfb"):
+            return super().getresponse(*args, **kwargs)
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        timings = current_timings()
+        if timings is None:
+            return super().connect()
+
+        # Everything but opening the socket is the TLS handshake
+        setup = timings.setup
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = time.perf_counter() - started
+            timings.add("tls", elapsed - (timings.setup - setup))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record their phases into collect_timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
@@ -0,0 +1,120 @@
+import abc
+from typing import Iterable, Union
+
+# Bytes read from the socket at a time when streaming a response body
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Transports that can be picked by name
+TRANSPORTS = ["requests", "httpx"]
+
+
+class Transport(abc.ABC):
+    """Sends the HTTP requests of steps and turns the replies into Response models
+
+    Every transport returns the same Response for the same reply: the status code, the
+    headers as a dict with their original case, and the body decoded to a str, or an
+    iterator of bytes when streaming. Connection failures and timeouts are raised as
+    requests.ConnectionError and requests.Timeout so retries work the same way on all
+    of them.
+    """
+
+    @property
+    def timeout(self) -> Union[tuple, None]:
+        """The default (connect, read) timeout, or None to wait forever"""
+        return None
+
+    @abc.abstractmethod
+    def send(
+        self,
+        method: str,
+        url: str,
+        params: Union[dict, None],
+        headers: Union[dict, None],
+        auth: tuple[str, str],
+        body: Union[dict, list, str, None],
+        timeout: Union[tuple, None] = None,
+        stream: bool = False,
+    ):
+        """Send a request and wait for the response headers
+
+        Args:
+            method (str): HTTP method
+            url (str): Full URL without the query string
+            params (Union[dict, None]): Query parameters
+            headers (Union[dict, None]): Request headers
+            auth (tuple[str, str]): Username and password for basic auth
+            body (Union[dict, list, str, None]): A str is sent as is, anything else as JSON
+            timeout (Union[tuple, None]): (connect, read) timeout in seconds
+            stream (bool): Leave the body to be read as it is iterated over
+
+        Returns:
+            Response: The response
+        """
+
+    def warm(self, urls: Iterable[str]):
+        """Open connections to the hosts of the URLs ahead of the first request"""
+
+    def cancel(self):
+        """Abort every request in flight, which then fails with requests.ConnectionError
+
+        Requests sent after this are not affected.
+        """
+
+    def close(self):
+        """Close every connection the transport holds"""
+
+
+def get_transport(
+    name: str = "requests",
+    pool_size: int = 10,
+    connect_timeout: Union[float, None] = None,
+    read_timeout: Union[float, None] = None,
+    http2: bool = False,
+    uds: Union[str, None] = None,
+) -> Transport:
+    """Create a transport by name
+
+    The httpx transport is imported only when asked for, since httpx is an optional
+    dependency (pip install pypony[http2]).
+
+    Args:
+        name (str): One of TRANSPORTS
+        pool_size (int): Connections kept open per host
+        connect_timeout (Union[float, None]): Seconds to wait for a connection
+        read_timeout (Union[float, None]): Seconds to wait for data
+        http2 (bool): Negotiate HTTP/2 (httpx only)
+        uds (Union[str, None]): Unix domain socket to connect to instead of the URL's
+            host (httpx only)
+
+    Returns:
+        Transport: The transport
+    """
+    if name == "httpx":
+        from .async_transport import AsyncTransport
+
+        return AsyncTransport(
+            pool_size=pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            http2=http2,
+            uds=uds,
+        )
+
+    if http2 or uds:
+        raise ValueError("HTTP/2 and unix domain sockets need the httpx transport")
+
+    from .sessions import SessionRegistry
+
+    return SessionRegistry(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+    )
+
+
+def default_transport() -> Transport:
+    """The requests transport shared by callers that do not bring their own"""
+    from .sessions import default_registry
+
+    return default_registry
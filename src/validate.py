@@ -1,26 +1,715 @@
-from .parsing import parse_steps_file, parse_spec_file
-from .preprocessing import check_operation_coverage
+import glob
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Union
+
+from .bench import run_bench
+from .cassette import RecordingTransport, ReplayTransport
+from .catalog import OperationCatalog
+from .errors import (
+    UndocumentedOperationError,
+    InsufficientCoverageError,
+    StepFileFailuresError,
+    FuzzFailuresError,
+)
+from .fuzz import run_fuzz
+from .models import StepResult
+from .parsing import (
+    parse_steps_file,
+    load_spec_file,
+    load_lazy_spec_file,
+    parse_operation_schemas,
+)
+from .plan import build_plan, load_plan, write_plan
+from .preprocessing import check_coverage, check_operation_coverage
+from .report import write_json_report, write_junit_report
+from .reporter import DeferredReporter, format_body, get_reporter
 from .requests import make_requests
+from .result_cache import (
+    get_affected_operations,
+    get_cached_steps,
+    get_step_keys,
+    store_cached_pass,
+)
+from .scheduler import build_dependency_graph
+from .shard import (
+    build_shard_result,
+    load_shard_results,
+    merge_shard_results,
+    select_shard,
+    write_shard_result,
+)
+from .transport import get_transport
+from .verify import ValidatorRegistry
 
 # from .verify import verify_request
 
 
-def validate(
+# Errors that fail a single steps file; some of them are BaseExceptions
+STEP_FILE_ERRORS = (Exception, UndocumentedOperationError, InsufficientCoverageError)
+
+# Characters of each failed fuzz case's body that are printed
+MAX_FAILURE_BODY_CHARS = 2_000
+
+
+def expand_step_files(step_file_paths: Union[str, Iterable[str]]) -> list[str]:
+    """Expand glob patterns into the steps files they match
+
+    Paths that match nothing are kept as they are so that parsing reports them missing.
+
+    Args:
+        step_file_paths (Union[str, Iterable[str]]): Paths or glob patterns
+
+    Returns:
+        list[str]: Steps files in the order given, each listed once
+    """
+    if isinstance(step_file_paths, str):
+        step_file_paths = [step_file_paths]
+
+    step_files = []
+    for pattern in step_file_paths:
+        matches = []
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        step_files.extend(matches or [pattern])
+    return list(dict.fromkeys(step_files))
+
+
+def load_spec(
+    spec_file_path: str, spec_cache_dir: str = None, lazy_refs: bool = False
+) -> tuple[dict, OperationCatalog]:
+    """Parse the spec and index its operations
+
+    Returns:
+        tuple[dict, OperationCatalog]: The spec and its catalog
+    """
+    get_reporter().stage("--Validating Spec--")
+    if lazy_refs:
+        # Only the operations used by the steps file get their $refs resolved
+        catalog = load_lazy_spec_file(spec_file_path)
+        return catalog.lazy_spec.spec, catalog
+
+    spec = load_spec_file(spec_file_path, spec_cache_dir)
+    # Index the operations once for schema extraction and the coverage check
+    return spec, OperationCatalog(spec)
+
+
+def load_steps_and_spec(
     step_file_path: str,
     spec_file_path: str,
-    fail_fast: bool = False,
-    verbose: bool = False,
-):
+    spec_cache_dir: str = None,
+    lazy_refs: bool = False,
+) -> tuple[dict, dict]:
+    """Parse the steps file and the schemas of the operations it uses
+
+    Returns:
+        tuple[dict, dict]: The steps and the operation schemas
+    """
 
     # convert step and spec into usable dictionaries
-    print("--Validating Steps--")
+    get_reporter().stage("--Validating Steps--")
     steps = parse_steps_file(step_file_path)
 
-    print("--Validating Spec--")
-    spec, operation_schemas = parse_spec_file(steps, spec_file_path)
+    spec, catalog = load_spec(spec_file_path, spec_cache_dir, lazy_refs)
+    operation_schemas = parse_operation_schemas(steps, catalog)
 
     # Validate that desired coverage threshold is met (if present)
-    check_operation_coverage(steps, spec)
+    check_operation_coverage(steps, spec, catalog)
+
+    return steps, operation_schemas
+
+
+def parse_step_files(
+    step_files: list[str],
+    spec_file_path: str,
+    failures: dict,
+    spec_cache_dir: str = None,
+    lazy_refs: bool = False,
+    enforce_threshold: bool = True,
+) -> tuple[dict[str, dict], dict[str, dict], Union[OperationCatalog, None]]:
+    """Parse several steps files and the schemas of the operations they use
+
+    The spec is only parsed if a steps file was, and once for all of them. A file that
+    fails to parse or to meet its coverage threshold is left out.
+
+    Args:
+        step_files (list[str]): Steps files, in the order they run
+        spec_file_path (str): The OpenAPI spec file
+        failures (dict): The error of every file that is left out is stored here
+        enforce_threshold (bool): Check each file's coverage_threshold. Undocumented
+            operations are always checked.
+
+    Returns:
+        tuple[dict[str, dict], dict[str, dict], Union[OperationCatalog, None]]: The
+            steps and the operation schemas of every file keyed by path, and the
+            catalog of the spec
+    """
+    # convert step and spec into usable dictionaries
+    get_reporter().stage("--Validating Steps--")
+    loaded: dict[str, dict] = {}
+    for path in step_files:
+        try:
+            loaded[path] = parse_steps_file(path)
+        except STEP_FILE_ERRORS as e:
+            failures[path] = e
+
+    schemas: dict[str, dict] = {}
+    catalog = None
+    if loaded:
+        spec, catalog = load_spec(spec_file_path, spec_cache_dir, lazy_refs)
+        for path, steps in list(loaded.items()):
+            try:
+                schemas[path] = parse_operation_schemas(steps, catalog)
+                # Validate that desired coverage threshold is met (if present)
+                check_operation_coverage(steps, spec, catalog, enforce_threshold)
+            except STEP_FILE_ERRORS as e:
+                failures[path] = e
+                del loaded[path]
+
+    return loaded, schemas, catalog
+
+
+def raise_failures(step_files: list[str], failures: dict):
+    """Raise the errors of the steps files that failed, if any
+
+    Raises:
+        StepFileFailuresError: Some of several steps files failed. A single steps
+            file raises its own error instead.
+    """
+    if len(step_files) == 1 and failures:
+        raise failures[step_files[0]]
+    if failures:
+        # Keep the order the files were given in
+        raise StepFileFailuresError(
+            {path: failures[path] for path in step_files if path in failures},
+            len(step_files),
+        )
+
+
+def validate(
+    step_file_path: Union[str, Iterable[str]],
+    spec_file_path: str,
+    fail_fast: bool = False,
+    verbose: bool = False,
+    *,
+    jobs: int = 1,
+    pool_size: int = 10,
+    connect_timeout: float = None,
+    read_timeout: float = None,
+    spec_cache_dir: str = None,
+    lazy_refs: bool = False,
+    report_json: str = None,
+    report_junit: str = None,
+    slowest: int = 5,
+    workers: int = 1,
+    deadline: float = None,
+    transport: str = "requests",
+    http2: bool = False,
+    uds: str = None,
+    result_cache_dir: str = None,
+    since: str = None,
+    full_run: bool = False,
+    record: str = None,
+    replay: str = None,
+    compress_bodies: bool = False,
+    plan: str = None,
+    shard: tuple[int, int] = None,
+    shard_result: str = None,
+) -> list[StepResult]:
+    """Run one or more steps files against a spec
+
+    With several steps files, the spec is parsed once and the validators and the
+    transport's connections are shared. Up to workers files run at the same time, and
+    every file runs even when another one fails, unless failing fast.
+
+    Args:
+        step_file_path (Union[str, Iterable[str]]): Steps files or glob patterns
+        spec_file_path (str): The OpenAPI spec file
+        fail_fast (bool): Cancel the whole run at the first failed step. Otherwise
+            the steps that do not depend on a failed step still run.
+        workers (int): Number of steps files run at the same time
+        deadline (float): Seconds the whole run may take, after which the steps that
+            are left fail with DeadlineExceededError
+        transport (str): Name of the transport that sends the requests
+        http2 (bool): Negotiate HTTP/2 with the httpx transport
+        uds (str): Unix domain socket the httpx transport connects to
+        result_cache_dir (str): Directory passed steps are cached in, so that a step
+            that is unchanged since it last passed is not run again. None, the
+            default, runs every step and caches nothing.
+        since (str): Previous version of the spec; the steps of operations that
+            changed since then run even if they have a cached pass. Needs
+            result_cache_dir.
+        full_run (bool): Run every step regardless of result_cache_dir and since,
+            still recording the passes
+        record (str): Cassette file to write every request and response to. Every
+            step runs, so that the cassette is complete.
+        replay (str): Cassette file to answer the requests from instead of the
+            network. Nothing is read from or written to the result cache.
+        compress_bodies (bool): Gzip the bodies written to the record cassette
+        plan (str): Plan file from compile_plan to run instead of step_file_path and
+            spec_file_path, skipping their parsing and validation
+        shard (tuple[int, int]): Only run the i-th of N shares of the steps, given as
+            (i, N). Steps that reference each other always run in the same shard.
+        shard_result (str): File to write the results and coverage of the run to,
+            for merge to combine with those of the other shards. The coverage
+            thresholds of the steps files are then left to merge.
+
+    Raises:
+        ValueError: Both record and replay were given, both plan and since, or since
+            without result_cache_dir
+        StepFileFailuresError: Some of several steps files failed. A single steps
+            file raises its own error instead.
+
+    Returns:
+        list[StepResult]: Results of every step of every file
+    """
+    if record and replay:
+        raise ValueError("A run can either record or replay a cassette, not both")
+    if plan and since:
+        raise ValueError("A run from a plan has no spec to compare --since against")
+    if since and not result_cache_dir:
+        raise ValueError("--since only reruns cached passes, so needs a result cache")
+    if record:
+        full_run = True
+    if replay:
+        result_cache_dir = None
+
+    if deadline is not None:
+        deadline = time.monotonic() + deadline
+
+    failures: dict = {}
+    graphs: dict[str, dict[str, set[str]]] = {}
+    if plan:
+        # Everything was parsed and checked against the spec when the plan was compiled
+        get_reporter().stage("--Loading Plan--")
+        compiled = load_plan(plan)
+        catalog = None
+        spec_operations = compiled["operations"]
+        step_files = [step_file["path"] for step_file in compiled["files"]]
+        loaded = {f["path"]: f["steps"] for f in compiled["files"]}
+        graphs = {f["path"]: f["graph"] for f in compiled["files"]}
+        schemas = {
+            path: {
+                step["operation_id"]: compiled["schemas"][step["operation_id"]]
+                for step in steps["steps"]
+            }
+            for path, steps in loaded.items()
+        }
+    else:
+        step_files = expand_step_files(step_file_path)
+        loaded, schemas, catalog = parse_step_files(
+            step_files,
+            spec_file_path,
+            failures,
+            spec_cache_dir,
+            lazy_refs,
+            enforce_threshold=shard_result is None,
+        )
+        spec_operations = catalog.operation_ids if catalog is not None else set()
+
+    # Every step of the run, including those of other shards, for merge to order by
+    step_names = {
+        path: [s["name"] for s in loaded[path]["steps"]] if path in loaded else []
+        for path in step_files
+    }
+    thresholds = [
+        steps["coverage_threshold"]
+        for steps in loaded.values()
+        if "coverage_threshold" in steps
+    ]
+
+    if shard:
+        # Shards split the steps along the dependency graphs, which all of them build
+        for path in list(loaded):
+            try:
+                if path not in graphs:
+                    graphs[path] = build_dependency_graph(loaded[path]["steps"])
+            except STEP_FILE_ERRORS as e:
+                failures[path] = e
+                del loaded[path]
+        selected = select_shard(loaded, graphs, *shard)
+        loaded = {
+            path: {
+                **loaded[path],
+                "steps": [s for s in loaded[path]["steps"] if s["name"] in names],
+            }
+            for path, names in selected.items()
+        }
+        graphs = {
+            path: {
+                name: dependencies
+                for name, dependencies in graphs[path].items()
+                if name in names
+            }
+            for path, names in selected.items()
+        }
+
+    # Operations whose schemas changed since the previous spec are compared per file
+    old_catalog = None
+    if since and result_cache_dir and loaded and not full_run:
+        _, old_catalog = load_spec(since, spec_cache_dir, lazy_refs)
+
+    # Compile the request and response validators once for the whole run
+    operation_schemas = {}
+    for path in loaded:
+        operation_schemas.update(schemas[path])
+    validators = ValidatorRegistry(operation_schemas)
+
+    if replay:
+        http = ReplayTransport(replay)
+    else:
+        # Over HTTP/1.1 every concurrent step needs its own connection to avoid
+        # blocking on the pool, while HTTP/2 multiplexes them over one
+        http = get_transport(
+            transport,
+            pool_size=max(pool_size, jobs * workers),
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            http2=http2,
+            uds=uds,
+        )
+        if record:
+            http = RecordingTransport(http, record, compress_bodies)
+    # Open connections to the API before the first step needs them
+    http.warm(steps["base_url"] for steps in loaded.values())
+
+    # With fail_fast, the first failure in any steps file cancels all of them
+    cancelled = threading.Event()
+
+    reporter = get_reporter()
+
+    def run_step_file(path: str) -> tuple[list[StepResult], DeferredReporter]:
+        # Files running side by side hold their output back to report it whole
+        file_reporter = reporter
+        if workers > 1 and len(loaded) > 1:
+            file_reporter = DeferredReporter()
+
+        if len(step_files) == 1:
+            file_reporter.stage("--Making Requests--")
+        else:
+            file_reporter.stage(f"--Making Requests: {path}--")
+
+        results = []
+        keys = {}
+        try:
+            cached = set()
+            if result_cache_dir:
+                steps_data = loaded[path]
+                graph = graphs.get(path) or build_dependency_graph(steps_data["steps"])
+                keys = get_step_keys(steps_data, operation_schemas, graph)
+                if not full_run:
+                    affected = None
+                    if old_catalog is not None:
+                        affected = get_affected_operations(
+                            set(schemas[path]), old_catalog, catalog
+                        )
+                    cached = get_cached_steps(
+                        steps_data, graph, keys, result_cache_dir, affected
+                    )
+
+            make_requests(
+                loaded[path],
+                operation_schemas,
+                fail_fast,
+                verbose,
+                jobs,
+                http,
+                validators,
+                results,
+                file_reporter,
+                deadline,
+                cancelled,
+                cached,
+            )
+        except STEP_FILE_ERRORS as e:
+            failures[path] = e
+            if len(step_files) > 1:
+                file_reporter.stage("--Steps File Failed--", "failure")
+
+        for result in results:
+            result.step_file = path
+            if result_cache_dir and result.status == "passed" and not result.cached:
+                store_cached_pass(result_cache_dir, keys[result.name], result.to_dict())
+        return results, file_reporter
+
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Held back output is reported in the order the files were given
+            for file_results, file_reporter in executor.map(run_step_file, loaded):
+                if file_reporter is not reporter:
+                    file_reporter.replay(reporter)
+                results.extend(file_results)
+    finally:
+        http.close()
+
+        # Reports are written for failed runs too
+        if report_json:
+            write_json_report(results, report_json)
+        if report_junit:
+            write_junit_report(results, report_junit, step_files[0])
+        if shard_result:
+            shard_data = build_shard_result(
+                shard or (1, 1),
+                step_names,
+                results,
+                {path: str(error) for path, error in failures.items()},
+                spec_operations,
+                max(thresholds, default=None),
+            )
+            write_shard_result(shard_data, shard_result)
+        reporter.summary(results, slowest)
+        reporter.flush()
+
+    raise_failures(step_files, failures)
+    return results
+
+
+def merge(
+    result_paths: Iterable[str],
+    report_json: str = None,
+    report_junit: str = None,
+    coverage_threshold: float = None,
+    slowest: int = 5,
+) -> list[StepResult]:
+    """Combine the shard results of a sharded run into the results of the whole run
+
+    Operation coverage is checked over the steps of every shard together, against
+    coverage_threshold or else the highest coverage_threshold of the steps files.
+
+    Args:
+        result_paths (Iterable[str]): Shard result files, one per shard
+        report_json (str): Path to write the merged JSON report to
+        report_junit (str): Path to write the merged JUnit report to
+        coverage_threshold (float): Share of the spec's operations the run must cover
+        slowest (int): Number of slowest steps to summarize
+
+    Raises:
+        ShardMergeError: The shard results do not make up a whole run
+        InsufficientCoverageError: The shards cover less than the threshold
+        StepFileFailuresError: Steps files failed in some shards
+
+    Returns:
+        list[StepResult]: Results of every step of every shard, in file order
+    """
+    reporter = get_reporter()
+    reporter.stage("--Merging Shard Results--")
+    shard_results = load_shard_results(result_paths)
+    merged = merge_shard_results(shard_results)
+    step_files = list(shard_results[0]["files"])
+    results = merged["results"]
+
+    if report_json:
+        write_json_report(results, report_json)
+    if report_junit:
+        write_junit_report(results, report_junit, step_files[0])
+    reporter.summary(results, slowest)
+    reporter.flush()
+
+    if coverage_threshold is None:
+        coverage_threshold = merged["coverage_threshold"]
+    # Nothing is covered if no steps file could be parsed, which fails below
+    if merged["operations"]:
+        check_coverage(merged["covered"], merged["operations"], coverage_threshold)
+
+    if merged["failures"]:
+        raise StepFileFailuresError(merged["failures"], len(step_files))
+    return results
+
+
+def compile_plan(
+    step_file_path: Union[str, Iterable[str]],
+    spec_file_path: str,
+    output: str,
+    spec_cache_dir: str = None,
+    lazy_refs: bool = False,
+) -> dict:
+    """Parse and check steps files once, and write what running them needs to a plan
+
+    The plan holds the validated steps, their dependency graphs and the resolved
+    schemas of the operations they use, along with hashes of the files it was
+    compiled from. validate runs it without reading the steps files or the spec.
+
+    Args:
+        step_file_path (Union[str, Iterable[str]]): Steps files or glob patterns
+        spec_file_path (str): The OpenAPI spec file
+        output (str): Path to write the plan to
+
+    Raises:
+        StepFileFailuresError: Some of several steps files failed. A single steps
+            file raises its own error instead.
+
+    Returns:
+        dict: The plan as written
+    """
+    step_files = expand_step_files(step_file_path)
+    failures: dict = {}
+    loaded, schemas, catalog = parse_step_files(
+        step_files, spec_file_path, failures, spec_cache_dir, lazy_refs
+    )
+    graphs = {}
+    for path in list(loaded):
+        try:
+            graphs[path] = build_dependency_graph(loaded[path]["steps"])
+        except STEP_FILE_ERRORS as e:
+            failures[path] = e
+            del loaded[path]
+    raise_failures(step_files, failures)
+
+    operation_schemas = {}
+    for path in loaded:
+        operation_schemas.update(schemas[path])
+
+    reporter = get_reporter()
+    reporter.stage(f"--Writing Plan: {output}--")
+    compiled = build_plan(
+        spec_file_path, loaded, graphs, operation_schemas, catalog.operation_ids
+    )
+    write_plan(compiled, output)
+    reporter.stage("--Plan Compiled--", "success")
+    reporter.flush()
+    return compiled
+
+
+def bench(
+    step_file_path: str,
+    spec_file_path: str,
+    *,
+    users: int = 1,
+    duration: float = None,
+    iterations: int = None,
+    ramp_up: float = 0,
+    sample_rate: float = 1.0,
+    connect_timeout: float = None,
+    read_timeout: float = None,
+    spec_cache_dir: str = None,
+    lazy_refs: bool = False,
+    transport: str = "requests",
+    http2: bool = False,
+    uds: str = None,
+):
+    steps, operation_schemas = load_steps_and_spec(
+        step_file_path, spec_file_path, spec_cache_dir, lazy_refs
+    )
+
+    validators = ValidatorRegistry(operation_schemas)
+
+    # One connection per virtual user, unless HTTP/2 multiplexes them
+    http = get_transport(
+        transport,
+        pool_size=users,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        http2=http2,
+        uds=uds,
+    )
+    http.warm([steps["base_url"]])
+
+    reporter = get_reporter()
+    reporter.stage("--Running Benchmark--")
+    reporter.flush()
+    try:
+        result = run_bench(
+            steps,
+            operation_schemas,
+            http,
+            validators,
+            users,
+            duration,
+            iterations,
+            ramp_up,
+            sample_rate,
+        )
+    finally:
+        http.close()
+
+    reporter.table(result.table())
+    reporter.flush()
+    return result
+
+
+def fuzz(
+    step_file_path: str,
+    spec_file_path: str,
+    *,
+    cases: int = 100,
+    seed: int = None,
+    invalid_ratio: float = 0.25,
+    jobs: int = 1,
+    start: int = 0,
+    connect_timeout: float = None,
+    read_timeout: float = None,
+    spec_cache_dir: str = None,
+    lazy_refs: bool = False,
+    transport: str = "requests",
+    http2: bool = False,
+    uds: str = None,
+):
+    steps, operation_schemas = load_steps_and_spec(
+        step_file_path, spec_file_path, spec_cache_dir, lazy_refs
+    )
+
+    validators = ValidatorRegistry(operation_schemas)
+    if seed is None:
+        # Printed below, so that the run can be repeated
+        seed = random.randrange(2**32)
+
+    http = get_transport(
+        transport,
+        pool_size=jobs,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        http2=http2,
+        uds=uds,
+    )
+    http.warm([steps["base_url"]])
+
+    reporter = get_reporter()
+    reporter.stage(f"--Fuzzing Request Bodies with Seed {seed}--")
+    reporter.flush()
+    try:
+        result = run_fuzz(
+            steps,
+            operation_schemas,
+            http,
+            validators,
+            cases,
+            seed,
+            invalid_ratio,
+            jobs,
+            start,
+        )
+    finally:
+        http.close()
+
+    reporter.table(result.table())
+    for failure in result.failures:
+        reporter.stage(f"--{failure}--", "failure")
+        body = format_body(failure.case.body, MAX_FAILURE_BODY_CHARS)
+        reporter.stage(body, "failure")
+    if result.failed:
+        raise FuzzFailuresError(result.failed, result.cases, seed)
+    reporter.stage("--Fuzzing Passed--", "success")
+    reporter.flush()
+    return result
+
+
+def mock(
+    spec_file_path: str,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    uds: str = None,
+    spec_cache_dir: str = None,
+):
+    # asyncio is only imported by the command that needs it
+    from .mock import MockServer
+
+    spec, catalog = load_spec(spec_file_path, spec_cache_dir)
 
-    print("--Making Requests--")
-    make_requests(steps, operation_schemas, fail_fast, verbose)
+    reporter = get_reporter()
+    reporter.stage("--Generating Responses--")
+    reporter.flush()
+    server = MockServer(spec, host, port, uds, catalog)
+    server.serve_forever()
@@ -1,34 +1,199 @@
-from jsonschema import validate, ValidationError
-from rich import print
+import json
+from jsonschema import validate, validators, ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.protocols import Validator
 from typing import Union
 
 from .models import Response
+from .streaming import iter_json_array, group_paths, project
 
 
-def verify_request_body(request_body: Union[dict, str], schema: dict):
+def compile_validator(schema: dict) -> Validator:
+    """Check a schema once and build a reusable validator for it, including format checks"""
+
+    cls = validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema, format_checker=cls.FORMAT_CHECKER)
+
+
+class ValidatorRegistry:
+    """Compiled validators for every operation schema, built once per run
+
+    Validators are keyed by (operation_id, "requestBody") for request bodies and
+    by (operation_id, status_code) for responses.
+    """
+
+    def __init__(self, operation_schemas: dict):
+        self._validators: dict[tuple[str, str], Validator] = {}
+
+        for operation_id, schemas in operation_schemas.items():
+            if "requestBody" in schemas:
+                self._validators[(operation_id, "requestBody")] = compile_validator(
+                    schemas["requestBody"]
+                )
+            for status_code, schema in schemas["responses"].items():
+                self._validators[(operation_id, str(status_code))] = compile_validator(
+                    schema
+                )
+                # Array items are validated one at a time when a response is streamed
+                if is_streamable_schema(schema):
+                    self._validators[
+                        (operation_id, f"{status_code}/items")
+                    ] = compile_validator(schema["items"])
+
+    def request_body(self, operation_id: str) -> Union[Validator, None]:
+        """Get the validator of an operation's request body, if it has one"""
+        return self._validators.get((operation_id, "requestBody"))
+
+    def response(self, operation_id: str, status_code: int) -> Union[Validator, None]:
+        """Get the validator of an operation's response for a status code, if documented"""
+        return self._validators.get((operation_id, str(status_code)))
+
+    def response_items(
+        self, operation_id: str, status_code: int
+    ) -> Union[Validator, None]:
+        """Get the validator of the items of an array response, if it can be streamed"""
+        return self._validators.get((operation_id, f"{status_code}/items"))
+
+
+def is_streamable_schema(schema: dict) -> bool:
+    """Whether a response schema is an array whose items can be validated one at a time
+
+    Keywords that need the whole array at once, other than minItems and maxItems,
+    rule streaming out.
+    """
+    return (
+        isinstance(schema, dict)
+        and schema.get("type") == "array"
+        and isinstance(schema.get("items"), dict)
+        and set(schema) <= {"type", "items", "minItems", "maxItems", "description", "title"}
+    )
+
+
+def _validate(instance: any, schema: dict, validator: Union[Validator, None]):
+    if validator is None:
+        validate(instance=instance, schema=schema)
+        return
+
+    # Raise the same error jsonschema.validate would pick
+    error = best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def verify_request_body(
+    request_body: Union[dict, str],
+    schema: dict,
+    validator: Union[Validator, None] = None,
+):
     """Verify that the request body matches the schema provided in the step file"""
 
     try:
-        validate(instance=request_body, schema=schema)
+        _validate(request_body, schema, validator)
     except ValidationError as e:
-        print("[bold red]--Request Validation Failed--[/bold red]")
         raise ValidationError("There was an issue with your request body.") from e
     return
 
 
-def verify_response(response: Response, status_code: int, schema: dict):
+def verify_response(
+    response: Response,
+    status_code: int,
+    schema: dict,
+    validator: Union[Validator, None] = None,
+):
     """Verify that the response matches the schema provided in the step file"""
 
     if response.status_code != status_code:
-        print("[bold red]--Response Validation Failed--[/bold red]")
         raise ValidationError(
             "HTTP Status Code does not match the expected value from the step file."
         )
     else:
         try:
-            validate(instance=response.body, schema=schema)
+            _validate(response.body, schema, validator)
         except ValidationError as e:
-            print("[bold red]--Response Validation Failed--[/bold red]")
-            print(e)
-            raise ValidationError("There was an issue with the response from the API.")
+            raise ValidationError(
+                "There was an issue with the response from the API."
+            ) from e
     return
+
+
+def verify_streamed_response(
+    response: Response,
+    status_code: int,
+    schema: dict,
+    item_validator: Union[Validator, None] = None,
+    paths: Union[list[tuple], None] = None,
+):
+    """Verify a response whose body is still arriving as chunks of bytes
+
+    Array bodies are parsed and validated item by item, failing on the first invalid
+    item. Once verified, the body only keeps the parts later steps reference.
+
+    Args:
+        response (Response): Response whose body is an iterator of bytes
+        status_code (int): Expected status code from the step file
+        schema (dict): Response schema of the operation
+        item_validator (Union[Validator, None]): Validator of the array items, if the
+            schema can be streamed
+        paths (Union[list[tuple], None]): Key paths into the body that later steps
+            read; an empty path keeps the whole body
+    """
+    chunks = response.body
+    paths = paths or []
+
+    try:
+        if response.status_code != status_code:
+            raise ValidationError(
+                "HTTP Status Code does not match the expected value from the step file."
+            )
+
+        if item_validator is None or not is_streamable_schema(schema):
+            # Nothing to stream against, but still parse from bytes without a str copy
+            body = b"".join(chunks)
+            if schema.get("type") in ("object", "array"):
+                try:
+                    body = json.loads(body)
+                except json.decoder.JSONDecodeError as e:
+                    raise Exception(f"Response data is not valid JSON: {e}") from e
+            else:
+                body = body.decode("utf-8", errors="replace")
+
+            response.body = body
+            verify_response(response, status_code, schema)
+            response.body = project(body, paths)
+            return
+
+        keep_all = any(len(path) == 0 for path in paths)
+        groups = group_paths(paths)
+        retained = [] if keep_all else {}
+        count = 0
+
+        try:
+            for item in iter_json_array(chunks):
+                error = best_match(item_validator.iter_errors(item))
+                if error is not None:
+                    raise ValidationError(
+                        f"There was an issue with item {count} of the response from the API."
+                    ) from error
+
+                if keep_all:
+                    retained.append(item)
+                elif str(count) in groups:
+                    retained[str(count)] = project(item, groups[str(count)])
+                count += 1
+        except json.decoder.JSONDecodeError as e:
+            raise Exception(f"Response data is not valid JSON: {e}") from e
+
+        if count < schema.get("minItems", 0) or count > schema.get("maxItems", count):
+            raise ValidationError(
+                f"The response from the API has {count} items, which is outside "
+                f"the bounds of the schema."
+            )
+
+        response.body = retained
+    finally:
+        # Stop reading and release the connection when failing early
+        if hasattr(chunks, "close"):
+            chunks.close()
+        if response.body is chunks:
+            response.body = None
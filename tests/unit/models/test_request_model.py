@@ -1,7 +1,14 @@
+import threading
+import time
+
+import pytest
 from hamcrest import assert_that, is_
 import requests
 
+from src.errors import DeadlineExceededError, StepCancelledError
 from src.models import Request
+from src.retry import RetryPolicy
+from src.sessions import SessionRegistry
 
 pytest_plugins = ("pytest_mock",)
 
@@ -59,7 +66,7 @@ class TestRequestModel:
         mock_response.status_code = 200
         mock_response.headers = {}
         mock_response.data = {}
-        mocker.patch.object(requests, 'request', return_value=mock_response)
+        mocker.patch.object(requests.Session, 'request', return_value=mock_response)
 
         response = self.jsonRequest.send()
         assert_that(response.status_code, is_(200))
@@ -71,9 +78,140 @@ class TestRequestModel:
         mock_response.status_code = 200
         mock_response.headers = {}
         mock_response.data = {}
-        mocker.patch.object(requests, 'request', return_value=mock_response)
+        mocker.patch.object(requests.Session, 'request', return_value=mock_response)
 
         response = self.rawBodyRequest.send()
         assert_that(response.status_code, is_(200))
         assert_that(response.headers, is_({}))
         assert_that(response.body, is_(''))
+
+    @staticmethod
+    def make_response(status_code: int, headers: dict = None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = headers or {}
+        response._content = b""
+        response._content_consumed = True
+        return response
+
+    def make_request(self, **kwargs) -> Request:
+        return Request(
+            base_url="https://api.test.com",
+            method="POST",
+            path="/api/v1/test",
+            params={},
+            headers=self.headers,
+            global_auth={},
+            auth={},
+            body={},
+            **kwargs,
+        )
+
+    def test_send_retries_status_codes(self, mocker):
+        mock_request = mocker.patch.object(
+            requests.Session,
+            'request',
+            side_effect=[
+                self.make_response(503, {"Retry-After": "0"}),
+                self.make_response(429, {"Retry-After": "0"}),
+                self.make_response(201),
+            ],
+        )
+        request = self.make_request(retry=RetryPolicy(attempts=3))
+
+        assert_that(request.send().status_code, is_(201))
+        assert_that(request.attempts, is_(3))
+        assert_that(mock_request.call_count, is_(3))
+
+    def test_send_returns_last_response_after_attempts(self, mocker):
+        mocker.patch.object(
+            requests.Session,
+            'request',
+            return_value=self.make_response(503, {"Retry-After": "0"}),
+        )
+        request = self.make_request(retry=RetryPolicy(attempts=2))
+
+        assert_that(request.send().status_code, is_(503))
+        assert_that(request.attempts, is_(2))
+
+    def test_send_does_not_retry_without_policy(self, mocker):
+        mock_request = mocker.patch.object(
+            requests.Session, 'request', return_value=self.make_response(503)
+        )
+
+        assert_that(self.make_request().send().status_code, is_(503))
+        assert_that(mock_request.call_count, is_(1))
+
+    def test_send_retries_connection_errors(self, mocker):
+        mocker.patch.object(
+            requests.Session,
+            'request',
+            side_effect=[requests.ConnectionError(), self.make_response(201)],
+        )
+        request = self.make_request(retry=RetryPolicy(attempts=2, backoff=0))
+        assert_that(request.send().status_code, is_(201))
+
+        mocker.patch.object(
+            requests.Session, 'request', side_effect=requests.ConnectionError()
+        )
+        request = self.make_request(
+            retry=RetryPolicy(attempts=2, backoff=0, connection_errors=False)
+        )
+        with pytest.raises(requests.ConnectionError):
+            request.send()
+
+    def test_send_after_deadline(self, mocker):
+        mock_request = mocker.patch.object(requests.Session, 'request')
+        request = self.make_request(deadline=time.monotonic() - 1)
+
+        with pytest.raises(DeadlineExceededError):
+            request.send()
+        assert_that(mock_request.call_count, is_(0))
+
+    def test_send_does_not_wait_past_deadline(self, mocker):
+        mocker.patch.object(
+            requests.Session,
+            'request',
+            return_value=self.make_response(503, {"Retry-After": "60"}),
+        )
+        request = self.make_request(
+            retry=RetryPolicy(attempts=5), deadline=time.monotonic() + 5
+        )
+
+        assert_that(request.send().status_code, is_(503))
+        assert_that(request.attempts, is_(1))
+
+    def test_send_stops_retrying_when_cancelled(self, mocker):
+        cancelled = threading.Event()
+
+        def request(*args, **kwargs):
+            # The run is cancelled while the first attempt is in flight
+            cancelled.set()
+            raise requests.ConnectionError()
+
+        mock_request = mocker.patch.object(
+            requests.Session, 'request', side_effect=request
+        )
+        request = self.make_request(
+            retry=RetryPolicy(attempts=3, backoff=0), cancelled=cancelled
+        )
+
+        with pytest.raises(StepCancelledError):
+            request.send()
+        assert_that(mock_request.call_count, is_(1))
+
+    def test_get_timeout(self):
+        sessions = SessionRegistry(connect_timeout=1, read_timeout=2)
+        assert_that(self.make_request(transport=sessions).get_timeout(), is_((1, 2)))
+        assert_that(
+            self.make_request(transport=sessions, timeout=5).get_timeout(), is_((5, 5))
+        )
+        assert_that(
+            self.make_request(timeout={"read": 3}).get_timeout(), is_((None, 3))
+        )
+        assert_that(self.make_request().get_timeout(), is_(None))
+
+        connect, read = self.make_request(
+            timeout=30, deadline=time.monotonic() + 10
+        ).get_timeout()
+        assert 9 < connect <= 10 and read == connect
@@ -94,3 +94,24 @@ class TestStepModel:
         assert request.global_auth == {}
         assert request.auth == {'username': '', 'password': ''}
         assert request.body == "123"
+
+    def test_step_retry_and_timeout(self):
+        step = Step(
+            step={
+                "name": "test",
+                "operation_id": "test",
+                "method": "POST",
+                "path": "/api/v1/test",
+                "status_code": 201,
+                "timeout": {"connect": 1, "read": 5},
+                "retry": {"attempts": 3, "status_codes": [503]},
+            },
+            steps={},
+        )
+        request = step.construct_request("https://api.test.com", None, deadline=100.0)
+
+        assert request.timeout == {"connect": 1, "read": 5}
+        assert request.retry.attempts == 3
+        assert request.retry.status_codes == {503}
+        assert request.deadline == 100.0
+        assert self.barebonesStep.retry is None
@@ -0,0 +1,128 @@
+from hamcrest import assert_that, is_, close_to, less_than_or_equal_to
+from jsonschema import ValidationError
+
+from src.bench import *
+from src.sessions import SessionRegistry
+
+
+class TestBench:
+    """Class for basic unit testing of the bench.py module"""
+
+    steps_data = {
+        "base_url": "http://localhost",
+        "steps": [
+            {
+                "name": "create",
+                "operation_id": "createThing",
+                "method": "POST",
+                "path": "/things",
+                "status_code": 201,
+            },
+            {
+                "name": "get",
+                "operation_id": "getThing",
+                "method": "GET",
+                "path": "/things/${{ steps.create.response.body.id }}",
+                "status_code": 200,
+            },
+        ],
+    }
+
+    operation_schemas = {
+        "createThing": {"responses": {"201": {"type": "object"}}},
+        "getThing": {"responses": {"200": {"type": "object"}}},
+    }
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for milliseconds in range(1, 101):
+            histogram.record(milliseconds / 1000)
+
+        assert_that(histogram.total, is_(100))
+        assert_that(histogram.percentile(50), close_to(0.050, 0.050 / 64))
+        assert_that(histogram.percentile(99), close_to(0.099, 0.099 / 64))
+        assert_that(histogram.percentile(100), is_(0.1))
+        assert_that(histogram.max, is_(100_000))
+
+    def test_histogram_bucket_count_is_bounded(self):
+        histogram = LatencyHistogram()
+        for microseconds in range(1, 1_000_000, 7):
+            histogram.record(microseconds / 1_000_000)
+
+        # 20 powers of two with 64 buckets each at most
+        assert_that(len(histogram.counts), less_than_or_equal_to(20 * 64))
+
+    def test_histogram_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.001)
+        second.record(0.002)
+        second.record(0.003)
+        first.merge(second)
+
+        assert_that(first.total, is_(3))
+        assert_that(first.max, is_(3000))
+        assert_that(first.percentile(50), close_to(0.002, 0.002 / 64))
+
+    def test_empty_histogram(self):
+        assert_that(LatencyHistogram().percentile(99), is_(0.0))
+
+    def test_run_bench_with_iterations(self, mocker):
+        sampled = []
+
+        def run_step_request(*args, verify, **kwargs):
+            sampled.append(verify)
+            # args[6] is the report of the step
+            args[6]["elapsed"] = 0.01
+
+        mocker.patch("src.bench.run_step_request", side_effect=run_step_request)
+
+        result = run_bench(
+            self.steps_data,
+            self.operation_schemas,
+            SessionRegistry(),
+            users=3,
+            iterations=2,
+            sample_rate=0,
+        )
+
+        assert_that(result.iterations, is_(6))
+        assert_that(list(result.operations), is_(["createThing", "getThing"]))
+        for stats in result.operations.values():
+            assert_that(stats.requests, is_(6))
+            assert_that(stats.errors, is_(0))
+            assert_that(stats.latencies.percentile(50), close_to(0.01, 0.01 / 64))
+        assert_that(sampled, is_([False] * 12))
+
+    def test_run_bench_failed_step_ends_iteration(self, mocker):
+        def run_step_request(s, *args, **kwargs):
+            raise ValidationError("HTTP Status Code does not match")
+
+        mocker.patch("src.bench.run_step_request", side_effect=run_step_request)
+
+        result = run_bench(
+            self.steps_data, self.operation_schemas, SessionRegistry(), iterations=2
+        )
+
+        create = result.operations["createThing"]
+        assert_that(create.requests, is_(2))
+        assert_that(create.error_rate, is_(1.0))
+        assert_that(create.latencies.total, is_(0))
+        assert_that("getThing" in result.operations, is_(False))
+
+    def test_run_bench_with_duration(self, mocker):
+        mocker.patch(
+            "src.bench.run_step_request",
+            side_effect=lambda *args, **kwargs: args[6].update(elapsed=0.001),
+        )
+
+        result = run_bench(
+            self.steps_data,
+            self.operation_schemas,
+            SessionRegistry(),
+            users=2,
+            duration=0.05,
+        )
+
+        assert_that(result.iterations > 0, is_(True))
+        assert_that(result.elapsed >= 0.05, is_(True))
+        assert_that(result.table().row_count, is_(2))
@@ -0,0 +1,50 @@
+from hamcrest import assert_that, is_, same_instance
+from jsonschema import validate
+from openapi_spec_validator import validate as validate_spec
+
+from benchmarks.generate import *
+from benchmarks.run import compare
+
+
+class TestBenchmarks:
+    """Class for basic unit testing of the benchmark fixtures and comparison"""
+
+    def test_generate_spec(self):
+        spec = generate_spec(10, depth=3, properties=5)
+        validate_spec(spec)
+
+        assert_that(len(spec["paths"]), is_(10))
+        assert_that(
+            spec["components"]["schemas"]["Level1"]["properties"]["next"],
+            is_({"$ref": "#/components/schemas/Level2"}),
+        )
+
+    def test_resolve_refs(self):
+        spec = resolve_refs(generate_spec(2, depth=2))
+        schemas = spec["components"]["schemas"]
+
+        nested = schemas["Resource0"]["properties"]["nested"]
+        assert_that(nested, same_instance(schemas["Level0"]))
+        content = spec["paths"]["/resources0"]["post"]["requestBody"]["content"]
+        assert_that(
+            content["application/json"]["schema"], same_instance(schemas["Resource0"])
+        )
+
+    def test_generate_steps(self):
+        spec = generate_spec(4)
+        steps = generate_steps(spec, "http://localhost", 5)
+
+        assert_that(
+            [step["name"] for step in steps["steps"]],
+            is_(["create0", "get0", "create1", "get1"]),
+        )
+        validate(
+            instance=steps["steps"][0]["body"],
+            schema=resolve_refs(spec)["components"]["schemas"]["Resource0"],
+        )
+
+    def test_compare(self):
+        baseline = {"fast": {"median": 1.0}, "slow": {"median": 1.0}}
+        results = {"fast": {"median": 0.5}, "slow": {"median": 1.5}, "new": {"median": 1}}
+
+        assert_that(compare(results, baseline, 0.2), is_(["slow"]))
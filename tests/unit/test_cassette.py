@@ -0,0 +1,119 @@
+import json
+
+import pytest
+from hamcrest import assert_that, is_, has_entries, contains_string
+
+from src.cassette import (
+    SCRUBBED,
+    RecordingTransport,
+    ReplayTransport,
+    get_match_key,
+    scrub_headers,
+)
+from src.errors import CassetteMismatchError
+from src.models.response import Response
+from src.transport import Transport
+
+
+class FakeTransport(Transport):
+    """Answers every request with a body naming the request, and counts them"""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send(
+        self, method, url, params, headers, auth, body, timeout=None, stream=False
+    ):
+        self.sent += 1
+        text = json.dumps({"method": method, "url": url, "sent": self.sent})
+        return Response(
+            status_code=200,
+            headers={"Content-Type": "application/json", "Set-Cookie": "session=1"},
+            body=iter([text.encode("utf-8")]) if stream else text,
+        )
+
+
+def send(transport, path, params=None, body=None, stream=False):
+    return transport.send(
+        "POST",
+        "http://api.test" + path,
+        params,
+        {"Authorization": "Bearer secret", "X-Test": "yes"},
+        ("user", "pass"),
+        body,
+        stream=stream,
+    )
+
+
+class TestCassette:
+    """Class for basic unit testing of the cassette.py module"""
+
+    def test_scrub_headers(self):
+        assert_that(
+            scrub_headers(
+                {"Authorization": "Basic abc", "X-API-Key": "k", "Accept": "*/*"}
+            ),
+            is_({"Authorization": SCRUBBED, "X-API-Key": SCRUBBED, "Accept": "*/*"}),
+        )
+
+    def test_get_match_key(self):
+        assert_that(
+            get_match_key("get", "http://a.test/x?b=2", {"a": 1}, {"y": 1, "z": 2}),
+            is_(
+                get_match_key(
+                    "GET", "https://b.test/x", {"b": "2", "a": "1"}, {"z": 2, "y": 1}
+                )
+            ),
+        )
+        assert_that(
+            get_match_key("GET", "http://a.test/x", None, {"y": 1})
+            == get_match_key("GET", "http://a.test/x", None, {"y": 2}),
+            is_(False),
+        )
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_record_replay(self, tmp_path, compress):
+        path = str(tmp_path / "cassette.jsonl")
+        inner = FakeTransport()
+        recorder = RecordingTransport(inner, path, compress)
+        first = send(recorder, "/things", {"page": 1}, {"name": "pony"})
+        second = send(recorder, "/things", {"page": 1}, {"name": "pony"})
+        streamed = b"".join(send(recorder, "/stream", stream=True).body)
+        recorder.close()
+
+        with open(path) as cassette:
+            text = cassette.read()
+        for credential in ("secret", "pass", "session=1"):
+            assert_that(credential in text, is_(False))
+        entries = [json.loads(line) for line in text.splitlines()]
+        assert_that(len(entries), is_(3))
+        assert_that("body_gzip" in entries[0]["response"], is_(compress))
+
+        replayer = ReplayTransport(path)
+        # Identical requests get the recorded responses in order, then the last one
+        for expected in (first, second, second):
+            response = send(replayer, "/things", {"page": "1"}, {"name": "pony"})
+            assert_that(response.body, is_(expected.body))
+        replayed = send(replayer, "/stream", stream=True)
+        assert_that(b"".join(replayed.body), is_(streamed))
+        assert_that(
+            send(replayer, "/stream").headers,
+            has_entries({"Content-Type": "application/json", "Set-Cookie": SCRUBBED}),
+        )
+        assert_that(inner.sent, is_(3))
+
+    def test_replay_mismatch(self, tmp_path):
+        path = str(tmp_path / "cassette.jsonl")
+        recorder = RecordingTransport(FakeTransport(), path)
+        send(recorder, "/things", {"page": 1})
+        recorder.close()
+
+        replayer = ReplayTransport(path)
+        with pytest.raises(CassetteMismatchError) as error:
+            send(replayer, "/things", {"page": 2})
+        assert_that(str(error.value), contains_string("Recorded for POST /things"))
+        assert_that(str(error.value), contains_string('[["page", "1"]]'))
+
+        with pytest.raises(CassetteMismatchError) as error:
+            send(replayer, "/other")
+        assert_that(str(error.value), contains_string("Nothing was recorded"))
@@ -0,0 +1,61 @@
+import pytest
+from hamcrest import assert_that, is_, has_key, not_
+
+from src.catalog import *
+from src.parsing import load_spec_file
+
+
+class TestCatalog:
+    """Class for basic unit testing of the catalog.py module"""
+
+    spec_file_path = "./tests/fixtures/valid/specs/person_api.yml"
+
+    catalog = OperationCatalog(load_spec_file(spec_file_path))
+
+    def test_indexes(self):
+        assert_that(self.catalog.operation_ids, is_({"createPerson", "getPerson"}))
+        assert_that(self.catalog.routes[("POST", "/person")], is_("createPerson"))
+        assert_that(self.catalog.route("getPerson"), is_(("GET", "/person/{id}")))
+        assert_that(self.catalog.tags, is_({"People": {"createPerson", "getPerson"}}))
+        assert "getPerson" in self.catalog
+        assert "deletePerson" not in self.catalog
+
+    def test_match(self):
+        assert_that(self.catalog.match("post", "/person"), is_("createPerson"))
+        assert_that(self.catalog.match("GET", "/person/42"), is_("getPerson"))
+        assert_that(self.catalog.match("GET", "/person/42/pets"), is_(None))
+        assert_that(self.catalog.match("DELETE", "/person/42"), is_(None))
+
+    def test_schemas(self):
+        schemas = self.catalog.schemas("createPerson")
+        assert_that(schemas["requestBody"]["required"], is_(["name", "age"]))
+        assert_that(schemas["responses"]["201"]["type"], is_("object"))
+        assert_that(self.catalog.schemas("getPerson"), not_(has_key("requestBody")))
+
+    def test_operation_schemas(self):
+        operation_schemas = self.catalog.operation_schemas(
+            ["getPerson", "undocumented", "getPerson"]
+        )
+        assert_that(list(operation_schemas), is_(["getPerson"]))
+
+    def test_unsupported_content_type(self):
+        catalog = OperationCatalog(
+            {
+                "paths": {
+                    "/file": {
+                        "parameters": [],
+                        "put": {
+                            "operationId": "putFile",
+                            "requestBody": {
+                                "content": {"text/csv": {"schema": {}}, "text/xml": {}}
+                            },
+                            "responses": {"204": {"description": "Stored"}},
+                        },
+                    }
+                }
+            }
+        )
+
+        assert_that(catalog.operation_ids, is_({"putFile"}))
+        with pytest.raises(UnsupportedSchemaError):
+            catalog.schemas("putFile")
@@ -0,0 +1,57 @@
+import pytest
+from hamcrest import assert_that, is_
+
+from src.datasets import *
+from src.errors import DatasetError
+
+
+class TestDatasets:
+    """Class for basic unit testing of the datasets.py module"""
+
+    def test_read_csv_dataset(self, tmp_path):
+        path = str(tmp_path / "people.csv")
+        with open(path, "w") as dataset:
+            dataset.write('name,age\npony,3\n"last, first",40\n')
+
+        assert_that(
+            list(read_dataset(path)),
+            is_([{"name": "pony", "age": "3"}, {"name": "last, first", "age": "40"}]),
+        )
+
+    def test_read_jsonl_dataset(self, tmp_path):
+        path = str(tmp_path / "people.data")
+        with open(path, "w") as dataset:
+            dataset.write('{"name": "pony", "tags": [1, 2]}\n\n{"name": null}\n[]\n')
+
+        rows = read_dataset(path, "jsonl")
+        # Rows are read as they are asked for
+        assert_that(next(rows), is_({"name": "pony", "tags": [1, 2]}))
+        assert_that(next(rows), is_({"name": None}))
+        with pytest.raises(DatasetError) as error:
+            next(rows)
+        assert_that(error.value.line, is_(4))
+
+    def test_read_dataset_errors(self, tmp_path):
+        with pytest.raises(ValueError):
+            list(read_dataset(str(tmp_path / "people.txt")))
+        with pytest.raises(FileNotFoundError):
+            list(read_dataset(str(tmp_path / "people.csv")))
+
+        path = str(tmp_path / "people.jsonl")
+        with open(path, "w") as dataset:
+            dataset.write("{not json}\n")
+        with pytest.raises(DatasetError):
+            list(read_dataset(path))
+
+    def test_dataset_cycle(self, tmp_path):
+        path = str(tmp_path / "ids.jsonl")
+        with open(path, "w") as dataset:
+            dataset.write('{"id": 1}\n{"id": 2}\n')
+
+        cycle = DatasetCycle(path)
+        assert_that([cycle.next_row()["id"] for _ in range(5)], is_([1, 2, 1, 2, 1]))
+
+        with open(path, "w") as dataset:
+            dataset.write("")
+        with pytest.raises(DatasetError):
+            DatasetCycle(path).next_row()
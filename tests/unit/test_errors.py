@@ -52,3 +52,13 @@ def test_invalid_expression_error():
 def test_unsupported_schema_error():
     with pytest.raises(UnsupportedSchemaError) as err:
         raise UnsupportedSchemaError(schema_value)
+
+
+def test_errors_do_not_print(capsys):
+    error = InsufficientCoverageError(coverage, desired_coverage, operation_set)
+    UndocumentedOperationError(operation_set)
+    InvalidFileError(file_extension)
+
+    assert capsys.readouterr().out == ""
+    assert str(error).startswith("The operation coverage is 90.0")
+    assert error.uncovered == operation_set
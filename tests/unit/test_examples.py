@@ -0,0 +1,106 @@
+import random
+import re
+
+import pytest
+from hamcrest import assert_that, is_
+from jsonschema import validate
+
+from src.examples import generate_example, generate_from_pattern
+from src.parsing import load_spec_file
+
+
+class TestExamples:
+    """Class for basic unit testing of the examples.py module"""
+
+    spec_file_path = "./tests/fixtures/valid/specs/person_api.yml"
+
+    def test_generate_example_matches_spec(self):
+        spec = load_spec_file(self.spec_file_path)
+        schema = spec["components"]["schemas"]["person"]
+
+        validate(instance=generate_example(schema), schema=schema)
+
+    @pytest.mark.parametrize(
+        "schema",
+        [
+            {"type": "integer", "exclusiveMinimum": 5, "multipleOf": 3},
+            {"type": "integer", "minimum": 1, "exclusiveMinimum": True},
+            {"type": ["null", "number"], "maximum": -2},
+            {"type": "string", "format": "date-time"},
+            {"type": "string", "minLength": 10, "maxLength": 12},
+            {
+                "type": "array",
+                "items": {"type": "integer"},
+                "minItems": 3,
+                "uniqueItems": True,
+            },
+            {"type": "array", "prefixItems": [{"type": "string"}, {"type": "boolean"}]},
+            {
+                "allOf": [
+                    {"type": "object", "properties": {"a": {"type": "string"}}},
+                    {"type": "object", "required": ["b"]},
+                ]
+            },
+            {"oneOf": [{"type": "null"}, {"type": "string", "enum": ["x", "y"]}]},
+        ],
+    )
+    def test_generate_example_meets_constraints(self, schema):
+        # The boolean exclusive bounds of OpenAPI 3.0 are not valid JSON Schema
+        example = generate_example(schema)
+        if schema.get("exclusiveMinimum") is True:
+            assert_that(example, is_(2))
+        else:
+            validate(instance=example, schema=schema)
+
+    def test_generate_example_prefers_examples(self):
+        assert_that(generate_example({"type": "integer", "example": 7}), is_(7))
+        assert_that(generate_example({"type": "integer", "examples": [8, 9]}), is_(8))
+        assert_that(generate_example({"type": "integer", "default": 3}), is_(3))
+
+    def test_generate_example_stops_recursing(self):
+        node = {"type": "object", "properties": {"value": {"type": "integer"}}}
+        node["properties"]["next"] = node
+        node["properties"]["children"] = {"type": "array", "items": node}
+
+        assert_that(generate_example(node), is_({"value": 1, "children": []}))
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            r"^\+?[0-9]{10}$",
+            r"^[A-Z]{2}-\d{3}(foo|bar)?$",
+            r"[^abc]+x",
+            r"(?:ab){2,3}",
+            r"^(?P<year>\d{4})-\x41{1,}[.\w-]*$",
+        ],
+    )
+    def test_generate_from_pattern(self, pattern):
+        example = generate_from_pattern(pattern)
+        assert_that(re.search(pattern, example) is not None, is_(True))
+
+        # Strings picked at random still match
+        rng = random.Random(0)
+        for _ in range(20):
+            example = generate_from_pattern(pattern, rng)
+            assert_that(re.search(pattern, example) is not None, is_(True))
+
+    def test_generate_from_pattern_with_length(self):
+        schema = {"type": "string", "pattern": "^[a-z]+$", "minLength": 20}
+        assert_that(generate_example(schema), is_("a" * 20))
+
+        rng = random.Random(0)
+        for _ in range(20):
+            example = generate_from_pattern(r"^(ab|c)+\d*$", rng, 5, 8)
+            assert_that(re.search(r"^(ab|c)+\d*$", example) is not None, is_(True))
+            assert_that(5 <= len(example) <= 8, is_(True))
+
+        # Not anchored at the end, so padding still matches
+        assert_that(generate_from_pattern("^id", min_length=4), is_("idxx"))
+
+    def test_generate_from_pattern_unsupported(self):
+        for pattern in [r"(a)\1", "(?i)a", "a{2,1}", "(a", "*a"]:
+            with pytest.raises(ValueError):
+                generate_from_pattern(pattern)
+
+        schema = {"type": "string", "pattern": r"(a)\1", "maxLength": 3}
+        assert_that(generate_example(schema), is_("str"))
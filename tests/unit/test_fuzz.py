@@ -0,0 +1,150 @@
+import random
+
+from hamcrest import assert_that, is_, contains_string, has_length
+
+from src.fuzz import *
+from src.models.response import Response
+from src.verify import ValidatorRegistry
+
+
+class TestFuzz:
+    """Class for basic unit testing of the fuzz.py module"""
+
+    schema = {
+        "type": "object",
+        "required": ["name", "age"],
+        "additionalProperties": False,
+        "properties": {
+            "name": {"type": "string", "minLength": 2, "maxLength": 10},
+            "age": {"type": "integer", "minimum": 0, "maximum": 150},
+            "id": {"type": "string", "format": "uuid"},
+            "code": {"type": "string", "pattern": "^[A-Z]{2}-[0-9]{3}$"},
+            "kind": {"enum": ["cat", "dog"]},
+            "tags": {
+                "type": "array",
+                "items": {"type": "string"},
+                "maxItems": 3,
+                "uniqueItems": True,
+            },
+        },
+    }
+
+    operation_schemas = {
+        "createThing": {
+            "requestBody": schema,
+            "responses": {
+                "201": {"type": "object", "required": ["id"]},
+                "4XX": {"type": "object", "required": ["message"]},
+            },
+        }
+    }
+
+    def get_cases(self, invalid_ratio: float, count: int = 500) -> list[FuzzCase]:
+        generator = BodyGenerator(self.schema)
+        return [
+            case
+            for batch in generator.batches("0:create", 0, count, invalid_ratio, 64)
+            for case in batch
+        ]
+
+    def test_generates_valid_bodies(self):
+        cases = self.get_cases(0.0)
+
+        assert_that(all(case.valid for case in cases), is_(True))
+        # The bodies are spread over the schema, not one example over and over
+        assert_that(len({repr(case.body) for case in cases}), is_(500))
+
+    def test_generates_invalid_bodies(self):
+        cases = self.get_cases(1.0)
+
+        assert_that(any(case.valid for case in cases), is_(False))
+
+    def test_cases_are_reproducible(self):
+        cases = self.get_cases(0.5)
+        generator = BodyGenerator(self.schema)
+
+        assert_that(generator.case("0:create", 317, 0.5).body, is_(cases[317].body))
+        assert_that(
+            generator.case("1:create", 317, 0.5).body == cases[317].body, is_(False)
+        )
+
+    def test_mutations_break_one_constraint(self):
+        node = compile_schema(self.schema)
+        body = {"name": "pony", "age": 150}
+
+        mutated = [node.mutate(body, random.Random(seed)) for seed in range(200)]
+        assert_that(
+            {repr(value) for value in mutated},
+            is_(
+                {
+                    repr(value)
+                    for value in (
+                        [],
+                        None,
+                        True,
+                        12345,
+                        1.5,
+                        "string",
+                        {"age": 150},
+                        {"name": "pony"},
+                        {"name": "pony", "age": 150, EXTRA_PROPERTY: "value"},
+                        {"name": "p", "age": 150},
+                        {"name": "ponyxxxxxxx", "age": 150},
+                        {"name": "pony", "age": -1},
+                        {"name": "pony", "age": 151},
+                        {"name": "pony", "age": "string"},
+                        {"name": "pony", "age": 1.5},
+                        {"name": "pony", "age": None},
+                        {"name": "pony", "age": True},
+                        {"name": "pony", "age": {}},
+                        {"name": "pony", "age": []},
+                        {"name": 12345, "age": 150},
+                        {"name": 1.5, "age": 150},
+                        {"name": None, "age": 150},
+                        {"name": True, "age": 150},
+                        {"name": {}, "age": 150},
+                        {"name": [], "age": 150},
+                    )
+                }
+            ),
+        )
+        # The body it was given is left as it was
+        assert_that(body, is_({"name": "pony", "age": 150}))
+
+    def test_generate_stops_recursing(self):
+        node = {"type": "object", "properties": {"value": {"type": "integer"}}}
+        node["properties"]["next"] = node
+
+        value = compile_schema(node).generate(random.Random(0))
+
+        depth = 0
+        while "next" in value:
+            value, depth = value["next"], depth + 1
+        assert_that(depth <= MAX_DEPTH, is_(True))
+
+    def test_check_fuzz_response(self):
+        validators = ValidatorRegistry(self.operation_schemas)
+        schemas = self.operation_schemas["createThing"]
+        valid, invalid = FuzzCase(0, {}, True), FuzzCase(1, {}, False)
+
+        def check(case: FuzzCase, status_code: int, body: str) -> Union[str, None]:
+            response = Response(status_code, {}, body)
+            return check_fuzz_response(
+                response, case, schemas, validators, "createThing"
+            )
+
+        assert_that(check(valid, 201, '{"id": 1}'), is_(None))
+        assert_that(check(invalid, 422, '{"message": "no"}'), is_(None))
+        assert_that(check(invalid, 201, '{"id": 1}'), contains_string("accepted"))
+        assert_that(check(valid, 500, "{}"), contains_string("server error"))
+        assert_that(check(valid, 302, "{}"), contains_string("not documented"))
+        assert_that(check(invalid, 400, "{}"), contains_string("4XX schema"))
+
+    def test_fuzz_result_table(self):
+        result = FuzzResult(7)
+        result.steps["create"] = FuzzStats("createThing")
+        result.steps["create"].cases = 10
+
+        table = result.table()
+        assert_that(table.title, contains_string("with seed 7"))
+        assert_that(table.rows, has_length(1))
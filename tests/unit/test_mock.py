@@ -0,0 +1,88 @@
+import socket
+
+import requests
+import yaml
+from hamcrest import assert_that, is_
+from jsonschema import validate as validate_schema
+
+from benchmarks.generate import generate_spec, generate_steps
+from src.mock import MockServer, get_default_status
+from src.parsing import load_spec_file
+from src.validate import validate
+
+
+class TestMock:
+    """Class for basic unit testing of the mock.py module"""
+
+    spec_file_path = "./tests/fixtures/valid/specs/person_api.yml"
+
+    def test_get_default_status(self):
+        assert_that(get_default_status(["404", "201", "200"]), is_("200"))
+        assert_that(get_default_status(["default", "404"]), is_("404"))
+        assert_that(get_default_status(["default"]), is_("default"))
+
+    def test_mock_serves_operations(self):
+        spec = load_spec_file(self.spec_file_path)
+        spec["servers"] = [{"url": "https://api.example.com/v1"}]
+        spec["paths"]["/person/{id}"]["get"]["responses"]["404"] = {
+            "description": "Not found",
+            "content": {"application/json": {"example": {"message": "gone"}}},
+        }
+
+        with MockServer(spec) as server:
+            with requests.Session() as session:
+                response = session.get(server.url + "/person/1")
+                assert_that(response.status_code, is_(200))
+                validate_schema(
+                    instance=response.json(),
+                    schema=spec["components"]["schemas"]["person"],
+                )
+
+                # The server's /v1 prefix is optional
+                response = session.post(server.url + "/v1/person", json={"name": "x"})
+                assert_that(response.status_code, is_(201))
+                assert_that(response.json(), is_({"id": 1}))
+
+                response = session.get(
+                    server.url + "/person/1", headers={"Prefer": "code=404"}
+                )
+                assert_that(response.status_code, is_(404))
+                assert_that(response.json(), is_({"message": "gone"}))
+
+                response = session.delete(server.url + "/person/1")
+                assert_that(response.status_code, is_(404))
+
+    def test_mock_keeps_connections_alive(self):
+        spec = load_spec_file(self.spec_file_path)
+
+        with MockServer(spec) as server:
+            with socket.create_connection(("127.0.0.1", server.port)) as sock:
+                # A chunked request, then a HEAD request on the same connection
+                sock.sendall(
+                    b"POST /person HTTP/1.1\r\nHost: x\r\n"
+                    b"Transfer-Encoding: chunked\r\n\r\n2\r\n{}\r\n0\r\n\r\n"
+                    b"HEAD /person/1 HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n"
+                )
+                data = b""
+                while chunk := sock.recv(65536):
+                    data += chunk
+
+        first, second = data.split(b"HTTP/1.1 ")[1:]
+        assert_that(first.startswith(b"201 Created\r\n"), is_(True))
+        assert_that(first.endswith(b'{"id":1}'), is_(True))
+        assert_that(second.startswith(b"200 OK\r\n"), is_(True))
+        assert_that(second.endswith(b"Connection: close\r\n\r\n"), is_(True))
+
+    def test_validate_against_mock(self, tmp_path):
+        spec = generate_spec(4)
+        spec_path = str(tmp_path / "spec.yml")
+        with open(spec_path, "w") as spec_file:
+            yaml.safe_dump(spec, spec_file)
+
+        with MockServer(load_spec_file(spec_path)) as server:
+            steps_path = str(tmp_path / "steps.yml")
+            with open(steps_path, "w") as steps_file:
+                yaml.safe_dump(generate_steps(spec, server.url, 2), steps_file)
+            results = validate(steps_path, spec_path)
+
+        assert_that({result.status for result in results}, is_({"passed"}))
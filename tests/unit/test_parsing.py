@@ -1,5 +1,6 @@
 import pytest
 from hamcrest import assert_that, is_, has_items, instance_of
+from openapi_spec_validator.exceptions import OpenAPISpecValidatorError
 
 from src.parsing import *
 
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+from hamcrest import assert_that, is_, same_instance, contains_string
+
+from src.errors import PlanMismatchError
+from src.plan import *
+
+
+def get_recursive_schemas() -> dict:
+    # What a resolved spec looks like when a schema references itself
+    person = {"type": "object", "properties": {"name": {"type": "string"}}}
+    person["properties"]["friends"] = {"type": "array", "items": person}
+    return {"getPerson": {"responses": {"200": person, "201": person}}}
+
+
+class TestPlan:
+    """Class for basic unit testing of the plan.py module"""
+
+    def test_write_and_load_plan(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with open("steps.yml", "w") as steps_file:
+            steps_file.write("steps: []")
+        with open("spec.yml", "w") as spec_file:
+            spec_file.write("paths: {}")
+
+        steps = {"base_url": "http://localhost", "steps": [{"name": "get"}]}
+        plan = build_plan(
+            "spec.yml",
+            {"steps.yml": steps},
+            {"steps.yml": {"get": set()}},
+            get_recursive_schemas(),
+            {"listPeople", "getPerson"},
+        )
+        assert_that(set(plan["sources"]), is_({"steps.yml", "spec.yml"}))
+        assert_that(plan["operations"], is_(["getPerson", "listPeople"]))
+
+        write_plan(plan, "plan.json")
+        loaded = load_plan("plan.json")
+        assert_that(loaded["files"][0]["steps"], is_(steps))
+        assert_that(loaded["files"][0]["graph"], is_({"get": set()}))
+        person = loaded["schemas"]["getPerson"]["responses"]["200"]
+        assert_that(person["properties"]["friends"]["items"], same_instance(person))
+
+        # Sources that are not around are not checked
+        os.remove("spec.yml")
+        load_plan("plan.json")
+
+        with open("steps.yml", "w") as steps_file:
+            steps_file.write("steps: [{}]")
+        with pytest.raises(PlanMismatchError) as error:
+            load_plan("plan.json")
+        assert_that(str(error.value), contains_string("steps.yml"))
+        load_plan("plan.json", check_sources=False)
+
+    def test_load_plan_version(self, tmp_path):
+        plan_path = str(tmp_path / "plan.json")
+        with open(plan_path, "w") as plan_file:
+            json.dump({"version": PLAN_VERSION + 1}, plan_file)
+
+        with pytest.raises(PlanMismatchError):
+            load_plan(plan_path)
+        with pytest.raises(FileNotFoundError):
+            load_plan(str(tmp_path / "missing.json"))
@@ -3,6 +3,8 @@ from hamcrest import assert_that, is_, has_items, instance_of
 
 from src.parsing import *
 from src.preprocessing import *
+from src.errors import InvalidExpressionError
+from src.models import Response
 
 
 class TestPreProcessing:
@@ -30,3 +32,68 @@ class TestPreProcessing:
 
         # TODO: More tests for evaluate()
         # evaluated_steps_expression = evaluate("${{ steps.someStep }}", {})
+
+    def test_template_renders_only_expression_slots(self, monkeypatch):
+        monkeypatch.setenv("PYPONY_TEST_USER", "pony")
+        response = Response(201, {}, {"id": 7, "items": [{"name": "first"}]})
+        value = {
+            "literal": {"nested": ["a", "b"]},
+            "path": "/people/${{ steps.create.response.body.id }}/items",
+            "user": "${{ env.PYPONY_TEST_USER }}",
+            "names": ["${{ steps.create.response.body.items.0.name }}", 1],
+        }
+
+        template = Template(value)
+        rendered = template.render({"create": {"response": response}})
+
+        assert_that(template.references, is_({"create"}))
+        assert_that(
+            rendered,
+            is_(
+                {
+                    "literal": {"nested": ["a", "b"]},
+                    "path": "/people/7/items",
+                    "user": "pony",
+                    "names": ["first", 1],
+                }
+            ),
+        )
+        # Literal subtrees are shared rather than rebuilt, and the input is untouched
+        assert rendered["literal"] is value["literal"]
+        assert_that(value["user"], is_("${{ env.PYPONY_TEST_USER }}"))
+
+    def test_template_renders_data(self):
+        value = {
+            "path": "/people/${{ data.id }}",
+            "age": "${{ data.age }}",
+            "first": "${{ data.names.0 }}",
+            "status_code": 201,
+        }
+        template = Template(value)
+        rendered = template.render({}, {"id": 7, "age": 3, "names": ["pony"]})
+
+        assert_that(template.uses_data, is_(True))
+        # A value that is only a data expression keeps the type it has in the row
+        assert_that(
+            rendered,
+            is_({"path": "/people/7", "age": 3, "first": "pony", "status_code": 201}),
+        )
+        with pytest.raises(EvaluationError):
+            template.render({})
+        with pytest.raises(EvaluationError):
+            template.render({}, {"id": 7})
+        with pytest.raises(InvalidExpressionError):
+            Template("${{ data }}")
+
+    def test_template_errors(self):
+        with pytest.raises(BaseContextError):
+            Template("${{ operations.create.response.body.id }}")
+        with pytest.raises(InvalidExpressionError):
+            Template("${{ steps.create }}")
+        with pytest.raises(EnvironmentVariableError):
+            evaluate("${{ env.PYPONY_TEST_MISSING_VARIABLE }}")
+        with pytest.raises(EvaluationError):
+            evaluate(
+                "${{ steps.create.response.data.id }}",
+                {"create": {"response": Response(200, {}, {})}},
+            )
@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+
+from click.testing import CliRunner
+from hamcrest import assert_that, is_, contains_string, less_than
+
+from pypony import cli, get_spec_cache_dir
+
+# Packages that only the commands need, which the CLI must not import to parse args
+HEAVY_PACKAGES = [
+    "requests",
+    "jsonschema",
+    "openapi_spec_validator",
+    "json_ref_dict",
+    "yaml",
+    "rich",
+    "asyncio",
+]
+
+# Seconds that importing pypony may take; eager imports took over 0.25
+IMPORT_TIME_BUDGET = 0.15
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+class TestPypony:
+    """Class for basic unit testing of the pypony.py CLI"""
+
+    def test_import_defers_heavy_packages(self):
+        result = run_python("import sys, pypony; print('\\n'.join(sys.modules))")
+
+        imported = {name.split(".")[0] for name in result.stdout.split()}
+        assert_that(sorted(imported & set(HEAVY_PACKAGES)), is_([]))
+
+    def test_import_time_budget(self):
+        result = run_python("import pypony", "-X", "importtime")
+
+        # Lines look like "import time: self [us] | cumulative | package"
+        cumulative = next(
+            int(line.split("|")[1])
+            for line in result.stderr.splitlines()
+            if line.split("|")[-1].strip() == "pypony"
+        )
+        assert_that(cumulative / 1e6, less_than(IMPORT_TIME_BUDGET))
+
+    def test_help(self):
+        runner = CliRunner()
+        commands = ["main", "run", "mock", "compile", "merge", "fuzz", "bench"]
+        for command in [["--help"]] + [[command, "--help"] for command in commands]:
+            result = runner.invoke(cli, command)
+            assert_that(result.exit_code, is_(0))
+        assert_that(result.output, contains_string("--users"))
+
+    def test_usage_error_exits_early(self):
+        result = CliRunner().invoke(cli, ["main", "-sp", "spec.yml"])
+
+        assert_that(result.exit_code, is_(2))
+        assert_that(result.output, contains_string("Missing option"))
+
+    def test_shared_options(self):
+        runner = CliRunner()
+        for command in ["main", "fuzz", "bench"]:
+            result = runner.invoke(cli, [command, "--help"])
+            for option in ["--read-timeout", "--transport", "--lazy-refs"]:
+                assert_that(result.output, contains_string(option))
+
+    def test_get_spec_cache_dir(self, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", "/cache")
+
+        assert_that(get_spec_cache_dir("specs", False), is_("specs"))
+        assert_that(get_spec_cache_dir(None, False), is_("/cache/pypony/specs"))
+        assert_that(get_spec_cache_dir("specs", True), is_(None))
+
+    def test_result_cache_is_opt_in(self, mocker):
+        validate = mocker.patch("src.validate.validate")
+
+        CliRunner().invoke(cli, ["-st", "steps.yml", "-sp", "spec.yml"])
+        assert_that(validate.call_args.kwargs["result_cache_dir"], is_(None))
+
+        CliRunner().invoke(
+            cli, ["-st", "steps.yml", "-sp", "spec.yml", "--result-cache-dir", "r"]
+        )
+        assert_that(validate.call_args.kwargs["result_cache_dir"], is_("r"))
@@ -0,0 +1,77 @@
+import pytest
+from hamcrest import assert_that, is_, same_instance
+from json_ref_dict import materialize, RefDict
+
+from src.refs import *
+
+
+RECURSIVE_SPEC = """
+openapi: 3.1.0
+info:
+  title: Example OpenAPI Spec
+  version: 1.0.0
+paths:
+  /node:
+    $ref: "./paths.yml#/node"
+  /other:
+    get:
+      operationId: getOther
+      responses:
+        "200":
+          description: Successful response
+          content:
+            "application/json":
+              schema:
+                $ref: "#/components/schemas/node"
+components:
+  schemas:
+    node:
+      type: object
+      properties:
+        children:
+          type: array
+          items:
+            $ref: "#/components/schemas/node"
+"""
+
+PATHS = """
+node:
+  get:
+    operationId: getNode
+    responses:
+      "200":
+        description: Successful response
+        content:
+          "application/json":
+            schema:
+              $ref: "spec.yml#/components/schemas/node"
+"""
+
+
+class TestRefs:
+    """Class for basic unit testing of the refs.py module"""
+
+    spec_file_path = "./tests/fixtures/valid/specs/person_api.yml"
+
+    @pytest.fixture
+    def catalog(self, tmp_path):
+        (tmp_path / "spec.yml").write_text(RECURSIVE_SPEC)
+        (tmp_path / "paths.yml").write_text(PATHS)
+        return LazyOperationCatalog(LazySpec(str(tmp_path / "spec.yml")))
+
+    def test_shallow_operation_ids(self, catalog):
+        assert_that(catalog.operation_ids, is_({"getNode", "getOther"}))
+        # Nothing has been resolved by the shallow pass
+        assert_that(catalog.lazy_spec._resolved, is_({}))
+
+    def test_recursive_and_shared_refs(self, catalog):
+        node = catalog.schemas("getNode")["responses"]["200"]
+        assert_that(node["properties"]["children"]["items"], same_instance(node))
+        assert_that(catalog.schemas("getOther")["responses"]["200"], same_instance(node))
+
+    def test_matches_materialized_spec(self):
+        catalog = LazyOperationCatalog(LazySpec(self.spec_file_path))
+        spec = materialize(RefDict(self.spec_file_path))
+        operation = spec["paths"]["/person"]["post"]
+
+        assert_that(catalog.operation("createPerson"), is_(operation))
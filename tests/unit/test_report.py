@@ -0,0 +1,100 @@
+import json
+import xml.etree.ElementTree as ET
+
+from hamcrest import assert_that, is_
+
+from src.models import StepResult
+from src.report import *
+from src.timing import StepTimings
+
+
+class TestReport:
+    """Class for basic unit testing of the report.py module"""
+
+    timings = StepTimings()
+    timings.add("ttfb", 0.25)
+
+    results = [
+        StepResult("create", "createThing", "passed", 0.5, timings, 201),
+        StepResult("get", "getThing", "failed", 0.75, None, 500, "Bad status"),
+        StepResult("delete", "deleteThing", "skipped"),
+    ]
+
+    def test_get_summary(self):
+        assert_that(
+            get_summary(self.results),
+            is_(
+                {
+                    "tests": 3,
+                    "passed": 1,
+                    "failed": 1,
+                    "skipped": 1,
+                    "cached": 0,
+                    "duration": 1.25,
+                }
+            ),
+        )
+
+    def test_write_json_report(self, tmp_path):
+        path = str(tmp_path / "report.json")
+        write_json_report(self.results, path)
+
+        with open(path) as report_file:
+            report = json.load(report_file)
+        assert_that(report["failed"], is_(1))
+        assert_that(
+            [step["name"] for step in report["steps"]], is_(["create", "get", "delete"])
+        )
+        assert_that(report["steps"][0]["timings"]["ttfb"], is_(0.25))
+        assert_that(report["steps"][1]["error"], is_("Bad status"))
+
+    def test_write_jsonl_report(self, tmp_path):
+        path = str(tmp_path / "report.jsonl")
+        write_json_report(self.results, path)
+
+        with open(path) as report_file:
+            lines = [json.loads(line) for line in report_file]
+        assert_that(
+            [line["status"] for line in lines], is_(["passed", "failed", "skipped"])
+        )
+
+    def test_write_junit_report(self, tmp_path):
+        path = str(tmp_path / "report.xml")
+        write_junit_report(self.results, path, "steps.yml")
+
+        root = ET.parse(path).getroot()
+        assert_that(root.tag, is_("testsuites"))
+        suite = root.find("testsuite")
+        assert_that(suite.get("name"), is_("steps.yml"))
+        assert_that(
+            (suite.get("tests"), suite.get("failures"), suite.get("skipped")),
+            is_(("3", "1", "1")),
+        )
+
+        cases = suite.findall("testcase")
+        assert_that(cases[0].get("time"), is_("0.500000"))
+        assert_that(cases[1].find("failure").get("message"), is_("Bad status"))
+        assert_that(cases[2].find("skipped") is not None, is_(True))
+        ttfb = cases[0].find("properties/property[@name='timing.ttfb']")
+        assert_that(ttfb.get("value"), is_("0.250000"))
+
+    def test_get_slowest_steps_table(self):
+        table = get_slowest_steps_table(self.results, 1)
+
+        assert_that(table.row_count, is_(1))
+        assert_that(table.columns[0]._cells, is_(["get"]))
+
+    def test_write_junit_report_per_step_file(self, tmp_path):
+        path = str(tmp_path / "report.xml")
+        results = [
+            StepResult("create", "createThing", "passed", 0.5, step_file="a.yml"),
+            StepResult("create", "createThing", "failed", 0.5, step_file="b.yml"),
+        ]
+        write_junit_report(results, path)
+
+        root = ET.parse(path).getroot()
+        assert_that(root.get("failures"), is_("1"))
+        assert_that(
+            [suite.get("name") for suite in root.findall("testsuite")],
+            is_(["a.yml", "b.yml"]),
+        )
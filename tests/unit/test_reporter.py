@@ -0,0 +1,117 @@
+import io
+import json
+
+from hamcrest import assert_that, is_, contains_string, ends_with
+
+from src.models import StepResult
+from src.models.response import Response
+from src.reporter import *
+
+
+def get_output(reporter_class) -> str:
+    stream = io.StringIO()
+    reporter = reporter_class(stream)
+    send_events(reporter)
+    # Nothing is written until the buffer is flushed
+    assert_that(stream.getvalue(), is_(""))
+    reporter.close()
+    return stream.getvalue()
+
+
+def send_events(reporter: Reporter):
+    reporter.stage("--Making Requests--")
+    reporter.step(
+        StepResult("create", "createThing", "passed", status_code=201),
+        response=Response(201, {}, '{"id": 1}'),
+        verbose=True,
+    )
+    reporter.step(
+        StepResult("get", "getThing", "failed", error="boom"),
+        [
+            "[bold red]--Response Validation Failed--[/bold red]",
+            "'id' is a required property",
+        ],
+    )
+    reporter.step(StepResult("list", "listThings", "skipped"), reason="get failed")
+    reporter.stage("--Steps File Failed--", "failure")
+
+
+class TestReporter:
+    """Class for basic unit testing of the reporter.py module"""
+
+    def test_text_reporter(self):
+        output = get_output(TextReporter)
+
+        assert_that(
+            output,
+            is_(
+                "--Making Requests--\n"
+                "Step Name: create\n"
+                "---Response---\n"
+                "Status Code: 201\n"
+                '{\n  "id": 1\n}\n'
+                "--Step Verified--\n"
+                "Step Name: get\n"
+                "--Response Validation Failed--\n"
+                "'id' is a required property\n"
+                "Step Name: list\n"
+                "--Step Skipped: get failed--\n"
+                "--Steps File Failed--\n"
+            ),
+        )
+
+    def test_quiet_reporter(self):
+        output = get_output(QuietReporter)
+
+        assert_that(
+            output,
+            is_(
+                "Step Name: get\n"
+                "--Response Validation Failed--\n"
+                "'id' is a required property\n"
+                "--Steps File Failed--\n"
+            ),
+        )
+
+    def test_jsonl_reporter(self):
+        events = [json.loads(line) for line in get_output(JsonlReporter).splitlines()]
+
+        assert_that(
+            [event["event"] for event in events],
+            is_(["stage", "step", "step", "step", "stage"]),
+        )
+        assert_that(events[2]["status"], is_("failed"))
+        assert_that(
+            events[2]["messages"],
+            is_(["--Response Validation Failed--", "'id' is a required property"]),
+        )
+        assert_that(events[3]["reason"], is_("get failed"))
+        assert_that(events[4]["level"], is_("failure"))
+
+    def test_deferred_reporter(self):
+        deferred = DeferredReporter()
+        send_events(deferred)
+
+        stream = io.StringIO()
+        reporter = TextReporter(stream)
+        deferred.replay(reporter)
+        reporter.close()
+        assert_that(stream.getvalue(), is_(get_output(TextReporter)))
+        assert_that(deferred.events, is_([]))
+
+    def test_reporter_flushes_in_batches(self, mocker):
+        mocker.patch("src.reporter.FLUSH_SIZE", 10)
+        stream = io.StringIO()
+        reporter = JsonlReporter(stream)
+
+        reporter.stage("--Validating Spec--")
+        assert_that(stream.getvalue(), contains_string("Validating Spec"))
+
+    def test_format_body(self):
+        assert_that(format_body({"a": [1]}), is_('{\n  "a": [\n    1\n  ]\n}'))
+        assert_that(format_body("not json"), is_("not json"))
+
+        # Only as much of the body as is shown gets serialized
+        body = {"items": list(range(100_000))}
+        assert_that(len(format_body(body, 100)), is_(100 + len("\n... (truncated)")))
+        assert_that(format_body("x" * 150, 100), ends_with("(50 more characters)"))
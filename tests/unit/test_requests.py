@@ -1,9 +1,19 @@
+import time
+
 import pytest
 import requests
 from jsonschema import ValidationError
 
+from src.errors import StepCancelledError, StepFailuresError
 from src.parsing import parse_steps_file, parse_spec_file
-from src.requests import make_requests
+from src.models import Response
+from src.preprocessing import Template
+from src.requests import (
+    get_retained_paths,
+    make_requests,
+    retain_response,
+    run_step_request,
+)
 
 
 class TestRequests:
@@ -32,7 +42,7 @@ class TestRequests:
 
         mock_responses = [mock_response1, mock_response2]
         mock_request = mocker.Mock(side_effect=mock_responses)
-        mocker.patch('requests.request', new=mock_request)
+        mocker.patch('requests.Session.request', new=mock_request)
 
         make_requests(self.valid_test_steps, self.operationSchemas, False, False)
 
@@ -54,7 +64,199 @@ class TestRequests:
 
         mock_responses = [mock_response1, mock_response2]
         mock_request = mocker.Mock(side_effect=mock_responses)
-        mocker.patch('requests.request', new=mock_request)
+        mocker.patch('requests.Session.request', new=mock_request)
+
+        results = []
+        with pytest.raises(ValidationError):
+            make_requests(
+                self.valid_test_steps, self.operationSchemas, False, False, results=results
+            )
+
+        assert [result.status for result in results] == ["passed", "failed"]
+        assert results[1].status_code == 200
+        assert results[1].duration >= results[1].timings.phases["response_validation"] > 0
+
+    def test_make_requests_prints_failed_response_when_verbose(self, mocker, capsys):
+        mock_response1 = requests.Response()
+        mock_response1.status_code = 201
+        mock_response1.headers = {}
+        mock_response1._content = b'{"id": 1}'
+
+        mock_response2 = requests.Response()
+        mock_response2.status_code = 200
+        mock_response2.headers = {}
+        # required property age is missing
+        mock_response2._content = b'{"name": {"first": "test", "last": "test"}}'
+
+        mock_request = mocker.Mock(side_effect=[mock_response1, mock_response2])
+        mocker.patch('requests.Session.request', new=mock_request)
 
         with pytest.raises(ValidationError):
-            make_requests(self.valid_test_steps, self.operationSchemas, False, False)
+            make_requests(self.valid_test_steps, self.operationSchemas, False, True)
+
+        output = capsys.readouterr().out
+        failed_step = output[output.index("Step Name: fetchPersonInfoSuccessful"):]
+        assert "---Response---" in failed_step
+        assert "--Response Validation Failed--" in failed_step
+        assert "'age' is a required property" in failed_step
+
+    def test_run_step_request_without_verification(self, mocker):
+        mock_response = requests.Response()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        # required property age is missing, but the schema is not checked
+        mock_response._content = b'{"name": {"first": "test", "last": "test"}}'
+
+        mocker.patch('requests.Session.request', return_value=mock_response)
+
+        steps = {"createPersonSuccessful": {"response": Response(201, {}, {"id": 1})}}
+        report = {"response": None, "messages": [], "error": None}
+        response = run_step_request(
+            self.valid_test_steps["steps"][1],
+            steps,
+            self.valid_test_steps["base_url"],
+            None,
+            self.operationSchemas,
+            report=report,
+            verify=False,
+        )
+
+        assert response.body == {"name": {"first": "test", "last": "test"}}
+        assert report["elapsed"] >= 0
+
+        mock_response.status_code = 404
+        with pytest.raises(ValidationError):
+            run_step_request(
+                self.valid_test_steps["steps"][1],
+                steps,
+                self.valid_test_steps["base_url"],
+                None,
+                self.operationSchemas,
+                verify=False,
+            )
+
+    def test_get_retained_paths(self):
+        templates = {s["name"]: Template(s) for s in self.valid_test_steps["steps"]}
+
+        assert get_retained_paths(templates) == {
+            "createPersonSuccessful": [("response", "body", "id")]
+        }
+
+    def test_retain_response(self):
+        response = Response(
+            201,
+            {"Location": "/person/1", "Content-Length": "100"},
+            {"id": 1, "name": {"first": "test", "last": "test"}, "tags": ["a", "b"]},
+        )
+
+        retained = retain_response(
+            response,
+            [
+                ("response", "body", "id"),
+                ("response", "body", "tags", "1"),
+                ("response", "headers", "Location"),
+            ],
+        )
+        assert retained.status_code == 201
+        assert retained.headers == {"Location": "/person/1"}
+        assert retained.body == {"id": 1, "tags": {"1": "b"}}
+
+        # A step that nothing reads keeps only its status code
+        retained = retain_response(response, [])
+        assert (retained.status_code, retained.headers, retained.body) == (201, {}, None)
+
+        # Reading the whole body keeps all of it
+        retained = retain_response(response, [("response", "body")])
+        assert retained.body is response.body
+
+    def test_run_step_request_records_retained_paths(self, mocker):
+        mock_response = requests.Response()
+        mock_response.status_code = 201
+        mock_response.headers = {"Location": "/person/1"}
+        mock_response._content = b'{"id": 1}'
+
+        mocker.patch('requests.Session.request', return_value=mock_response)
+
+        steps = {}
+        response = run_step_request(
+            self.valid_test_steps["steps"][0],
+            steps,
+            self.valid_test_steps["base_url"],
+            None,
+            self.operationSchemas,
+            retained_paths=[("response", "body", "id")],
+        )
+
+        assert response.headers == {"Location": "/person/1"}
+        recorded = steps["createPersonSuccessful"]["response"]
+        assert (recorded.status_code, recorded.headers, recorded.body) == (
+            201,
+            {},
+            {"id": 1},
+        )
+
+    def test_make_requests_reports_every_failure(self, mocker):
+        steps_data = {
+            "base_url": "http://localhost",
+            "steps": [
+                {"name": "first", "operation_id": "op"},
+                {"name": "second", "operation_id": "op"},
+                {
+                    "name": "dependent",
+                    "operation_id": "op",
+                    "path": "/${{ steps.first.response.body.id }}",
+                },
+                {"name": "independent", "operation_id": "op"},
+            ],
+        }
+
+        def run_step_request(s, steps, *args, **kwargs):
+            if s["name"] in ("first", "second"):
+                raise ValueError(f"{s['name']} failed")
+            steps[s["name"]] = {"response": Response(200, {}, None)}
+            args[4]["response"] = steps[s["name"]]["response"]
+
+        mocker.patch("src.requests.run_step_request", side_effect=run_step_request)
+
+        results = []
+        with pytest.raises(StepFailuresError) as e:
+            make_requests(steps_data, {}, False, False, results=results)
+
+        assert list(e.value.failures) == ["first", "second"]
+        assert [result.status for result in results] == [
+            "failed",
+            "failed",
+            "skipped",
+            "passed",
+        ]
+
+    def test_make_requests_fail_fast_cancels_steps_in_flight(self, mocker):
+        steps_data = {
+            "base_url": "http://localhost",
+            "steps": [
+                {"name": "slow", "operation_id": "op"},
+                {"name": "failing", "operation_id": "op"},
+                {"name": "later", "operation_id": "op"},
+            ],
+        }
+
+        def run_step_request(s, *args, cancelled, **kwargs):
+            if s["name"] == "failing":
+                raise ValueError("failing failed")
+            # Stands in for a request that the cancellation aborts
+            if cancelled.wait(timeout=5):
+                raise StepCancelledError()
+
+        mocker.patch("src.requests.run_step_request", side_effect=run_step_request)
+        transport = mocker.Mock()
+
+        results = []
+        started = time.perf_counter()
+        with pytest.raises(ValueError):
+            make_requests(
+                steps_data, {}, True, False, jobs=2, transport=transport, results=results
+            )
+
+        assert time.perf_counter() - started < 2
+        transport.cancel.assert_called_once()
+        assert [result.status for result in results] == ["skipped", "failed", "skipped"]
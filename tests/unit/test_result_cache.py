@@ -0,0 +1,162 @@
+import os
+
+from hamcrest import assert_that, is_, is_not
+
+from src.catalog import OperationCatalog
+from src.result_cache import *
+from src.scheduler import build_dependency_graph
+
+
+class TestResultCache:
+    """Class for basic unit testing of the result_cache.py module"""
+
+    steps_data = {
+        "base_url": "${{ env.RESULT_CACHE_BASE_URL }}",
+        "steps": [
+            {"name": "create", "operation_id": "createThing", "path": "/things"},
+            {
+                "name": "get",
+                "operation_id": "getThing",
+                "path": "/things/${{ steps.create.response.body.id }}",
+            },
+            {"name": "list", "operation_id": "listThings", "path": "/things"},
+        ],
+    }
+    graph = build_dependency_graph(steps_data["steps"])
+
+    operation_schemas = {
+        "createThing": {"responses": {"201": {"type": "object"}}},
+        "getThing": {"responses": {"200": {"type": "object"}}},
+        "listThings": {"responses": {"200": {"type": "array"}}},
+    }
+
+    def test_resolve_env(self, monkeypatch):
+        monkeypatch.setenv("RESULT_CACHE_TOKEN", "secret")
+
+        assert_that(
+            resolve_env(
+                {
+                    "headers": ["Bearer ${{ env.RESULT_CACHE_TOKEN }}"],
+                    "path": "/${{ steps.create.response.body.id }}",
+                    "missing": "${{ env.RESULT_CACHE_MISSING }}",
+                    "count": 1,
+                }
+            ),
+            is_(
+                {
+                    "headers": ["Bearer secret"],
+                    "path": "/${{ steps.create.response.body.id }}",
+                    "missing": "${{ env.RESULT_CACHE_MISSING }}",
+                    "count": 1,
+                }
+            ),
+        )
+
+    def test_get_step_keys(self, monkeypatch):
+        monkeypatch.setenv("RESULT_CACHE_BASE_URL", "http://localhost:1")
+        keys = get_step_keys(self.steps_data, self.operation_schemas, self.graph)
+
+        assert_that(
+            get_step_keys(self.steps_data, self.operation_schemas, self.graph), is_(keys)
+        )
+
+        # A new schema changes the step of the operation and the steps depending on it
+        schemas = dict(self.operation_schemas)
+        schemas["createThing"] = {"responses": {"200": {"type": "object"}}}
+        changed = get_step_keys(self.steps_data, schemas, self.graph)
+        assert_that(changed["create"], is_not(keys["create"]))
+        assert_that(changed["get"], is_not(keys["get"]))
+        assert_that(changed["list"], is_(keys["list"]))
+
+        # So does the environment the steps read
+        monkeypatch.setenv("RESULT_CACHE_BASE_URL", "http://localhost:2")
+        moved = get_step_keys(self.steps_data, self.operation_schemas, self.graph)
+        assert_that(moved["list"], is_not(keys["list"]))
+
+    def test_get_digest_of_recursive_schema(self):
+        schema = {"type": "object", "properties": {}}
+        schema["properties"]["child"] = schema
+
+        assert_that(
+            to_canonical(schema),
+            is_({"type": "object", "properties": {"child": "$recursive"}}),
+        )
+        assert_that(get_digest(schema), is_(get_digest(to_canonical(schema))))
+
+    def test_get_affected_operations(self):
+        def make_catalog(get_schema: dict) -> OperationCatalog:
+            return OperationCatalog(
+                {
+                    "paths": {
+                        "/things": {
+                            "get": {
+                                "operationId": "listThings",
+                                "responses": {"200": {"description": "OK"}},
+                            }
+                        },
+                        "/things/{id}": {
+                            "get": {
+                                "operationId": "getThing",
+                                "responses": {
+                                    "200": {
+                                        "description": "OK",
+                                        "content": {
+                                            "application/json": {"schema": get_schema}
+                                        },
+                                    }
+                                },
+                            }
+                        },
+                    }
+                }
+            )
+
+        old = make_catalog({"type": "object"})
+        new = make_catalog({"type": "object", "required": ["id"]})
+
+        assert_that(
+            get_affected_operations({"listThings", "getThing"}, old, old), is_(set())
+        )
+        assert_that(
+            get_affected_operations({"listThings", "getThing", "createThing"}, old, new),
+            is_({"getThing"}),
+        )
+
+    def test_get_cached_steps(self, tmp_path):
+        cache_dir = str(tmp_path)
+        keys = {"create": "a", "get": "b", "list": "c"}
+
+        assert_that(get_cached_steps(self.steps_data, self.graph, keys), is_(set()))
+        assert_that(
+            get_cached_steps(self.steps_data, self.graph, keys, cache_dir), is_(set())
+        )
+
+        store_cached_pass(cache_dir, "a", {"name": "create"})
+        store_cached_pass(cache_dir, "c", {"name": "list"})
+        assert_that(has_cached_pass(cache_dir, "a"), is_(True))
+        assert_that(os.listdir(cache_dir), is_not([]))
+
+        # get has to run, and needs create to run for its id
+        assert_that(
+            get_cached_steps(self.steps_data, self.graph, keys, cache_dir), is_({"list"})
+        )
+        # list changed, so it runs even though it passed before
+        assert_that(
+            get_cached_steps(
+                self.steps_data, self.graph, keys, cache_dir, affected={"listThings"}
+            ),
+            is_(set()),
+        )
+
+        store_cached_pass(cache_dir, "b", {"name": "get"})
+        assert_that(
+            get_cached_steps(
+                self.steps_data, self.graph, keys, cache_dir, affected={"listThings"}
+            ),
+            is_({"create", "get"}),
+        )
+        # Without a cache, nothing has passed before, whatever changed
+        assert_that(
+            get_cached_steps(self.steps_data, self.graph, keys, affected=set()),
+            is_(set()),
+        )
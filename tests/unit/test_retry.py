@@ -0,0 +1,59 @@
+import random
+import time
+from email.utils import formatdate
+
+import pytest
+from hamcrest import assert_that, is_, close_to
+
+from src.errors import DeadlineExceededError
+from src.retry import *
+
+
+class TestRetry:
+    """Class for basic unit testing of the retry.py module"""
+
+    def test_from_step(self):
+        assert_that(RetryPolicy.from_step(None), is_(None))
+
+        policy = RetryPolicy.from_step({"attempts": 3, "status_codes": [500]})
+        assert_that(policy.attempts, is_(3))
+        assert_that(policy.status_codes, is_({500}))
+        assert_that(RetryPolicy(2).status_codes, is_(set(DEFAULT_RETRY_STATUS_CODES)))
+
+    def test_delay_is_jittered_and_bounded(self):
+        policy = RetryPolicy(10, backoff=1, max_backoff=5)
+        rng = random.Random(0)
+
+        for attempt in range(1, 10):
+            delays = [policy.delay(attempt, rng=rng) for _ in range(50)]
+            assert max(delays) <= min(5, 2 ** (attempt - 1))
+            assert len(set(delays)) > 1
+
+    def test_delay_honors_retry_after(self):
+        assert_that(RetryPolicy(2, max_backoff=60).delay(1, "30"), is_(30.0))
+
+    def test_delay_caps_retry_after(self):
+        policy = RetryPolicy(2, max_backoff=10)
+
+        assert_that(policy.delay(1, "3600"), is_(10.0))
+        assert_that(
+            policy.delay(1, formatdate(time.time() + 3600, usegmt=True)), is_(10.0)
+        )
+
+    def test_parse_retry_after(self):
+        assert_that(parse_retry_after(None), is_(None))
+        assert_that(parse_retry_after("120"), is_(120.0))
+        assert_that(parse_retry_after("soon"), is_(None))
+        assert_that(
+            parse_retry_after(formatdate(time.time() + 60, usegmt=True)),
+            close_to(60, 2),
+        )
+        assert_that(
+            parse_retry_after(formatdate(time.time() - 60, usegmt=True)), is_(0.0)
+        )
+
+    def test_remaining(self):
+        assert_that(remaining(None), is_(None))
+        assert_that(remaining(time.monotonic() + 10), close_to(10, 1))
+        with pytest.raises(DeadlineExceededError):
+            remaining(time.monotonic() - 1)
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+from hamcrest import assert_that, is_
+
+from src.errors import EvaluationError, SkippedStepError
+from src.scheduler import *
+
+
+class TestScheduler:
+    """Class for basic unit testing of the scheduler.py module"""
+
+    steps = [
+        {"name": "first", "path": "/first"},
+        {"name": "second", "path": "/second"},
+        {
+            "name": "third",
+            "path": "/things/${{ steps.first.response.body.id }}",
+            "body": {"other": ["${{ steps.second.response.body.id }}"]},
+        },
+    ]
+
+    def test_get_step_references(self):
+        assert_that(get_step_references(self.steps[0]), is_(set()))
+        assert_that(get_step_references(self.steps[2]), is_({"first", "second"}))
+        assert_that(get_step_references("${{ env.SOME_VAR }}"), is_(set()))
+
+    def test_build_dependency_graph(self):
+        graph = build_dependency_graph(self.steps)
+        assert_that(
+            graph, is_({"first": set(), "second": set(), "third": {"first", "second"}})
+        )
+
+    def test_build_dependency_graph_with_forward_reference(self):
+        with pytest.raises(EvaluationError):
+            build_dependency_graph(list(reversed(self.steps)))
+
+    def test_build_dependency_graph_with_dataset_reference(self):
+        steps = [{**self.steps[0], "foreach": {"dataset": "rows.csv"}}] + self.steps[1:]
+        with pytest.raises(EvaluationError):
+            build_dependency_graph(steps)
+
+    def test_run_steps_sequentially(self):
+        order = []
+        results = run_steps(
+            self.steps,
+            build_dependency_graph(self.steps),
+            lambda step: order.append(step["name"]) or step["name"],
+        )
+        assert_that([result for _, result in results], is_(["first", "second", "third"]))
+        assert_that(order, is_(["first", "second", "third"]))
+
+    def test_run_steps_concurrently_in_file_order(self):
+        finished = []
+        lock = threading.Lock()
+        second_finished = threading.Event()
+
+        def run_step(step):
+            # The first step can only finish after the second one has
+            if step["name"] == "first":
+                assert second_finished.wait(timeout=5)
+            with lock:
+                finished.append(step["name"])
+            if step["name"] == "second":
+                second_finished.set()
+            return step["name"]
+
+        results = list(
+            run_steps(self.steps, build_dependency_graph(self.steps), run_step, jobs=3)
+        )
+
+        assert_that([result for _, result in results], is_(["first", "second", "third"]))
+        assert_that(finished, is_(["second", "first", "third"]))
+
+    def test_run_steps_reraises_first_failure_in_file_order(self):
+        def run_step(step):
+            if step["name"] == "second":
+                raise ValueError("second failed")
+            return step["name"]
+
+        results = run_steps(
+            self.steps, build_dependency_graph(self.steps), run_step, jobs=2
+        )
+        assert_that(next(results)[1], is_("first"))
+        with pytest.raises(ValueError):
+            next(results)
+
+    def test_run_steps_stops_starting_steps_after_failure(self):
+        steps = [{"name": "slow"}, {"name": "failing"}, {"name": "independent"}]
+        started = []
+
+        def run_step(step):
+            started.append(step["name"])
+            if step["name"] == "slow":
+                # Still in flight when the failure is seen
+                time.sleep(0.2)
+            if step["name"] == "failing":
+                raise ValueError("failing failed")
+            return step["name"]
+
+        results = run_steps(steps, build_dependency_graph(steps), run_step, jobs=2)
+        assert_that(next(results)[1], is_("slow"))
+        with pytest.raises(ValueError):
+            next(results)
+        assert_that(sorted(started), is_(["failing", "slow"]))
+
+    def test_run_steps_without_fail_fast_skips_dependents(self):
+        steps = self.steps + [{"name": "fourth", "path": "${{ steps.third.response.body.id }}"}]
+
+        def run_step(step):
+            if step["name"] == "first":
+                raise ValueError("first failed")
+            return step["name"]
+
+        for jobs in (1, 3):
+            results = list(
+                run_steps(
+                    steps, build_dependency_graph(steps), run_step, jobs, fail_fast=False
+                )
+            )
+
+            outcomes = [outcome for _, outcome in results]
+            assert_that(isinstance(outcomes[0], ValueError), is_(True))
+            assert_that(outcomes[1], is_("second"))
+            assert_that(outcomes[2].dependencies, is_({"first"}))
+            assert_that(outcomes[3].dependencies, is_({"third"}))
+            assert_that(
+                [isinstance(outcome, SkippedStepError) for outcome in outcomes],
+                is_([False, False, True, True]),
+            )
@@ -0,0 +1,134 @@
+import threading
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import requests
+from hamcrest import assert_that, is_, is_not, same_instance
+
+from src.sessions import SessionRegistry
+from src.transport import get_transport
+
+
+class TimeoutHandler(BaseHTTPRequestHandler):
+    """Handler that gives up on idle connections so a leaked socket cannot hang the test"""
+
+    timeout = 1
+
+
+class TestSessions:
+    """Class for basic unit testing of the sessions.py module"""
+
+    def test_get_reuses_session_per_host(self):
+        registry = SessionRegistry()
+
+        session = registry.get("https://api.test.com/api/v1/test")
+        assert_that(registry.get("https://API.test.com/other"), same_instance(session))
+        assert_that(registry.get("http://api.test.com/"), is_not(same_instance(session)))
+        assert_that(
+            registry.get("https://other.test.com/"), is_not(same_instance(session))
+        )
+
+        registry.close()
+
+    def test_pool_size(self):
+        registry = SessionRegistry(pool_connections=2, pool_maxsize=5)
+        adapter = registry.get("https://api.test.com").get_adapter("https://api.test.com")
+
+        assert_that(adapter._pool_connections, is_(2))
+        assert_that(adapter._pool_maxsize, is_(5))
+
+    def test_get_transport_pool_size(self):
+        registry = get_transport(pool_size=3)
+        adapter = registry.get("https://api.test.com").get_adapter("https://api.test.com")
+
+        assert_that(adapter._pool_connections, is_(3))
+        assert_that(adapter._pool_maxsize, is_(3))
+
+    def test_timeout(self):
+        assert_that(SessionRegistry().timeout, is_(None))
+        assert_that(
+            SessionRegistry(connect_timeout=1.5, read_timeout=10).timeout, is_((1.5, 10))
+        )
+
+    def test_warm_opens_pooled_connection(self):
+        requests_seen = []
+
+        class KeepAliveHandler(TimeoutHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self):
+                requests_seen.append((self.command, self.client_address))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            do_GET = do_HEAD
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        url = f"http://127.0.0.1:{server.server_port}"
+        registry = SessionRegistry(connect_timeout=1, read_timeout=1)
+        registry.warm([url, url + "/path"])
+        registry.get(url).get(url + "/path")
+
+        # One HEAD per host, and the first step reuses its connection
+        assert_that([command for command, _ in requests_seen], is_(["HEAD", "GET"]))
+        assert_that(requests_seen[0][1], is_(requests_seen[1][1]))
+
+        registry.close()
+        server.shutdown()
+        server.server_close()
+
+    def test_warm_ignores_unreachable_hosts(self):
+        registry = SessionRegistry(connect_timeout=0.5)
+        registry.warm(["http://127.0.0.1:1", "not a url"])
+        registry.close()
+
+    def test_cancel_aborts_requests_in_flight(self):
+        received = threading.Event()
+
+        class StallingHandler(TimeoutHandler):
+            timeout = 5
+
+            def do_GET(self):
+                received.set()
+                # Never answer; the client has to give up on its own
+                self.rfile.read(1)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), StallingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        registry = SessionRegistry()
+        errors = []
+
+        def send():
+            try:
+                registry.get(url).get(url)
+            except requests.ConnectionError as e:
+                errors.append(e)
+
+        url = f"http://127.0.0.1:{server.server_port}/stall"
+        client = threading.Thread(target=send)
+        client.start()
+        assert_that(received.wait(timeout=5), is_(True))
+
+        started = time.perf_counter()
+        registry.cancel()
+        client.join(timeout=5)
+
+        assert_that(client.is_alive(), is_(False))
+        assert_that(time.perf_counter() - started < 2, is_(True))
+        assert_that(len(errors), is_(1))
+
+        registry.close()
+        server.shutdown()
+        server.server_close()
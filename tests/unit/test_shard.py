@@ -0,0 +1,121 @@
+import json
+
+import pytest
+from hamcrest import assert_that, is_, contains_string
+
+from src.errors import ShardMergeError
+from src.models import StepResult
+from src.shard import *
+
+
+def get_steps(*names: str) -> dict:
+    return {"steps": [{"name": name} for name in names]}
+
+
+class TestShard:
+    """Class for basic unit testing of the shard.py module"""
+
+    step_files = {
+        "a.yml": get_steps("create", "get", "list", "delete"),
+        "b.yml": get_steps("one", "two", "three"),
+    }
+    graphs = {
+        "a.yml": {
+            "create": set(),
+            "get": {"create"},
+            "list": set(),
+            "delete": {"create"},
+        },
+        "b.yml": {"one": set(), "two": set(), "three": set()},
+    }
+
+    def test_parse_shard(self):
+        assert_that(parse_shard("2/4"), is_((2, 4)))
+
+        for value in ("2", "0/4", "5/4", "a/b"):
+            with pytest.raises(ValueError):
+                parse_shard(value)
+
+    def test_get_components(self):
+        components = get_components(
+            self.step_files["a.yml"]["steps"], self.graphs["a.yml"]
+        )
+
+        assert_that(components, is_([["create", "get", "delete"], ["list"]]))
+
+    def test_select_shard(self):
+        shards = [select_shard(self.step_files, self.graphs, i, 3) for i in (1, 2, 3)]
+
+        # The steps that depend on each other stay together, the rest are spread out
+        assert_that(
+            shards,
+            is_(
+                [
+                    {"a.yml": {"create", "get", "delete"}},
+                    {"a.yml": {"list"}, "b.yml": {"two"}},
+                    {"b.yml": {"one", "three"}},
+                ]
+            ),
+        )
+
+    def write_shard(self, tmp_path, index: int, count: int, results: list) -> str:
+        path = str(tmp_path / f"shard{index}.json")
+        shard_result = build_shard_result(
+            (index, count),
+            {"a.yml": ["create", "get", "list"]},
+            results,
+            {"a.yml": "get failed"} if results[0].status == "failed" else {},
+            {"createThing", "getThing", "listThings", "deleteThing"},
+            0.5,
+        )
+        write_shard_result(shard_result, path)
+        return path
+
+    def test_merge_shard_results(self, tmp_path):
+        paths = [
+            self.write_shard(
+                tmp_path,
+                2,
+                2,
+                [StepResult("list", "listThings", "passed", step_file="a.yml")],
+            ),
+            self.write_shard(
+                tmp_path,
+                1,
+                2,
+                [
+                    StepResult("get", "getThing", "failed", step_file="a.yml"),
+                    StepResult("create", "createThing", "passed", step_file="a.yml"),
+                ],
+            ),
+        ]
+
+        merged = merge_shard_results(load_shard_results(paths))
+        assert_that(
+            [result.name for result in merged["results"]],
+            is_(["create", "get", "list"]),
+        )
+        assert_that(merged["covered"], is_({"createThing", "getThing", "listThings"}))
+        assert_that(len(merged["operations"]), is_(4))
+        assert_that(merged["failures"], is_({"a.yml": "get failed"}))
+        assert_that(merged["coverage_threshold"], is_(0.5))
+
+    def test_load_shard_results_needs_every_shard(self, tmp_path):
+        result = [StepResult("list", "listThings", "passed", step_file="a.yml")]
+        first = self.write_shard(tmp_path, 1, 3, result)
+        third = self.write_shard(tmp_path, 3, 3, result)
+
+        with pytest.raises(ShardMergeError) as error:
+            load_shard_results([first, third])
+        assert_that(str(error.value), contains_string("missing: [2]"))
+
+        with pytest.raises(ShardMergeError):
+            load_shard_results([first, first, third])
+
+        with open(third) as result_file:
+            shard_result = json.load(result_file)
+        shard_result["shard"] = [2, 2]
+        write_shard_result(shard_result, third)
+        with pytest.raises(ShardMergeError) as error:
+            load_shard_results([first, third])
+        assert_that(str(error.value), contains_string("numbers of shards"))
@@ -0,0 +1,37 @@
+import datetime
+import json
+
+from hamcrest import assert_that, is_, same_instance
+
+from src.shared_json import *
+
+
+def get_recursive_schemas() -> dict:
+    # What a resolved spec looks like when a schema references itself
+    person = {"type": "object", "properties": {"name": {"type": "string"}}}
+    person["properties"]["friends"] = {"type": "array", "items": person}
+    return {"getPerson": {"responses": {"200": person, "201": person}}}
+
+
+class TestSharedJson:
+    """Class for basic unit testing of the shared_json.py module"""
+
+    def test_encode_shared(self):
+        encoded, definitions = encode_shared(get_recursive_schemas())
+
+        # Survives JSON, and the shared schema is only stored once
+        encoded, definitions = json.loads(json.dumps([encoded, definitions]))
+        assert_that(len(definitions), is_(1))
+        assert_that(encoded["getPerson"]["responses"]["200"], is_({DEF_KEY: 0}))
+
+        decoded = decode_shared(encoded, definitions)
+        person = decoded["getPerson"]["responses"]["200"]
+        assert_that(decoded["getPerson"]["responses"]["201"], same_instance(person))
+        assert_that(person["properties"]["friends"]["items"], same_instance(person))
+
+    def test_encode_shared_plain_values(self):
+        value = {"a": [1, "b", None], "when": datetime.date(2024, 1, 1)}
+
+        encoded, definitions = encode_shared(value)
+        assert_that(definitions, is_([]))
+        assert_that(encoded, is_({"a": [1, "b", None], "when": "2024-01-01"}))
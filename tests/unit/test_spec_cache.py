@@ -0,0 +1,117 @@
+import json
+
+import pytest
+from hamcrest import assert_that, is_, is_not, contains_exactly, same_instance
+from openapi_spec_validator.exceptions import OpenAPISpecValidatorError
+
+from src.parsing import load_spec_file
+from src.spec_cache import *
+
+
+ROOT_SPEC = """
+openapi: 3.1.0
+info:
+  title: Example OpenAPI Spec
+  version: 1.0.0
+paths:
+  /person:
+    get:
+      operationId: getPerson
+      responses:
+        "200":
+          description: Successful response
+          content:
+            "application/json":
+              schema:
+                $ref: "./schemas/person.yml#/person"
+"""
+
+PERSON_SCHEMA = """
+person:
+  type: object
+  properties:
+    name:
+      $ref: "name.yml"
+"""
+
+
+class TestSpecCache:
+    """Class for basic unit testing of the spec_cache.py module"""
+
+    valid_spec_file_path = "./tests/fixtures/valid/specs/person_api.yml"
+    invalid_spec_file_path = "./tests/fixtures/invalid/specs/invalid_spec_1.yml"
+
+    @pytest.fixture
+    def spec_path(self, tmp_path):
+        (tmp_path / "schemas").mkdir()
+        (tmp_path / "spec.yml").write_text(ROOT_SPEC)
+        (tmp_path / "schemas" / "person.yml").write_text(PERSON_SCHEMA)
+        (tmp_path / "schemas" / "name.yml").write_text("type: string\n")
+        return tmp_path / "spec.yml"
+
+    def test_get_referenced_files(self, spec_path):
+        assert_that(
+            get_referenced_files(str(spec_path)),
+            contains_exactly(
+                str(spec_path.parent / "schemas" / "name.yml"),
+                str(spec_path.parent / "schemas" / "person.yml"),
+                str(spec_path),
+            ),
+        )
+
+    def test_cache_key_changes_with_referenced_file(self, spec_path):
+        key = get_cache_key(str(spec_path))
+        assert_that(get_cache_key(str(spec_path)), is_(key))
+
+        (spec_path.parent / "schemas" / "name.yml").write_text("type: integer\n")
+        assert_that(get_cache_key(str(spec_path)), is_not(key))
+
+    def test_load_spec_file_uses_cache(self, tmp_path, mocker):
+        spec = load_spec_file(self.valid_spec_file_path, str(tmp_path))
+
+        mocker.patch("src.parsing.materialize", side_effect=AssertionError)
+        mocker.patch("src.parsing.validate_spec", side_effect=AssertionError)
+        assert_that(load_spec_file(self.valid_spec_file_path, str(tmp_path)), is_(spec))
+
+    def test_load_spec_file_caches_validation_error(self, tmp_path, mocker):
+        with pytest.raises(OpenAPISpecValidatorError):
+            load_spec_file(self.invalid_spec_file_path, str(tmp_path))
+
+        mocker.patch("src.parsing.materialize", side_effect=AssertionError)
+        with pytest.raises(OpenAPISpecValidatorError):
+            load_spec_file(self.invalid_spec_file_path, str(tmp_path))
+
+    def test_load_cached_spec_missing_entry(self, tmp_path):
+        assert_that(load_cached_spec(str(tmp_path), "missing"), is_(None))
+
+    def test_get_referenced_files_skips_missing_files(self, spec_path):
+        spec_path.write_text(
+            ROOT_SPEC.replace(
+                "info:\n", "info:\n  description: 'Use $ref: ./missing.yml to share'\n"
+            )
+        )
+
+        assert_that(len(get_referenced_files(str(spec_path))), is_(3))
+        assert_that(get_cache_key(str(spec_path)), is_not(None))
+
+    def test_store_and_load_recursive_spec(self, tmp_path):
+        person = {"type": "object", "properties": {}}
+        person["properties"]["friends"] = {"type": "array", "items": person}
+        spec = {"components": {"schemas": {"Person": person, "Other": person}}}
+
+        entry = {"spec": spec, "error": None, "kind": None}
+        store_cached_spec(str(tmp_path), "key", entry)
+        with open(tmp_path / "key.json") as cache_file:
+            json.load(cache_file)
+
+        entry = load_cached_spec(str(tmp_path), "key")
+        schemas = entry["spec"]["components"]["schemas"]
+        assert_that(schemas["Other"], same_instance(schemas["Person"]))
+        assert_that(
+            schemas["Person"]["properties"]["friends"]["items"],
+            same_instance(schemas["Person"]),
+        )
+
+    def test_load_cached_spec_corrupt_entry(self, tmp_path):
+        (tmp_path / "key.json").write_text("{not json")
+        assert_that(load_cached_spec(str(tmp_path), "key"), is_(None))
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from hamcrest import assert_that, is_
+from jsonschema import ValidationError
+
+from src.models import Response
+from src.streaming import *
+from src.verify import compile_validator, verify_streamed_response
+
+
+class TestStreaming:
+    """Class for basic unit testing of the streaming.py module"""
+
+    items = [{"id": 1, "name": "ü"}, {"id": 22, "tags": ["a", "b"]}, 333, "x", None]
+    body = json.dumps(items).encode("utf-8")
+
+    schema = {
+        "type": "array",
+        "items": {"type": "object", "properties": {"id": {"type": "integer"}}},
+        "maxItems": 3,
+    }
+
+    def test_iter_json_array_across_chunk_boundaries(self):
+        for size in (1, 2, 7, len(self.body)):
+            chunks = [self.body[i : i + size] for i in range(0, len(self.body), size)]
+            assert_that(list(iter_json_array(chunks)), is_(self.items))
+
+        assert_that(list(iter_json_array([b" [ ] "])), is_([]))
+
+    def test_iter_json_array_with_invalid_json(self):
+        for body in (b'{"id": 1}', b"[1, 2", b"[1 2]", b"[1]]"):
+            with pytest.raises(json.decoder.JSONDecodeError):
+                list(iter_json_array([body]))
+
+    def test_project(self):
+        value = {"id": 1, "name": {"first": "a", "last": "b"}, "pets": [{"id": 2}, {"id": 3}]}
+
+        assert_that(project(value, [()]), is_(value))
+        assert_that(project(value, []), is_({}))
+        assert_that(
+            project(value, [("name", "first"), ("pets", "1", "id"), ("missing",)]),
+            is_({"name": {"first": "a"}, "pets": {"1": {"id": 3}}}),
+        )
+
+    def test_verify_streamed_response_keeps_referenced_items(self):
+        chunks = iter([b'[{"id": 1, "extra": true}, ', b'{"id": 2}]'])
+        response = Response(200, {}, chunks)
+
+        verify_streamed_response(
+            response, 200, self.schema, compile_validator(self.schema["items"]), [("1", "id")]
+        )
+        assert_that(response.body, is_({"1": {"id": 2}}))
+
+    def test_verify_streamed_response_fails_on_first_invalid_item(self):
+        consumed = []
+
+        def chunks():
+            for chunk in (b'[{"id": "1"}, ', b'{"id": 2}]'):
+                consumed.append(chunk)
+                yield chunk
+
+        response = Response(200, {}, chunks())
+        with pytest.raises(ValidationError):
+            verify_streamed_response(
+                response, 200, self.schema, compile_validator(self.schema["items"]), []
+            )
+        assert_that(len(consumed), is_(1))
+        assert_that(response.body, is_(None))
+
+    def test_verify_streamed_response_checks_item_count(self):
+        response = Response(200, {}, iter([b"[{}, {}, {}, {}]"]))
+        with pytest.raises(ValidationError):
+            verify_streamed_response(
+                response, 200, self.schema, compile_validator(self.schema["items"]), []
+            )
+
+    def test_verify_streamed_response_without_array_schema(self):
+        schema = {"type": "object", "required": ["id"]}
+        response = Response(200, {}, iter([b'{"id": 1,', b' "name": "a"}']))
+
+        verify_streamed_response(response, 200, schema, None, [("id",)])
+        assert_that(response.body, is_({"id": 1}))
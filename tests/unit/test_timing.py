@@ -0,0 +1,109 @@
+import socket
+import threading
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+from hamcrest import assert_that, is_, greater_than
+
+from src.models import Request
+from src.sessions import SessionRegistry
+from src.timing import *
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler that waits before answering so time-to-first-byte is measurable"""
+
+    protocol_version = "HTTP/1.1"
+    timeout = 1
+
+    def do_GET(self):
+        time.sleep(0.02)
+        body = b'{"id": 1}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTiming:
+    """Class for basic unit testing of the timing.py module"""
+
+    def test_measure(self):
+        timings = StepTimings()
+        with timings.measure("eval"):
+            time.sleep(0.01)
+        timings.add("dns", 0.5)
+
+        assert_that(timings.phases["eval"], greater_than(0.009))
+        assert_that(timings.setup, is_(0.5))
+        assert_that(list(timings.to_dict()), is_(PHASES))
+
+    def test_collect_timings(self):
+        assert_that(current_timings(), is_(None))
+        with collect_timings(StepTimings()) as timings:
+            assert_that(current_timings(), is_(timings))
+        assert_that(current_timings(), is_(None))
+
+    def test_request_phases(self):
+        server = HTTPServer(("127.0.0.1", 0), SlowHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        registry = SessionRegistry(connect_timeout=1, read_timeout=1)
+        request = Request(
+            f"http://localhost:{server.server_port}", "GET", "/", {}, {}, None, None,
+            None, registry,
+        )
+        try:
+            with collect_timings(StepTimings()) as first:
+                assert_that(request.send().body, is_('{"id": 1}'))
+            with collect_timings(StepTimings()) as second:
+                request.send()
+        finally:
+            registry.close()
+            server.shutdown()
+            server.server_close()
+
+        assert_that(first.phases["dns"], greater_than(0))
+        assert_that(first.phases["connect"], greater_than(0))
+        assert_that(first.phases["tls"], is_(0.0))
+        assert_that(first.phases["ttfb"], greater_than(0.019))
+        # The pooled connection is reused
+        assert_that(second.setup, is_(0.0))
+        assert_that(second.phases["ttfb"], greater_than(0.019))
+
+    def test_connect_tries_every_address(self, mocker):
+        server = HTTPServer(("127.0.0.1", 0), SlowHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def resolve(*addresses: str):
+            port = server.server_port
+            return [
+                (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))
+                for address in addresses
+            ]
+
+        # Nothing listens on 127.0.0.2, so the first address refuses the connection
+        getaddrinfo = mocker.patch("src.timing.socket.getaddrinfo")
+        getaddrinfo.return_value = resolve("127.0.0.2", "127.0.0.1")
+        registry = SessionRegistry(connect_timeout=1, read_timeout=1)
+        url = f"http://api.test:{server.server_port}/"
+        try:
+            with collect_timings(StepTimings()):
+                assert_that(registry.get(url).get(url).status_code, is_(200))
+
+            registry.close()
+            getaddrinfo.return_value = resolve("127.0.0.2", "127.0.0.3")
+            with collect_timings(StepTimings()):
+                with pytest.raises(requests.ConnectionError):
+                    registry.get(url).get(url)
+        finally:
+            registry.close()
+            server.shutdown()
+            server.server_close()
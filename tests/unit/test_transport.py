@@ -0,0 +1,151 @@
+import json
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+from hamcrest import assert_that, is_, instance_of, has_entries
+
+from src.sessions import SessionRegistry
+from src.timing import StepTimings, collect_timings
+from src.transport import Transport, get_transport
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Replies with the request it got, with repeated and mixed case headers"""
+
+    protocol_version = "HTTP/1.1"
+    timeout = 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.dumps(
+            {
+                "path": self.path,
+                "body": self.rfile.read(length).decode("utf-8"),
+                "authorization": self.headers.get("Authorization"),
+                "content_type": self.headers.get("Content-Type"),
+            }
+        ).encode("utf-8")
+
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-Request-ID", "abc")
+        self.send_header("Set-Cookie", "a=1")
+        self.send_header("Set-Cookie", "b=2")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = HTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def send(transport, url: str, body, stream: bool = False):
+    return transport.send(
+        "POST",
+        url + "/echo",
+        params={"q": "1"},
+        headers={"X-Test": "yes"},
+        auth=("user", "pass"),
+        body=body,
+        stream=stream,
+    )
+
+
+class TestTransport:
+    """Class for basic unit testing of the transport.py module"""
+
+    def test_get_transport(self):
+        transport = get_transport(pool_size=3, connect_timeout=1, read_timeout=2)
+
+        assert_that(transport, instance_of(SessionRegistry))
+        assert_that(transport.timeout, is_((1, 2)))
+
+    def test_transport_needs_send(self):
+        class Incomplete(Transport):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_http2_needs_httpx(self):
+        with pytest.raises(ValueError):
+            get_transport("requests", http2=True)
+        with pytest.raises(ValueError):
+            get_transport("requests", uds="/tmp/api.sock")
+
+    @pytest.mark.parametrize("body", [{"name": "pony"}, "plain text"])
+    def test_transports_return_the_same_response(self, server_url, body):
+        pytest.importorskip("httpx")
+
+        responses = []
+        for name in ("requests", "httpx"):
+            transport = get_transport(name)
+            try:
+                responses.append(send(transport, server_url, body))
+            finally:
+                transport.close()
+
+        from_requests, from_httpx = responses
+        assert_that(from_httpx.status_code, is_(201))
+        assert_that(from_httpx.status_code, is_(from_requests.status_code))
+        assert_that(from_httpx.body, is_(from_requests.body))
+        assert_that(
+            from_httpx.headers,
+            has_entries(
+                {
+                    "Content-Type": "application/json",
+                    "X-Request-ID": "abc",
+                    "Set-Cookie": "a=1, b=2",
+                }
+            ),
+        )
+        # Date and Server are the only headers the server varies
+        for header in ("Date", "Server"):
+            from_requests.headers.pop(header)
+            from_httpx.headers.pop(header)
+        assert_that(from_httpx.headers, is_(from_requests.headers))
+        assert_that(
+            json.loads(from_httpx.body)["authorization"], is_("Basic dXNlcjpwYXNz")
+        )
+
+    def test_httpx_streams_and_times(self, server_url):
+        pytest.importorskip("httpx")
+
+        transport = get_transport("httpx")
+        try:
+            with collect_timings(StepTimings()) as timings:
+                response = send(transport, server_url, {"name": "pony"}, stream=True)
+                body = b"".join(response.body)
+        finally:
+            transport.close()
+
+        assert_that(json.loads(body)["path"], is_("/echo?q=1"))
+        assert_that(timings.phases["connect"] > 0, is_(True))
+        assert_that(timings.phases["ttfb"] > 0, is_(True))
+
+    def test_httpx_raises_requests_errors(self):
+        pytest.importorskip("httpx")
+
+        # Nothing listens on the port of a server that was just closed
+        server = HTTPServer(("127.0.0.1", 0), EchoHandler)
+        url = f"http://127.0.0.1:{server.server_port}"
+        server.server_close()
+
+        transport = get_transport("httpx")
+        try:
+            with pytest.raises(requests.ConnectionError):
+                send(transport, url, None)
+        finally:
+            transport.close()
@@ -1,6 +1,18 @@
+import json
+import os
+
 import pytest
+import yaml
 from hamcrest import assert_that, is_, has_items, instance_of
 
+from benchmarks.generate import generate_spec, generate_steps, resolve_refs
+from src.errors import (
+    DatasetFailuresError,
+    FuzzFailuresError,
+    InsufficientCoverageError,
+    StepFileFailuresError,
+)
+from src.mock import MockServer
 from src.validate import *
 
 
@@ -13,3 +25,282 @@ class TestValidate:
     @pytest.mark.skip(reason="Need to test against a mock API")
     def test_validate(self):
         validate(self.steps_file_path, self.spec_file_path, False, False)
+
+    def test_expand_step_files(self):
+        assert_that(
+            expand_step_files(
+                ["./tests/fixtures/valid/steps/*.yml", self.steps_file_path, "missing.yml"]
+            ),
+            is_([self.steps_file_path, "missing.yml"]),
+        )
+        assert_that(expand_step_files("missing.yml"), is_(["missing.yml"]))
+
+    def test_validate_batch(self, tmp_path):
+        spec = generate_spec(4)
+        (tmp_path / "spec").mkdir()
+        spec_path = str(tmp_path / "spec" / "spec.yml")
+        with open(spec_path, "w") as spec_file:
+            yaml.safe_dump(spec, spec_file)
+
+        with MockServer(resolve_refs(spec)) as server:
+            steps = generate_steps(spec, server.url, 2)
+            for name in ("a", "b"):
+                with open(tmp_path / f"{name}.yml", "w") as steps_file:
+                    yaml.safe_dump(steps, steps_file)
+
+            # The mock answers 200, not 404
+            steps["steps"][1]["status_code"] = 404
+            with open(tmp_path / "c.yml", "w") as steps_file:
+                yaml.safe_dump(steps, steps_file)
+
+            report_path = str(tmp_path / "report.jsonl")
+            with pytest.raises(StepFileFailuresError) as error:
+                validate(
+                    [str(tmp_path / "*.yml"), str(tmp_path / "missing.yml")],
+                    spec_path,
+                    report_json=report_path,
+                    workers=2,
+                )
+
+        failures = error.value.failures
+        assert_that(
+            list(failures), is_([str(tmp_path / "c.yml"), str(tmp_path / "missing.yml")])
+        )
+        assert_that(
+            failures[str(tmp_path / "missing.yml")], instance_of(FileNotFoundError)
+        )
+
+        with open(report_path) as report_file:
+            results = [json.loads(line) for line in report_file]
+        assert_that(len(results), is_(12))
+        assert_that(
+            [(result["step_file"][-5:], result["status"]) for result in results[8:10]],
+            is_([("c.yml", "passed"), ("c.yml", "failed")]),
+        )
+
+    def test_validate_incremental(self, tmp_path):
+        spec = generate_spec(4)
+        (tmp_path / "spec").mkdir()
+        old_spec_path = str(tmp_path / "spec" / "old.yml")
+        with open(old_spec_path, "w") as spec_file:
+            yaml.safe_dump(spec, spec_file)
+
+        cache_dir = str(tmp_path / "results")
+        with MockServer(resolve_refs(spec)) as server:
+            steps_path = str(tmp_path / "steps.yml")
+            with open(steps_path, "w") as steps_file:
+                yaml.safe_dump(generate_steps(spec, server.url, 2), steps_file)
+
+            results = validate(steps_path, old_spec_path, result_cache_dir=cache_dir)
+            assert_that([result.cached for result in results], is_([False] * 4))
+
+            # Nothing changed, so every step is a cached pass
+            results = validate(steps_path, old_spec_path, result_cache_dir=cache_dir)
+            assert_that([result.cached for result in results], is_([True] * 4))
+            assert_that({result.status for result in results}, is_({"passed"}))
+
+            results = validate(
+                steps_path, old_spec_path, result_cache_dir=cache_dir, full_run=True
+            )
+            assert_that([result.cached for result in results], is_([False] * 4))
+
+            # Only getResource1 changes, which needs create1 for its id
+            spec["paths"]["/resources1/{id}"]["get"]["responses"]["200"]["content"][
+                "application/json"
+            ]["schema"] = {"type": "object"}
+            spec_path = str(tmp_path / "spec" / "new.yml")
+            with open(spec_path, "w") as spec_file:
+                yaml.safe_dump(spec, spec_file)
+
+            results = validate(
+                steps_path, spec_path, result_cache_dir=cache_dir, since=old_spec_path
+            )
+            assert_that(
+                [(result.name, result.cached) for result in results],
+                is_(
+                    [
+                        ("create0", True),
+                        ("get0", True),
+                        ("create1", False),
+                        ("get1", False),
+                    ]
+                ),
+            )
+
+            # A new step of an operation that did not change has no pass to reuse
+            steps = generate_steps(spec, server.url, 2)
+            steps["steps"].append({**steps["steps"][1], "name": "getAgain0"})
+            with open(steps_path, "w") as steps_file:
+                yaml.safe_dump(steps, steps_file)
+            results = validate(
+                steps_path, spec_path, result_cache_dir=cache_dir, since=old_spec_path
+            )
+            assert_that(
+                [(result.name, result.cached) for result in results][-1],
+                is_(("getAgain0", False)),
+            )
+
+            with pytest.raises(ValueError):
+                validate(steps_path, spec_path, since=old_spec_path)
+
+    def test_validate_record_replay(self, tmp_path):
+        spec = generate_spec(4)
+        (tmp_path / "spec").mkdir()
+        spec_path = str(tmp_path / "spec" / "spec.yml")
+        with open(spec_path, "w") as spec_file:
+            yaml.safe_dump(spec, spec_file)
+
+        cassette_path = str(tmp_path / "cassette.jsonl")
+        steps_path = str(tmp_path / "steps.yml")
+        with MockServer(resolve_refs(spec)) as server:
+            with open(steps_path, "w") as steps_file:
+                yaml.safe_dump(generate_steps(spec, server.url, 2), steps_file)
+            recorded = validate(steps_path, spec_path, record=cassette_path)
+
+        # The server is gone, so every response comes from the cassette
+        replayed = validate(steps_path, spec_path, replay=cassette_path)
+        assert_that(
+            [(result.name, result.status) for result in replayed],
+            is_([(result.name, result.status) for result in recorded]),
+        )
+        assert_that({result.status for result in replayed}, is_({"passed"}))
+
+        with pytest.raises(ValueError):
+            validate(steps_path, spec_path, record=cassette_path, replay=cassette_path)
+
+    def test_validate_plan(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        spec = generate_spec(4)
+        with open("spec.yml", "w") as spec_file:
+            yaml.safe_dump(spec, spec_file)
+
+        with MockServer(resolve_refs(spec)) as server:
+            with open("steps.yml", "w") as steps_file:
+                yaml.safe_dump(generate_steps(spec, server.url, 2), steps_file)
+            plan = compile_plan("steps.yml", "spec.yml", "plan.json")
+            assert_that(len(plan["files"][0]["graph"]), is_(4))
+
+            # A runner with only the plan never reads the steps file or the spec
+            os.remove("steps.yml")
+            os.remove("spec.yml")
+            results = validate(None, None, plan="plan.json")
+
+        assert_that([result.status for result in results], is_(["passed"] * 4))
+        assert_that({result.step_file for result in results}, is_({"steps.yml"}))
+
+        with pytest.raises(ValueError):
+            validate(None, None, plan="plan.json", since="spec.yml")
+
+    def test_validate_dataset(self, tmp_path):
+        spec = generate_spec(4)
+        (tmp_path / "spec").mkdir()
+        spec_path = str(tmp_path / "spec" / "spec.yml")
+        with open(spec_path, "w") as spec_file:
+            yaml.safe_dump(spec, spec_file)
+
+        # The mock answers 200 to every row, so the rows expecting 404 fail
+        with open(tmp_path / "ids.csv", "w") as dataset:
+            dataset.write("id,status\n")
+            for index in range(50):
+                dataset.write(f"{index},{404 if index % 10 == 3 else 200}\n")
+
+        steps_path = str(tmp_path / "steps.yml")
+        with MockServer(resolve_refs(spec)) as server:
+            steps = generate_steps(spec, server.url, 1)
+            steps["steps"].append(
+                {
+                    **steps["steps"][1],
+                    "name": "getEach",
+                    "path": "/resources0/${{ data.id }}",
+                    "status_code": "${{ data.status }}",
+                    "foreach": {"dataset": "ids.csv"},
+                }
+            )
+            with open(steps_path, "w") as steps_file:
+                yaml.safe_dump(steps, steps_file)
+
+            report_path = str(tmp_path / "report.json")
+            with pytest.raises(DatasetFailuresError) as error:
+                validate(steps_path, spec_path, jobs=4, report_json=report_path)
+
+            # No row is sent after the first failure
+            with pytest.raises(DatasetFailuresError) as fail_fast_error:
+                validate(steps_path, spec_path, fail_fast=True)
+            assert_that(fail_fast_error.value.total, is_(4))
+
+        assert_that(error.value.failed, is_(5))
+        assert_that(error.value.total, is_(50))
+        with open(report_path) as report_file:
+            step = json.load(report_file)["steps"][-1]
+        assert_that(
+            (step["name"], step["status"], step["rows"], step["failed_rows"]),
+            is_(("getEach", "failed", 50, 5)),
+        )
+        assert_that(step["timings"]["ttfb"] > 0, is_(True))
+
+    def test_fuzz(self, tmp_path):
+        spec = generate_spec(4, depth=2, properties=5)
+        spec_path = str(tmp_path / "spec.yml")
+        with open(spec_path, "w") as spec_file:
+            yaml.safe_dump(spec, spec_file)
+
+        steps_path = str(tmp_path / "steps.yml")
+        with MockServer(resolve_refs(spec)) as server:
+            with open(steps_path, "w") as steps_file:
+                yaml.safe_dump(generate_steps(spec, server.url, 2), steps_file)
+
+            result = fuzz(steps_path, spec_path, cases=300, seed=1, invalid_ratio=0, jobs=4)
+            assert_that(list(result.steps), is_(["create0", "create1"]))
+            assert_that((result.cases, result.failed), is_((600, 0)))
+
+            # The mock accepts every body, including the invalid ones
+            with pytest.raises(FuzzFailuresError) as error:
+                fuzz(steps_path, spec_path, cases=50, seed=1, invalid_ratio=1)
+            assert_that((error.value.failed, error.value.total), is_((100, 100)))
+
+    def test_validate_shards(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        spec = generate_spec(12)
+        # Documents are cached by path, so a relative one could be another test's
+        spec_path = str(tmp_path / "spec.yml")
+        with open(spec_path, "w") as spec_file:
+            yaml.safe_dump(spec, spec_file)
+
+        with MockServer(resolve_refs(spec)) as server:
+            # A third of the spec each, which only meets the threshold together
+            steps = generate_steps(spec, server.url, 4)
+            for name, part in (("a.yml", slice(0, 4)), ("b.yml", slice(4, 8))):
+                with open(name, "w") as steps_file:
+                    part_steps = {**steps, "steps": steps["steps"][part]}
+                    part_steps["coverage_threshold"] = 0.6
+                    yaml.safe_dump(part_steps, steps_file)
+
+            shard_results = []
+            for index in (1, 2):
+                shard_results.append(f"shard{index}.json")
+                results = validate(
+                    ["a.yml", "b.yml"],
+                    spec_path,
+                    shard=(index, 2),
+                    shard_result=shard_results[-1],
+                )
+                # A step is never split from the step it depends on
+                assert_that(len(results), is_(4))
+
+        merged = merge(shard_results, report_json="report.json")
+        assert_that(
+            [(result.step_file, result.name) for result in merged],
+            is_(
+                [
+                    (name, f"{kind}{i}")
+                    for name, resources in (("a.yml", (0, 1)), ("b.yml", (2, 3)))
+                    for i in resources
+                    for kind in ("create", "get")
+                ]
+            ),
+        )
+        with open("report.json") as report_file:
+            assert_that(json.load(report_file)["passed"], is_(8))
+
+        with pytest.raises(InsufficientCoverageError):
+            merge(shard_results, coverage_threshold=0.75)
@@ -1,6 +1,8 @@
 import pytest
 from hamcrest import assert_that, is_, has_items, instance_of
 
+from jsonschema.protocols import Validator
+
 from src.verify import *
 from src.models import Response
 
@@ -48,3 +50,45 @@ class TestVerify:
 
         with pytest.raises(ValidationError):
             verify_response(response, status_code, self.schema)
+
+    operation_schemas = {
+        "createPerson": {
+            "requestBody": {
+                "type": "object",
+                "properties": {"email": {"type": "string", "format": "email"}},
+            },
+            "responses": {"201": schema, "400": {"description": "Bad request"}},
+        },
+        "listPeople": {"responses": {"200": {"type": "array", "items": schema}}},
+    }
+
+    def test_validator_registry(self):
+        validators = ValidatorRegistry(self.operation_schemas)
+
+        assert_that(validators.request_body("createPerson"), is_(instance_of(Validator)))
+        assert_that(validators.request_body("listPeople"), is_(None))
+        assert_that(validators.response("createPerson", 201), is_(instance_of(Validator)))
+        assert_that(
+            validators.response("createPerson", "201"),
+            is_(validators.response("createPerson", 201)),
+        )
+        assert_that(validators.response("createPerson", 500), is_(None))
+
+    def test_verify_request_body_with_compiled_validator(self):
+        validators = ValidatorRegistry(self.operation_schemas)
+        schema = self.operation_schemas["createPerson"]["requestBody"]
+        validator = validators.request_body("createPerson")
+
+        verify_request_body({"email": "john@example.com"}, schema, validator)
+        with pytest.raises(ValidationError):
+            verify_request_body({"email": "not an email"}, schema, validator)
+
+    def test_verify_response_with_compiled_validator(self):
+        validators = ValidatorRegistry(self.operation_schemas)
+        validator = validators.response("listPeople", 200)
+        schema = self.operation_schemas["listPeople"]["responses"]["200"]
+
+        verify_response(Response(200, {}, [{"age": 30}]), 200, schema, validator)
+        with pytest.raises(ValidationError) as e:
+            verify_response(Response(200, {}, [{"age": "30"}]), 200, schema, validator)
+        assert_that(e.value.__cause__.message, is_("'30' is not of type 'integer'"))